@@ -1,64 +1,83 @@
-from fastapi import APIRouter
 import logging # Loglama için eklendi
+from importlib import import_module
+from typing import List, NamedTuple, Optional
 
-# Ana uygulama endpoint'leri
-from app.api.v1.endpoints.login import router as login_router
-from app.api.v1.endpoints.veliler import router as veliler_router
-from app.api.v1.endpoints.ogrenciler import router as ogrenciler_router
-from app.api.v1.endpoints.cagrilar import router as cagrilar_router
-from app.api.v1.endpoints.ws import router as ws_router
-from app.api.v1.endpoints.users import router as main_app_users_router
-from app.api.v1.endpoints.schools import router as main_app_schools_router
-from app.api.v1.endpoints.public import router as main_app_public_router
+from fastapi import APIRouter, FastAPI
+from starlette.types import Receive, Scope, Send
 
-# Okul Yönetim API endpoint'leri
-from app.api.v1.endpoints.school_admin.auth import router as school_admin_auth_router
-from app.api.v1.endpoints.school_admin.users import users_router as school_admin_users_router # users_router olarak export edilmiş olabilir
-from app.api.v1.endpoints.school_admin.students import router as school_admin_students_router
-from app.api.v1.endpoints.school_admin.teachers import router as school_admin_teachers_router
-from app.api.v1.endpoints.school_admin.classes import router as school_admin_classes_router
-from app.api.v1.endpoints.school_admin.notifications import router as school_admin_notifications_router
-from app.api.v1.endpoints.school_admin.settings import router as school_admin_settings_router
-from app.api.v1.endpoints.school_admin.schools import router as school_admin_schools_router
-from app.api.v1.endpoints.school_admin.public_router import router as school_admin_public_router # public_router olarak export edilmiş olabilir
+from app.core.config import settings
 
-api_router = APIRouter()
+logger = logging.getLogger(__name__)
 
-# TEST ENDPOINT for api_router itself
-# @api_router.get("/ping-api-v1", status_code=200)
-# async def ping_api_v1_router():
-#     logging.info("[API_V1] /ping-api-v1 endpoint called!") 
-#     return {"message": "pong from api_router in api_v1.py"}
+class RouterSpec(NamedTuple):
+    module: str # app.api.v1.endpoints altındaki modül
+    attribute: str # Modüldeki APIRouter'ın adı
+    prefix: str
+    tags: List[str]
+    legacy: bool = False # LAZY_LEGACY_ROUTERS açıkken ilk istekte yüklenir
 
-# --- School Admin Router'larını Doğrudan Ana api_router'a Ekleme Başlangıç ---
-# school_admin_base_router katmanı kaldırıldı.
+# Router'lar uygulamaya doğrudan eklenir. include_router her çağrıda tüm route'ları (ve response_model
+# alanlarını) yeniden kurduğu için, araya bir api_router katmanı koymak başlangıçta bu işi iki kez yaptırıyordu.
+API_ROUTERS: List[RouterSpec] = [
+    # --- School Admin Router'ları Başlangıç ---
+    # school_admin_base_router katmanı kaldırıldı.
+    RouterSpec("school_admin.auth", "router", "/school-admin/auth", ["School Admin - Auth"]),
+    RouterSpec("school_admin.users", "users_router", "/school-admin/users", ["School Admin - Users"]),
+    # /school-admin/schools path'i için; bu router içinde "/" ve "/{school_id}" gibi pathler var.
+    RouterSpec("school_admin.schools", "router", "/school-admin/schools", ["School Admin - Schools"]),
+    # {school_id} içeren pathler: modüllerin kendi pathleri "/" (root) veya "/{student_id}" gibidir,
+    # çünkü "/schools/{school_id}/students" prefix'i burada veriliyor.
+    RouterSpec("school_admin.students", "router", "/school-admin/schools/{school_id}/students", ["School Admin - School Students"]),
+    RouterSpec("school_admin.teachers", "router", "/school-admin/schools/{school_id}/teachers", ["School Admin - School Teachers"]),
+    RouterSpec("school_admin.classes", "router", "/school-admin/schools/{school_id}/classes", ["School Admin - School Classes"]),
+    RouterSpec("school_admin.notifications", "router", "/school-admin/schools/{school_id}/notifications", ["School Admin - School Notifications"]),
+    RouterSpec("school_admin.analytics", "router", "/school-admin/schools/{school_id}/analytics", ["School Admin - School Analytics"]),
+    RouterSpec("school_admin.exports", "router", "/school-admin/schools/{school_id}/exports", ["School Admin - School Exports"]),
+    RouterSpec("school_admin.settings", "router", "/school-admin/settings", ["School Admin - Application Settings"]),
+    RouterSpec("school_admin.public_router", "router", "/school-admin/public", ["School Admin - Public"]),
+    # --- School Admin Router'ları Bitiş ---
 
-api_router.include_router(school_admin_auth_router, prefix="/school-admin/auth", tags=["School Admin - Auth"])
-api_router.include_router(school_admin_users_router, prefix="/school-admin/users", tags=["School Admin - Users"])
+    # Diğer ana uygulama router'ları
+    RouterSpec("login", "router", "", ["login"]),
+    RouterSpec("users", "router", "/users", ["Main App - Users"]),
+    RouterSpec("schools", "router", "/schools", ["Main App - Schools"]),
+    RouterSpec("public", "router", "/public", ["Main App - Public"]),
+    RouterSpec("veliler", "router", "/veliler", ["Veliler"], legacy=True),
+    RouterSpec("ogrenciler", "router", "/ogrenciler", ["Ogrenciler"], legacy=True),
+    RouterSpec("cagrilar", "router", "/cagrilar", ["Cagrilar"]),
+    RouterSpec("ws", "router", "/ws", ["websocket"]), # Websocket için prefix /ws
+]
 
-# /school-admin/schools path'i için school_admin_schools_module.router
-# Bu router içinde muhtemelen "/" ve "/{school_id}" gibi pathler var.
-api_router.include_router(school_admin_schools_router, prefix="/school-admin/schools", tags=["School Admin - Schools"])
+def load_router(spec: RouterSpec) -> APIRouter:
+    return getattr(import_module(f"app.api.v1.endpoints.{spec.module}"), spec.attribute)
 
-# {school_id} içeren pathler için ayrı include_router çağrıları (önceki yapıya benzer)
-# Bu modüllerin kendi içindeki pathler artık "/" (root) veya "/{student_id}" gibi olmalı,
-# çünkü "/schools/{school_id}/students" prefix'i burada veriliyor.
-api_router.include_router(school_admin_students_router, prefix="/school-admin/schools/{school_id}/students", tags=["School Admin - School Students"])
-api_router.include_router(school_admin_teachers_router, prefix="/school-admin/schools/{school_id}/teachers", tags=["School Admin - School Teachers"])
-api_router.include_router(school_admin_classes_router, prefix="/school-admin/schools/{school_id}/classes", tags=["School Admin - School Classes"])
-api_router.include_router(school_admin_notifications_router, prefix="/school-admin/schools/{school_id}/notifications", tags=["School Admin - School Notifications"])
+class LazyRouterApp:
+    """
+    Eski (legacy) router'ı ilk isteğe kadar import etmeyen ASGI uygulaması; prefix'e mount edilir.
+    İlk istekte router ayrı bir FastAPI alt uygulamasına eklenir. Ana uygulamanın dependency_overrides
+    ve exception handler'ları paylaşılır. Bu route'lar OpenAPI dokümanında görünmez.
+    """
+    def __init__(self, parent: FastAPI, spec: RouterSpec):
+        self.parent = parent
+        self.spec = spec
+        self._app: Optional[FastAPI] = None
 
-api_router.include_router(school_admin_settings_router, prefix="/school-admin/settings", tags=["School Admin - Application Settings"])
-api_router.include_router(school_admin_public_router, prefix="/school-admin/public", tags=["School Admin - Public"])
+    def _load(self) -> FastAPI:
+        sub_app = FastAPI(openapi_url=None, docs_url=None, redoc_url=None)
+        sub_app.dependency_overrides = self.parent.dependency_overrides
+        sub_app.exception_handlers.update(self.parent.exception_handlers)
+        sub_app.include_router(load_router(self.spec), tags=self.spec.tags)
+        logger.info(f"Lazy router '{self.spec.module}' loaded on first request")
+        return sub_app
 
-# --- School Admin Router Yapılandırması Bitiş ---
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self._app is None:
+            self._app = self._load()
+        await self._app(scope, receive, send)
 
-# Diğer ana uygulama router'ları
-api_router.include_router(login_router, tags=["login"])
-api_router.include_router(main_app_users_router, prefix="/users", tags=["Main App - Users"])
-api_router.include_router(main_app_schools_router, prefix="/schools", tags=["Main App - Schools"])
-api_router.include_router(main_app_public_router, prefix="/public", tags=["Main App - Public"])
-api_router.include_router(veliler_router, prefix="/veliler", tags=["Veliler"])
-api_router.include_router(ogrenciler_router, prefix="/ogrenciler", tags=["Ogrenciler"])
-api_router.include_router(cagrilar_router, prefix="/cagrilar", tags=["Cagrilar"])
-api_router.include_router(ws_router, prefix="/ws", tags=["websocket"]) # Websocket için prefix /ws 
\ No newline at end of file
+def include_api_routers(app: FastAPI, prefix: str) -> None:
+    for spec in API_ROUTERS:
+        if spec.legacy and settings.LAZY_LEGACY_ROUTERS:
+            app.mount(prefix + spec.prefix, LazyRouterApp(app, spec))
+        else:
+            app.include_router(load_router(spec), prefix=prefix + spec.prefix, tags=spec.tags)
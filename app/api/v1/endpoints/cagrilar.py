@@ -1,4 +1,5 @@
-from typing import List, Any
+from typing import List, Any, Optional
+from datetime import datetime
 import json
 import logging
 
@@ -7,8 +8,10 @@ from sqlalchemy.orm import Session
 
 from app import models, schemas, crud
 from app.models.call import CallStatusEnum
+from app.crud.crud_call import STAFF_ALLOWED_TRANSITIONS, FINISHED_CALL_STATUSES, CallOutOfAreaError
 from app.api import deps
 from app.core.connection_manager import manager
+from app.core.pickup_tracker import pickup_tracker
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -34,8 +37,13 @@ async def create_new_call(
     """
     Create a new call for a student by the logged-in parent.
     """
-    created_call_db = crud.call.create_call_for_parent(db=db, obj_in=call_in, parent_user=current_parent)
-    
+    try:
+        created_call_db = crud.call.create_call_for_parent(db=db, obj_in=call_in, parent_user=current_parent)
+    except CallOutOfAreaError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Çağrı oluşturmak için okul bölgesinde olmalısınız. Konum bilginizi kontrol edin."
+        )
     if not created_call_db:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,14 +55,14 @@ async def create_new_call(
          logger.error(f"Call {created_call_db.id} için detaylar veya sınıf bilgisi yüklenemedi.")
          return call_with_details 
 
-    call_schema_for_ws = schemas.call.Call.model_validate(call_with_details)
+    call_schema_for_ws = schemas.call.Call.model_validate(call_with_details, from_attributes=True)
     call_dict_for_ws = call_schema_for_ws.model_dump(mode="json")
     message_payload = {"type": "new_call", "data": call_dict_for_ws}
     
     try:
         class_identifier_for_ws = call_with_details.class_.class_name if call_with_details.class_ else f"class_id_{call_with_details.class_id}"
-        await manager.broadcast_to_sinif(json.dumps(message_payload), class_identifier_for_ws)
-        logger.info(f"New call notification sent to class: {class_identifier_for_ws}, Call ID {created_call_db.id}")
+        await manager.broadcast_to_class(class_identifier_for_ws, json.dumps(message_payload))
+        logger.info("New call notification sent to class: %s, Call ID %s", class_identifier_for_ws, created_call_db.id)
     except Exception as e:
         logger.error(f"Error broadcasting new call to WebSocket for class {class_identifier_for_ws}: {e}")
 
@@ -83,6 +91,72 @@ async def read_calls_by_class(
     )
     return calls
 
+@router.get("/class/{class_id}/pickup-queue", response_model=List[schemas.call.PickupQueueEntry])
+async def read_pickup_queue_by_class(
+    class_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user)
+):
+    """
+    Sınıfın teslim kuyruğu: konum paylaşan veliler, tahmini varış süresine (ETA) göre sıralı.
+    Öğrenciler velileri gelmeden hemen önce gönderilebilsin diye kullanılır.
+    """
+    target_class = crud.class_.get(db, id=class_id)
+    if not target_class:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sınıf bulunamadı")
+
+    if current_user.role != models.UserRoleEnum.SUPER_ADMIN:
+        if current_user.role not in [models.UserRoleEnum.TEACHER, models.UserRoleEnum.SCHOOL_ADMIN] \
+                or current_user.school_id != target_class.school_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu sınıfın teslim kuyruğunu görme yetkiniz yok.")
+
+    return pickup_tracker.get_class_queue(target_class.school_id, class_id)
+
+@router.get("/pickup-nearby", response_model=List[schemas.call.PickupQueueEntry])
+async def read_nearby_parents(
+    radius_meters: float = Query(500, gt=0, le=20000, description="Okul merkezine olan en fazla mesafe"),
+    school_id: Optional[int] = Query(None, description="Sadece süper admin için; personel kendi okulunu görür"),
+    current_user: models.User = Depends(deps.get_current_active_user)
+):
+    """
+    Okula verilen yarıçap içinde olan, konum paylaşan veliler (en yakın önde).
+    """
+    if current_user.role == models.UserRoleEnum.SUPER_ADMIN:
+        if school_id is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="school_id gerekli.")
+    elif current_user.role in [models.UserRoleEnum.TEACHER, models.UserRoleEnum.SCHOOL_ADMIN] and current_user.school_id:
+        school_id = current_user.school_id
+    else:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu işlemi yapma yetkiniz yok.")
+
+    return pickup_tracker.get_nearby(school_id, radius_meters)
+
+@router.get("/history", response_model=List[schemas.call.CallHistoryItem])
+async def read_call_history(
+    db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = Query(100, le=1000),
+    include_archived: bool = Query(True, description="Arşivlenmiş (eski, bitmiş) çağrıları da getir"),
+    created_from: Optional[datetime] = Query(None, description="Bu tarihten (dahil) sonra oluşturulan çağrılar"),
+    created_to: Optional[datetime] = Query(None, description="Bu tarihten önce oluşturulan çağrılar"),
+    current_user: models.User = Depends(deps.get_current_active_user),
+):
+    """
+    Çağrı geçmişi: aktif tablo ve arşiv birlikte, en yeni önce.
+    Süper admin tüm okulları, okul yöneticisi sadece kendi okulunu görür.
+    """
+    if current_user.role == models.UserRoleEnum.SUPER_ADMIN:
+        school_scope = None
+    elif current_user.role == models.UserRoleEnum.SCHOOL_ADMIN and current_user.school_id:
+        school_scope = current_user.school_id
+    else:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu işlemi yapma yetkiniz yok.")
+
+    return crud.call.get_history(
+        db, school_id=school_scope, include_archived=include_archived,
+        created_from=created_from, created_to=created_to, skip=skip, limit=limit
+    )
+
 @router.get("/{call_id}", response_model=schemas.call.Call)
 async def read_call_by_id(
     call_id: int,
@@ -115,6 +189,12 @@ async def update_call_status(
 
     new_status = call_status_in.status
 
+    if call_status_in.version is not None and call_status_in.version != db_call.version:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Çağrı başka bir kullanıcı tarafından güncellendi (güncel sürüm: {db_call.version}). Lütfen yenileyip tekrar deneyin."
+        )
+
     if current_user.role == models.UserRoleEnum.PARENT:
         if db_call.parent_user_id != current_user.id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu çağrının durumunu değiştirme yetkiniz yok.")
@@ -127,11 +207,7 @@ async def update_call_status(
         if not current_user.school_id or db_call.school_id != current_user.school_id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu çağrının durumunu değiştirme yetkiniz yok (farklı okul).")
         
-        allowed_transitions = {
-            CallStatusEnum.PENDING: [CallStatusEnum.ACKNOWLEDGED, CallStatusEnum.CANCELLED_BY_SCHOOL],
-            CallStatusEnum.ACKNOWLEDGED: [CallStatusEnum.COMPLETED, CallStatusEnum.CANCELLED_BY_SCHOOL]
-        }
-        if not (db_call.status in allowed_transitions and new_status in allowed_transitions[db_call.status]):
+        if not (db_call.status in STAFF_ALLOWED_TRANSITIONS and new_status in STAFF_ALLOWED_TRANSITIONS[db_call.status]):
              raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Okul personeli olarak izin verilmeyen durum değişikliği: {db_call.status.value} -> {new_status.value}")
             
     elif current_user.role == models.UserRoleEnum.SUPER_ADMIN:
@@ -140,22 +216,77 @@ async def update_call_status(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Çağrı durumunu değiştirme yetkiniz yok.")
 
     updated_call_db = crud.call.update_call_status(db=db, db_call=db_call, new_status=new_status)
+    if not updated_call_db:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Çağrı başka bir kullanıcı tarafından aynı anda güncellendi. Lütfen yenileyip tekrar deneyin."
+        )
+    if new_status in FINISHED_CALL_STATUSES:
+        pickup_tracker.remove(updated_call_db.id)
     
     call_with_details = crud.call.get_call_with_details(db, call_id=updated_call_db.id)
     if call_with_details and call_with_details.class_:
-        call_schema_for_ws = schemas.call.Call.model_validate(call_with_details)
+        call_schema_for_ws = schemas.call.Call.model_validate(call_with_details, from_attributes=True)
         call_dict_for_ws = call_schema_for_ws.model_dump(mode="json")
         message_payload = {"type": "call_updated", "data": call_dict_for_ws}
         
         class_identifier_for_ws = call_with_details.class_.class_name if call_with_details.class_ else f"class_id_{call_with_details.class_id}"
         try:
-            await manager.broadcast_to_sinif(json.dumps(message_payload), class_identifier_for_ws)
-            logger.info(f"Call update notification sent to class: {class_identifier_for_ws}, Call ID {updated_call_db.id}, Status {new_status}")
+            await manager.broadcast_to_class(class_identifier_for_ws, json.dumps(message_payload))
+            logger.info("Call update notification sent to class: %s, Call ID %s, Status %s", class_identifier_for_ws, updated_call_db.id, new_status)
         except Exception as e:
             logger.error(f"Error broadcasting call update to WebSocket for class {class_identifier_for_ws}: {e}")
 
     return updated_call_db
 
+@router.patch("/bulk-status", response_model=schemas.call.CallBulkStatusResult)
+async def bulk_update_call_status(
+    bulk_in: schemas.call.CallBulkStatusUpdate,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user)
+):
+    """
+    Birden çok çağrının durumunu tek istekte günceller (öğretmen / okul yöneticisi / süper admin).
+    Geçiş kuralları tekil güncellemedeki ile aynıdır; kurala uymayan veya başka okula ait çağrılar
+    hata vermeden atlanır ve `skipped_call_ids` içinde döner.
+    WebSocket'e her sınıf için tek bir `calls_updated` mesajı gönderilir.
+    """
+    if current_user.role in [models.UserRoleEnum.TEACHER, models.UserRoleEnum.SCHOOL_ADMIN]:
+        if not current_user.school_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Çağrı durumunu değiştirme yetkiniz yok (okul bilgisi yok).")
+        school_scope = current_user.school_id
+    elif current_user.role == models.UserRoleEnum.SUPER_ADMIN:
+        school_scope = None
+    else:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Toplu durum güncellemesi sadece okul personeli içindir.")
+
+    updated_calls = crud.call.bulk_update_status(
+        db, call_ids=bulk_in.call_ids, new_status=bulk_in.status, school_id=school_scope
+    )
+
+    calls_by_class = {}
+    for updated_call in updated_calls:
+        if bulk_in.status in FINISHED_CALL_STATUSES:
+            pickup_tracker.remove(updated_call.id)
+        class_identifier_for_ws = updated_call.class_.class_name if updated_call.class_ else f"class_id_{updated_call.class_id}"
+        call_dict_for_ws = schemas.call.CallInDBBase.model_validate(updated_call).model_dump(mode="json")
+        calls_by_class.setdefault(class_identifier_for_ws, []).append(call_dict_for_ws)
+
+    for class_identifier_for_ws, call_dicts in calls_by_class.items():
+        message_payload = {"type": "calls_updated", "data": call_dicts}
+        try:
+            await manager.broadcast_to_class(class_identifier_for_ws, json.dumps(message_payload))
+            logger.info("Bulk call update notification sent to class: %s, %s calls, Status %s", class_identifier_for_ws, len(call_dicts), bulk_in.status)
+        except Exception as e:
+            logger.error(f"Error broadcasting bulk call update to WebSocket for class {class_identifier_for_ws}: {e}")
+
+    updated_ids = {c.id for c in updated_calls}
+    return schemas.call.CallBulkStatusResult(
+        status=bulk_in.status,
+        updated_call_ids=sorted(updated_ids),
+        skipped_call_ids=[call_id for call_id in dict.fromkeys(bulk_in.call_ids) if call_id not in updated_ids],
+    )
+
 @router.get("/", response_model=List[schemas.call.Call])
 async def read_all_calls_for_school_admin_or_superuser(
     db: Session = Depends(deps.get_db),
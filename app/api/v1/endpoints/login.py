@@ -10,6 +10,7 @@ from app import schemas
 from app.core import security
 from app.api.deps import get_db
 from app.core.config import settings
+from app.core.ratelimit import enforce_login_username_limit
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -22,32 +23,30 @@ def login_access_token(
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
-    logger.info(f"Attempting login for username from form: '{form_data.username}', password from form: '{form_data.password}'")
+    enforce_login_username_limit(form_data.username)
     try:
         user = crud.user.authenticate(db, username=form_data.username, password=form_data.password)
-        logger.info(f"Authentication result for '{form_data.username}': User object: {user}")
     except Exception as e:
-        logger.error(f"Error during crud.user.authenticate for {form_data.username}: {e}", exc_info=True)
+        logger.error("Error during crud.user.authenticate for %s: %s", form_data.username, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error during authentication process",
         )
 
     if not user:
-        logger.warning(f"Failed login attempt for {form_data.username}: Incorrect username or password (user not found or password mismatch after authenticate call)")
+        logger.warning("Failed login attempt for %s: incorrect username or password", form_data.username, extra={"username": form_data.username})
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     if not user.is_active:
-        logger.warning(f"Failed login attempt for {form_data.username}: Inactive user")
+        logger.warning("Failed login attempt for %s: inactive user", form_data.username, extra={"username": form_data.username})
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="Inactive user"
         )
     
-    logger.info(f"User {form_data.username} authenticated successfully. Creating token...")
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     token_data = {"sub": user.username, "user_id": user.id}
     if user.school_id:
@@ -57,12 +56,12 @@ def login_access_token(
         access_token = security.create_access_token(
             data=token_data, expires_delta=access_token_expires
         )
-        logger.info(f"Access token created successfully for {form_data.username}")
     except Exception as e:
-        logger.error(f"Error during security.create_access_token for {form_data.username}: {e}", exc_info=True)
+        logger.error("Error during security.create_access_token for %s: %s", form_data.username, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error during token creation",
         )
         
+    logger.info("User %s logged in", user.id, extra={"user_id": user.id, "school_id": user.school_id})
     return {"access_token": access_token, "token_type": "bearer"} 
\ No newline at end of file
@@ -1,67 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List
 import logging
 
 from app import crud, schemas
+from app.core.public_response_cache import SCHOOLS_SCOPE, public_response_cache
 from app.db.database import get_db
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Yanıtlar önbellekte hazır JSON olarak tutulduğu için response_model doğrulaması burada yapılır
+_school_adapter = TypeAdapter(schemas.School)
+_schools_adapter = TypeAdapter(List[schemas.School])
+_classes_adapter = TypeAdapter(List[schemas.Class])
+
+# Aşağıdaki endpoint'ler ETag ve Cache-Control ile döner; If-None-Match tutarsa 304,
+# önbellekte hazır yanıt varken veritabanına gidilmez (oturum açılır ama sorgu yapılmaz).
+
 @router.get("/schools/", response_model=List[schemas.School])
 def read_public_schools(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
-):
+) -> Response:
     """
     Get all schools. Public endpoint, no authentication required.
     """
-    schools = crud.school.get_multi(db, skip=skip, limit=limit)
-    return schools
+    def render() -> bytes:
+        schools = crud.school.get_multi(db, skip=skip, limit=limit)
+        return _schools_adapter.dump_json(_schools_adapter.validate_python(schools, from_attributes=True))
+    return public_response_cache.respond(request, SCHOOLS_SCOPE, ("list", skip, limit), render)
 
 @router.get("/schools/{school_id}", response_model=schemas.School)
 def read_public_school(
+    request: Request,
     school_id: int,
     db: Session = Depends(get_db),
-):
+) -> Response:
     """
     Get a specific school by ID. Public endpoint, no authentication required.
     """
-    school = crud.school.get(db, school_id)
-    if not school:
-        raise HTTPException(status_code=404, detail="School not found")
-    return school
+    def render() -> bytes:
+        school = crud.school.get(db, school_id)
+        if not school:
+            raise HTTPException(status_code=404, detail="School not found")
+        return _school_adapter.dump_json(_school_adapter.validate_python(school, from_attributes=True))
+    return public_response_cache.respond(request, SCHOOLS_SCOPE, ("id", school_id), render)
 
 @router.get("/schools/by_code/{unique_code}", response_model=schemas.School)
 def get_school_by_unique_code(
+    request: Request,
     unique_code: str,
     db: Session = Depends(get_db),
-):
+) -> Response:
     """
     Get school by unique code (public endpoint - no authentication required).
     """
-    logger.debug(f"Looking for school with unique_code: '{unique_code}'")
-    school = crud.school.get_by_unique_code(db, unique_code=unique_code)
-    if not school:
-        logger.warning(f"School not found with unique_code '{unique_code}', raising 404")
-        raise HTTPException(status_code=404, detail="School not found")
-    return school
+    def render() -> bytes:
+        logger.debug("Looking for school with unique_code: '%s'", unique_code)
+        school = crud.school.get_school_by_unique_code(db, unique_code=unique_code)
+        if not school:
+            logger.warning(f"School not found with unique_code '{unique_code}', raising 404")
+            raise HTTPException(status_code=404, detail="School not found")
+        return _school_adapter.dump_json(_school_adapter.validate_python(school, from_attributes=True))
+    return public_response_cache.respond(request, SCHOOLS_SCOPE, ("code", unique_code), render)
 
 @router.get("/schools/{school_id}/classes/", response_model=List[schemas.Class])
 def read_public_school_classes(
+    request: Request,
     school_id: int,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
-):
+) -> Response:
     """
     Get all classes for a specific school. Public endpoint, no authentication required.
     """
-    school = crud.school.get(db, id=school_id) # Okulun varlığını kontrol et
-    if not school:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="School not found")
-    
-    classes = crud.class_.get_multi_by_school(db, school_id=school_id, skip=skip, limit=limit)
-    return classes 
\ No newline at end of file
+    def render() -> bytes:
+        school = crud.school.get(db, id=school_id) # Okulun varlığını kontrol et
+        if not school:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="School not found")
+        classes = crud.class_.get_multi_by_school(db, school_id=school_id, skip=skip, limit=limit)
+        return _classes_adapter.dump_json(_classes_adapter.validate_python(classes, from_attributes=True))
+    return public_response_cache.respond(request, school_id, ("classes", skip, limit), render)
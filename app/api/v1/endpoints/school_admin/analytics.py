@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from datetime import date, timedelta
+
+from app import crud, models, schemas
+from app.api.deps import get_db, get_current_active_user
+
+router = APIRouter(
+    # prefix="/schools/{school_id}/analytics", # api_v1.py'de yönetilecek
+    tags=["School Administration - Analytics"],
+    responses={404: {"description": "Not found"}},
+)
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+
+def _authorize_and_resolve_range(
+    school_id: int, current_user: models.User, date_from: Optional[date], date_to: Optional[date]
+) -> Tuple[date, date]:
+    if not (current_user.role == schemas.UserRole.SUPER_ADMIN or
+            (current_user.role == schemas.UserRole.SCHOOL_ADMIN and current_user.school_id == school_id)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view analytics for this school")
+
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from must be before or equal to date_to")
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Date range cannot exceed {MAX_RANGE_DAYS} days")
+    return date_from, date_to
+
+@router.get("/summary", response_model=schemas.CallStatsSummary)
+async def get_call_stats_summary(
+    school_id: int, # Path'ten
+    date_from: Optional[date] = Query(None, description="Başlangıç tarihi (varsayılan: son 30 gün)"),
+    date_to: Optional[date] = Query(None, description="Bitiş tarihi, dahil (varsayılan: bugün)"),
+    class_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Okulun çağrı özeti: toplam / tamamlanan / iptal edilen çağrılar ve ortalama bekleme süresi.
+    - Yetki: SUPER_ADMIN veya o okulun SCHOOL_ADMIN'i.
+    """
+    date_from, date_to = _authorize_and_resolve_range(school_id, current_user, date_from, date_to)
+    return crud.call_stat.get_summary(db, school_id=school_id, date_from=date_from, date_to=date_to, class_id=class_id)
+
+@router.get("/daily", response_model=List[schemas.CallStatsDaily])
+async def get_call_stats_daily(
+    school_id: int, # Path'ten
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    class_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Gün gün çağrı istatistikleri.
+    """
+    date_from, date_to = _authorize_and_resolve_range(school_id, current_user, date_from, date_to)
+    return crud.call_stat.get_daily(db, school_id=school_id, date_from=date_from, date_to=date_to, class_id=class_id)
+
+@router.get("/hourly", response_model=List[schemas.CallStatsHourly])
+async def get_call_stats_hourly(
+    school_id: int, # Path'ten
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    class_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Saat bazında (0-23) çağrı dağılımı; yoğun saatleri görmek için.
+    """
+    date_from, date_to = _authorize_and_resolve_range(school_id, current_user, date_from, date_to)
+    return crud.call_stat.get_hourly(db, school_id=school_id, date_from=date_from, date_to=date_to, class_id=class_id)
+
+@router.get("/classes", response_model=List[schemas.CallStatsByClass])
+async def get_call_stats_by_class(
+    school_id: int, # Path'ten
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Sınıf bazında çağrı istatistikleri.
+    """
+    date_from, date_to = _authorize_and_resolve_range(school_id, current_user, date_from, date_to)
+    return crud.call_stat.get_by_class(db, school_id=school_id, date_from=date_from, date_to=date_to)
@@ -6,6 +6,7 @@ from datetime import timedelta
 from app import crud, schemas, models # app yerine okul_yonetim_api.app
 from app.core import security # app yerine okul_yonetim_api.app
 from app.core.config import settings
+from app.core.ratelimit import enforce_login_username_limit
 from app.dependencies import get_db, get_current_active_user # app yerine okul_yonetim_api.app
 
 router = APIRouter(prefix="/auth")
@@ -23,7 +24,8 @@ async def login_for_access_token(
     # Not: crud.authenticate_user, username ve school_id alacak şekilde güncellenmeli
     # Şimdilik school_id olmadan, sadece username ile deniyoruz.
     # Okul kodu giriş ekranına eklendiğinde, o bilgi buraya da aktarılmalı.
-    user = crud.authenticate_user(db, username=form_data.username, password=form_data.password)
+    enforce_login_username_limit(form_data.username)
+    user = crud.user.authenticate(db, username=form_data.username, password=form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
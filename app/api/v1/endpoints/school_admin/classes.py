@@ -47,7 +47,8 @@ async def create_class(
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, 
                                 detail=f"Teacher with ID {class_in.teacher_id} not found or not in school {school_id}")
             
-    return crud.class_.create(db=db, obj_in=class_in)
+    new_class = crud.class_.create(db=db, obj_in=class_in)
+    return new_class
 
 @router.get("/{class_id}", response_model=schemas.Class)
 async def read_class(
@@ -125,7 +126,8 @@ async def update_class(
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, 
                                     detail=f"New teacher with ID {class_update_in.teacher_id} not found or not in school {school_id}")
 
-    return crud.class_.update(db=db, db_obj=db_class, obj_in=class_update_in)
+    updated_class = crud.class_.update(db=db, db_obj=db_class, obj_in=class_update_in)
+    return updated_class
 
 @router.delete("/{class_id}", response_model=schemas.Class)
 async def delete_class(
@@ -0,0 +1,112 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Callable, Optional
+from datetime import date
+import logging
+
+from app import crud, models, schemas
+from app.api.deps import get_db, get_current_active_user
+from app.core.data_export import MEDIA_TYPES, stream_rows
+from app.crud.crud_export import ExportRows
+from app.db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+router = APIRouter(
+    # prefix="/schools/{school_id}/exports", # api_v1.py'de yönetilecek
+    tags=["School Administration - Exports"],
+    responses={404: {"description": "Not found"}},
+)
+
+def _authorize_export(db: Session, school_id: int, current_user: models.User) -> None:
+    if not (current_user.role == schemas.UserRole.SUPER_ADMIN or
+            (current_user.role == schemas.UserRole.SCHOOL_ADMIN and current_user.school_id == school_id)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to export data for this school")
+    if not crud.school.get(db, id=school_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"School with ID {school_id} not found")
+
+def _export_response(
+    name: str, school_id: int, export_format: schemas.ExportFormat, query: Callable[[Session], ExportRows]
+) -> StreamingResponse:
+    """
+    Yanıt gövdesi üretilirken kendi oturumunu açar: istek oturumu (get_db) yanıt başlamadan
+    kapanabilir, dışa aktarma ise tüm gövde gönderilene kadar sürer.
+    """
+    def generate():
+        db = SessionLocal()
+        try:
+            export = query(db)
+            yield from stream_rows(export.columns, export.rows, export_format)
+        except Exception as e:
+            # Başlıklar gönderildikten sonra hata yanıtı dönülemez, gövde yarım kalır
+            logger.error(f"Export of {name} for school {school_id} failed: {e}", exc_info=False)
+            raise
+        finally:
+            db.close()
+
+    filename = f"school-{school_id}-{name}-{date.today().isoformat()}.{export_format.value}"
+    return StreamingResponse(
+        generate(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/students")
+async def export_students(
+    school_id: int, # Path'ten
+    format: schemas.ExportFormat = Query(schemas.ExportFormat.CSV),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Okulun tüm öğrencileri (sınıf adıyla). CSV veya JSON Lines, akış halinde.
+    - Yetki: SUPER_ADMIN veya o okulun SCHOOL_ADMIN'i.
+    """
+    _authorize_export(db, school_id, current_user)
+    return _export_response("students", school_id, format, lambda export_db: crud.export.students(export_db, school_id=school_id))
+
+@router.get("/parents")
+async def export_parents(
+    school_id: int, # Path'ten
+    format: schemas.ExportFormat = Query(schemas.ExportFormat.CSV),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Okuldaki öğrencilerin velileri; veli-öğrenci bağlantısı başına bir satır.
+    """
+    _authorize_export(db, school_id, current_user)
+    return _export_response("parents", school_id, format, lambda export_db: crud.export.parents(export_db, school_id=school_id))
+
+@router.get("/classes")
+async def export_classes(
+    school_id: int, # Path'ten
+    format: schemas.ExportFormat = Query(schemas.ExportFormat.CSV),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Okulun sınıfları, öğretmen adı ve öğrenci sayısıyla.
+    """
+    _authorize_export(db, school_id, current_user)
+    return _export_response("classes", school_id, format, lambda export_db: crud.export.classes(export_db, school_id=school_id))
+
+@router.get("/calls")
+async def export_call_history(
+    school_id: int, # Path'ten
+    format: schemas.ExportFormat = Query(schemas.ExportFormat.CSV),
+    date_from: Optional[date] = Query(None, description="Başlangıç tarihi (dahil)"),
+    date_to: Optional[date] = Query(None, description="Bitiş tarihi (dahil)"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Çağrı geçmişi (arşivlenmiş çağrılar dahil). Tarih verilmezse tüm geçmiş aktarılır.
+    """
+    _authorize_export(db, school_id, current_user)
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from must be before or equal to date_to")
+    return _export_response(
+        "calls", school_id, format,
+        lambda export_db: crud.export.calls(export_db, school_id=school_id, date_from=date_from, date_to=date_to)
+    )
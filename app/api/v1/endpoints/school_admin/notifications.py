@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import logging
 
 from app import crud, models, schemas
 from app.api.deps import get_db, get_current_active_user
+from app.core.notification_delivery import notification_delivery_queue
 
+logger = logging.getLogger(__name__)
 router = APIRouter(
     # prefix="/schools/{school_id}/notifications", # api_v1.py'de yönetilecek
     tags=["School Administration - Notifications"],
@@ -22,6 +25,18 @@ async def create_notification(
     Yeni bir bildirim oluşturur (belirli bir okul için).
     - Yetki: SCHOOL_ADMIN veya SUPER_ADMIN.
     """
+    _validate_new_notification(db, current_user, school_id, notification_in)
+
+    recipients = crud.notification.get_recipients(db, notification=notification_in)
+    db_notification = crud.notification.create_with_creator(db=db, obj_in=notification_in, creator_id=current_user.id, recipients=recipients)
+    # Push teslim kuyruğundan yapılır, istek fan-out'u beklemez
+    try:
+        await notification_delivery_queue.submit(db_notification, recipients)
+    except Exception as e:
+        logger.error(f"Error pushing notification {db_notification.id} over WebSocket: {e}")
+    return db_notification
+
+def _validate_new_notification(db: Session, current_user: models.User, school_id: int, notification_in: schemas.NotificationCreate) -> None:
     if not (current_user.role == schemas.UserRole.SUPER_ADMIN or 
             (current_user.role == schemas.UserRole.SCHOOL_ADMIN and current_user.school_id == school_id)):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to create notification in this school")
@@ -30,28 +45,78 @@ async def create_notification(
     if not db_school:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"School with ID {school_id} not found")
 
-    # NotificationCreate şemasında school_id ve created_by_user_id olduğunu varsayıyoruz.
     # Path'ten gelen school_id ile body'deki school_id eşleşmeli.
-    # created_by_user_id, current_user.id ile atanmalı.
     if notification_in.school_id != school_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="School ID in path and body must match.")
-    
-    # Update obj_in with current_user.id before creating
-    # Bunu crud.notification.create_with_creator gibi bir metoda devretmek daha iyi olabilir.
-    # obj_to_create = notification_in.copy(update={"created_by_user_id": current_user.id})
 
-    if notification_in.target_user_id:
-        target_user = crud.user.get(db, id=notification_in.target_user_id)
+    if notification_in.recipient_user_id:
+        target_user = crud.user.get(db, id=notification_in.recipient_user_id)
         if not target_user or target_user.school_id != school_id:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Target user {notification_in.target_user_id} not found or not in school {school_id}")
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Target user {notification_in.recipient_user_id} not found or not in school {school_id}")
     
-    if notification_in.target_class_id:
-        target_class = crud.class_.get_by_id_and_school_id(db, class_id=notification_in.target_class_id, school_id=school_id)
+    if notification_in.recipient_class_id:
+        target_class = crud.class_.get_by_id_and_school_id(db, class_id=notification_in.recipient_class_id, school_id=school_id)
         if not target_class:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Target class {notification_in.target_class_id} not found in school {school_id}")
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Target class {notification_in.recipient_class_id} not found in school {school_id}")
 
-    return crud.notification.create_with_creator(db=db, obj_in=notification_in, creator_id=current_user.id)
+@router.post("/scheduled", response_model=schemas.ScheduledNotification, status_code=status.HTTP_201_CREATED)
+async def schedule_notification(
+    school_id: int, # Path'ten
+    notification_in: schemas.NotificationScheduleCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Bildirimi ileri bir tarihte gönderilmek üzere planlar. Gönderim zamanı gelene kadar
+    kimsenin gelen kutusunda görünmez; alıcılar gönderim anında belirlenir.
+    - Yetki: SCHOOL_ADMIN veya SUPER_ADMIN.
+    """
+    _validate_new_notification(db, current_user, school_id, notification_in)
+    return crud.notification.create_scheduled(db, obj_in=notification_in, creator_id=current_user.id)
 
+@router.get("/scheduled", response_model=List[schemas.ScheduledNotification])
+async def list_scheduled_notifications(
+    school_id: int, # Path'ten
+    pending_only: bool = True,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Okulun planlı bildirimleri (varsayılan: henüz gönderilmemiş olanlar), gönderim zamanına göre.
+    """
+    if not (current_user.role == schemas.UserRole.SUPER_ADMIN or 
+            (current_user.role == schemas.UserRole.SCHOOL_ADMIN and current_user.school_id == school_id)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view scheduled notifications for this school")
+    return crud.notification.get_scheduled_for_school(db, school_id=school_id, pending_only=pending_only, skip=skip, limit=limit)
+
+@router.delete("/scheduled/{scheduled_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_scheduled_notification(
+    school_id: int, # Path'ten
+    scheduled_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Henüz gönderilmemiş planlı bildirimi iptal eder.
+    """
+    if not (current_user.role == schemas.UserRole.SUPER_ADMIN or 
+            (current_user.role == schemas.UserRole.SCHOOL_ADMIN and current_user.school_id == school_id)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to cancel scheduled notifications for this school")
+    if not crud.notification.cancel_scheduled(db, scheduled_id=scheduled_id, school_id=school_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scheduled notification not found or already sent")
+
+
+def _can_access_school_notifications(db: Session, current_user: models.User, school_id: int) -> bool:
+    if current_user.role == schemas.UserRole.SUPER_ADMIN:
+        return True
+    if getattr(current_user, 'school_id', None) == school_id:
+        return True
+    if current_user.role == schemas.UserRole.PARENT:
+        students_of_parent = crud.student.get_multi_by_parent(db, parent_id=current_user.id)
+        return any(s.school_id == school_id for s in students_of_parent)
+    return False
 
 @router.get("/user/me", response_model=List[schemas.Notification])
 async def get_my_notifications_for_school(
@@ -66,49 +131,67 @@ async def get_my_notifications_for_school(
     Giriş yapmış kullanıcının belirli bir okuldaki bildirimlerini listeler.
     """
     # Okul yetki kontrolü
-    user_school_id = getattr(current_user, 'school_id', None)
-    can_access_school_notifications = False
-    if current_user.role == schemas.UserRole.SUPER_ADMIN:
-        can_access_school_notifications = True
-    elif user_school_id == school_id:
-        can_access_school_notifications = True
-    elif current_user.role == schemas.UserRole.PARENT:
-        students_of_parent = crud.student.get_students_by_parent_user_id(db, parent_user_id=current_user.id)
-        if any(s.school_id == school_id for s in students_of_parent):
-            can_access_school_notifications = True
-
-    if not can_access_school_notifications:
+    if not _can_access_school_notifications(db, current_user, school_id):
          raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access notifications for this school")
     
-    # Öğrencinin sınıf ID'lerini al (eğer varsa ve o okuldaysa)
-    user_class_ids = []
-    if hasattr(current_user, 'students'): # Eğer user objesinde student ilişkisi varsa
-        user_class_ids = [s.class_id for s in current_user.students if s.class_id and s.school_id == school_id]
-    elif current_user.role == schemas.UserRole.STUDENT and hasattr(current_user, 'student_profile') and current_user.student_profile.school_id == school_id:
-        # Eğer user bir öğrenciyse ve student_profile üzerinden class_id'ye erişilebiliyorsa
-        user_class_ids = [current_user.student_profile.class_id] if current_user.student_profile.class_id else []
-    
-    # Öğretmenin sınıf ID'lerini al (eğer varsa ve o okuldaysa)
-    if current_user.role == schemas.UserRole.TEACHER and hasattr(current_user, 'teacher_profile') and current_user.teacher_profile.school_id == school_id:
-        # Öğretmenin sorumlu olduğu sınıflar (Class modelinde teacher_id üzerinden)
-        teacher_classes = crud.class_.get_multi_by_teacher_id(db, teacher_id=current_user.teacher_profile.id, school_id=school_id)
-        user_class_ids.extend([c.id for c in teacher_classes])
+    # Velinin çocuklarının / öğretmenin sorumlu olduğu sınıflar (sınıfa özel bildirimler için)
+    user_class_ids = crud.notification.get_user_class_ids(db, user_id=current_user.id, school_id=school_id)
 
     notifications = crud.notification.get_for_user(
         db, 
         user_id=current_user.id, 
         school_id=school_id, 
         user_role=current_user.role, 
-        user_class_ids=list(set(user_class_ids)), # Benzersiz sınıf ID'leri
+        user_class_ids=user_class_ids,
         skip=skip, 
         limit=limit,
         unread_only=unread_only
     )
     return notifications
 
+@router.get("/user/me/unread-count", response_model=schemas.NotificationUnreadCount)
+async def get_my_unread_notification_count(
+    school_id: int, # Path'ten
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Giriş yapmış kullanıcının bu okuldaki okunmamış bildirim sayısı.
+    Mobil uygulamanın sık yoklaması için: yetki kontrolünden sonra sayaç bellekten veya tek satırlık cursor'dan okunur.
+    """
+    # Yetki her istekte kontrol edilir: önbellekteki sayaç, erişimi sonradan kalkmış kullanıcıya dönmemeli
+    if not _can_access_school_notifications(db, current_user, school_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access notifications for this school")
+    return schemas.NotificationUnreadCount(
+        school_id=school_id,
+        unread_count=crud.notification.get_unread_count_cached(db, user_id=current_user.id, school_id=school_id),
+    )
+
+@router.post("/user/me/mark-as-read", response_model=schemas.NotificationUnreadCount)
+async def mark_my_notifications_as_read(
+    school_id: int, # Path'ten
+    mark_in: schemas.NotificationBulkMarkRead,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Birden çok bildirimi (id listesi) veya bir zamana kadar gönderilmiş tüm bildirimleri
+    ("tümünü okundu say" için before=şimdi) tek seferde okundu olarak işaretler.
+    """
+    if mark_in.notification_ids is None and mark_in.before is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Either notification_ids or before must be provided.")
+    if not _can_access_school_notifications(db, current_user, school_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access notifications for this school")
+
+    cursor = crud.notification.mark_notifications_as_read(
+        db, user_id=current_user.id, school_id=school_id,
+        notification_ids=mark_in.notification_ids, before=mark_in.before
+    )
+    return schemas.NotificationUnreadCount(school_id=school_id, unread_count=cursor.unread_count)
+
 # Bu path'i /notifications/{notification_id}/mark-as-read olarak ana api_v1.py'de handle etmek daha uygun olabilir.
 # Şimdilik /school-admin prefix'i altında kalacak şekilde güncelliyorum.
-@router.post("/{notification_id}/mark-as-read", response_model=schemas.NotificationReadStatus)
+@router.post("/{notification_id}/mark-as-read", response_model=schemas.NotificationMarkReadResult)
 async def mark_notification_as_read(
     school_id: int, # school_id path'ten geliyor, bu endpoint için gerekliliği tartışılabilir.
     notification_id: int,
@@ -127,14 +210,21 @@ async def mark_notification_as_read(
     # Şimdilik basitçe, bildirimin okulunun kullanıcının okuluyla eşleşip eşleşmediğini kontrol edebiliriz (SUPER_ADMIN hariç).
     if current_user.role != schemas.UserRole.SUPER_ADMIN and db_notification.school_id != current_user.school_id:
         # Daha detaylı: Kullanıcı bu bildirimin hedefi mi (user_id, class_id, genel bildirim)?
-        # Bu kontrolü crud.notification_read_status.mark_as_read içine taşımak daha iyi olabilir.
+        # Bu kontrolü crud.notification.mark_notification_as_read içine taşımak daha iyi olabilir.
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to mark this notification as read for this school.")
     
     # school_id parametresi aslında db_notification.school_id'den doğrulanabilir.
     if db_notification.school_id != school_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Notification does not belong to the specified school path.")
 
-    return crud.notification_read_status.mark_as_read(db, notification_id=notification_id, user_id=current_user.id)
+    user_class_ids = crud.notification.get_user_class_ids(db, user_id=current_user.id, school_id=school_id)
+    crud.notification.mark_notification_as_read(
+        db, notification_id=notification_id, user_id=current_user.id, school_id=school_id, class_ids=user_class_ids
+    )
+    return schemas.NotificationMarkReadResult(
+        notification_id=notification_id,
+        unread_count=crud.notification.get_unread_count_cached(db, user_id=current_user.id, school_id=school_id),
+    )
 
 @router.get("/all", response_model=List[schemas.Notification])
 async def get_all_notifications_for_school_admin(
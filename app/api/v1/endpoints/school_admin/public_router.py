@@ -40,10 +40,10 @@ def public_get_school_by_unique_code_no_auth(
     db: Session = Depends(get_db)
 ):
     """Fetch a school by its unique_code. Public access."""
-    logger.debug(f"Attempting to find school with unique_code: {unique_code}") # print yerine logger.debug
+    logger.debug("Attempting to find school with unique_code: %s", unique_code) # print yerine logger.debug
     db_school = crud.get_school_by_unique_code(db, unique_code=unique_code)
     if db_school is None:
         logger.warning(f"School with unique_code '{unique_code}' NOT FOUND in DB.") # print yerine logger.warning
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"School with unique code '{unique_code}' not found for public access.")
-    logger.debug(f"School FOUND: {db_school.name if db_school else 'N/A'}") # print yerine logger.debug
+    logger.debug("School FOUND: %s", db_school.name if db_school else 'N/A') # print yerine logger.debug
     return db_school 
\ No newline at end of file
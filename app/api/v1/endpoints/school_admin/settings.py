@@ -6,6 +6,7 @@ import logging # Loglama için eklendi
 from app import crud, models, schemas
 from app.dependencies import get_db, get_current_active_user
 from app.core.config import settings as app_global_settings
+from app.core.lookup_cache import lookup_cache_stats
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -40,6 +41,18 @@ async def get_location_config(
         max_distance_meters=app_global_settings.MAX_DISTANCE_METERS
     )
 
+@router.get("/cache-stats", response_model=List[schemas.CacheStats])
+async def get_lookup_cache_stats(
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Okul/sınıf arama önbelleklerinin (bu worker için) isabet/kaçırma sayıları ve doluluğu.
+    - Yetki: Sadece SUPER_ADMIN.
+    """
+    if current_user.role != schemas.UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    return lookup_cache_stats()
+
 # --- Okul Bazlı Ayarlar (SchoolSettings) --- #
 # Bu endpoint'ler okul bazlı ayarları yönetmek için eklenebilir.
 # crud.py ve models.py'de SchoolSettings için yapılar oluşturulmalı.
@@ -78,7 +91,7 @@ def create_or_update_school_app_settings(
     )
     # db.add ... db.commit ... db.refresh ... işlemleri crud'da olacak
     # Bu sadece bir placeholder
-    logger.info(f"[INFO] Placeholder: School {school_id} settings for key '{settings_in.setting_key}' would be set to '{settings_in.setting_value}'. User: {current_user.username}")
+    logger.info("[INFO] Placeholder: School %s settings for key '%s' would be set to '%s'. User: %s", school_id, settings_in.setting_key, settings_in.setting_value, current_user.username)
     # raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="School specific settings CRUD not yet implemented.")
     return dummy_response # DUMMY
 
@@ -100,7 +113,7 @@ def get_school_app_setting(
     # if not db_setting:
     #     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Setting '{setting_key}' not found for school {school_id}")
     # return db_setting
-    logger.info(f"[INFO] Placeholder: Reading setting '{setting_key}' for school {school_id}. User: {current_user.username}")
+    logger.info("[INFO] Placeholder: Reading setting '%s' for school %s. User: %s", setting_key, school_id, current_user.username)
     # raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="School specific settings CRUD not yet implemented.")
     return None # DUMMY
 
@@ -120,6 +133,6 @@ def get_all_school_app_settings(
     
     # settings_list = crud.get_all_school_settings(db, school_id=school_id)
     # return settings_list
-    logger.info(f"[INFO] Placeholder: Listing all settings for school {school_id}. User: {current_user.username}")
+    logger.info("[INFO] Placeholder: Listing all settings for school %s. User: %s", school_id, current_user.username)
     # raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="School specific settings CRUD not yet implemented.")
     return [] # DUMMY 
\ No newline at end of file
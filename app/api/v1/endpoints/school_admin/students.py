@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, File, Form, UploadFile
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 
 from app import crud, models, schemas
 from app.api.deps import get_db, get_current_active_user
+from app.core.roster_import import RosterFormatError, iter_roster_rows
+from app.core.serialization import FastJSONResponse
 
 router = APIRouter(
     # prefix="/schools/{school_id}/students", # Bu prefix api_v1.py'de yönetilecek
@@ -55,7 +58,63 @@ async def create_student_for_school(
     if student_in.school_id != school_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="School ID in path and body must match.")
 
-    return crud.student.create(db=db, obj_in=student_in)
+    new_student = crud.student.create(db=db, obj_in=student_in)
+    return new_student
+
+@router.post("/import", response_model=schemas.RosterImportResult)
+async def import_student_roster(
+    school_id: int, # Path parametresi
+    file: UploadFile = File(..., description="CSV (UTF-8, ',' veya ';' ayraçlı) veya .xlsx öğrenci listesi"),
+    default_parent_password: Optional[str] = Form(None, description="Dosyada parent_password yoksa yeni velilerin ilk şifresi"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Öğrenci, veli ve sınıfları bir dosyadan toplu olarak aktarır.
+    - Kolonlar: student_number, student_full_name (zorunlu), class_name, parent_full_name,
+      parent_username, parent_phone, parent_email, parent_password.
+    - Olmayan sınıflar oluşturulur, mevcut öğrenci/veliler yeniden oluşturulmaz (sadece bağlanır).
+    - Hatalı satırlar atlanır ve yanıtta satır numarasıyla listelenir.
+    - Yetki: Sadece o okulun SCHOOL_ADMIN'i veya SUPER_ADMIN.
+    """
+    if not (current_user.role == schemas.UserRole.SUPER_ADMIN or 
+            (current_user.role == schemas.UserRole.SCHOOL_ADMIN and current_user.school_id == school_id)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to import students in this school")
+
+    db_school = crud.school.get(db, id=school_id)
+    if not db_school:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"School with ID {school_id} not found")
+
+    # Dosya parça parça okunup yazılır; event loop'u bloklamamak için thread pool'da çalışır
+    try:
+        result = await run_in_threadpool(
+            crud.roster.import_rows, db, school_id=school_id,
+            rows=iter_roster_rows(file.file, file.filename), default_parent_password=default_parent_password
+        )
+    except RosterFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return result
+
+@router.post("/parent-links", response_model=schemas.ParentStudentBulkLinkResult, tags=["School Administration - Students", "Student-Parent Relations"])
+async def bulk_link_parents_to_students(
+    school_id: int, # Path parametresi
+    links_in: schemas.ParentStudentBulkLink,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Çok sayıda öğrenci-veli bağlantısını tek istekte ekler.
+    - Öğrenci numarası ile öğrenci, kullanıcı adı veya telefon numarası ile veli bulunur.
+    - Zaten bağlı olan çiftler sayılır ve atlanır; bulunamayanlar conflicts listesinde döner.
+    - Yetki: SCHOOL_ADMIN veya SUPER_ADMIN.
+    """
+    if not (current_user.role == schemas.UserRole.SUPER_ADMIN or 
+            (current_user.role == schemas.UserRole.SCHOOL_ADMIN and current_user.school_id == school_id)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized for this operation")
+    if not crud.school.get(db, id=school_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"School with ID {school_id} not found")
+
+    return await run_in_threadpool(crud.parent_student_relation.bulk_link, db, school_id=school_id, items=links_in.links)
 
 @router.get("/{student_id}", response_model=schemas.Student)
 async def read_student(
@@ -127,10 +186,9 @@ async def read_students_for_school(
         if not db_class:
              raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Class with ID {class_id} not found in school {school_id}")
 
-    students = crud.student.get_multi_by_school_and_optional_class(
-        db, school_id=school_id, class_id=class_id, skip=skip, limit=limit
-    )
-    return students
+    # Hazır dict'ler doğrudan JSON'a yazılır; response_model doğrulaması atlanır (bkz. FastJSONResponse)
+    students = crud.student.get_rows_by_school(db, school_id=school_id, class_id=class_id, skip=skip, limit=limit)
+    return FastJSONResponse(students)
 
 @router.put("/{student_id}", response_model=schemas.Student)
 async def update_student(
@@ -171,7 +229,8 @@ async def update_student(
             
     # StudentUpdate şemasında school_id olmamalı veya değiştirilmemeli.
     # CRUDStudent.update metodu db_obj ve obj_in alacak şekilde güncellenmeli.
-    return crud.student.update(db=db, db_obj=db_student, obj_in=student_update_in)
+    updated_student = crud.student.update(db=db, db_obj=db_student, obj_in=student_update_in)
+    return updated_student
 
 @router.delete("/{student_id}", response_model=schemas.Student)
 async def delete_student(
@@ -315,7 +374,7 @@ async def get_parents_of_student(
     if not can_access:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this student's parents")
 
-    parents = crud.parent_student_relation.get_parents_of_student(db, student_id=student_id)
+    parents = crud.parent_student_relation.get_parents_of_student(db, student_id=student_id, school_id=school_id)
     return parents
 
 # Bu endpoint /users/me/children altına taşındı.
@@ -51,7 +51,8 @@ async def create_teacher(
     #         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, 
     #                             detail=f"Teacher with email {teacher_in.email} already exists in this school.")
 
-    return crud.teacher.create(db=db, obj_in=teacher_in)
+    new_teacher = crud.teacher.create(db=db, obj_in=teacher_in)
+    return new_teacher
 
 @router.get("/{teacher_id}", response_model=schemas.Teacher)
 async def read_teacher(
@@ -121,7 +122,8 @@ async def update_teacher(
     #         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, 
     #                             detail=f"Teacher with email {teacher_update_in.email} already exists in this school.")
             
-    return crud.teacher.update(db=db, db_obj=db_teacher, obj_in=teacher_update_in)
+    updated_teacher = crud.teacher.update(db=db, db_obj=db_teacher, obj_in=teacher_update_in)
+    return updated_teacher
 
 @router.delete("/{teacher_id}", response_model=schemas.Teacher)
 async def delete_teacher(
@@ -1,14 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import os
-import shutil
-from pathlib import Path
 import logging
 
 from app import crud, models, schemas
 from app.api.deps import get_db, get_current_active_user
 from app.core import security
+from app.core.profile_pictures import ProfilePictureError, remove_profile_picture_files, store_profile_picture
 
 users_router = APIRouter()
 
@@ -70,11 +68,9 @@ async def read_all_users_admin(
     db: Session = Depends(get_db),
     current_admin: models.User = Depends(get_current_active_user)
 ):
-    logger.info(f"[API] read_all_users_admin çağrıldı. school_id: {school_id}, role: {role.value if role else 'None'}")
     users = crud.user.get_multi_filtered(
         db, skip=skip, limit=limit, school_id=school_id, role=role.value if role else None
     )
-    logger.info(f"[API] get_multi_filtered {len(users)} kullanıcı döndürdü.")
     return users
 
 @users_router.post("/list-all", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
@@ -86,8 +82,6 @@ async def create_user_admin(
     """
     Create a new user (admin context).
     """
-    logger.info(f"[API] create_user_admin çağrıldı. username: {user_in.username}, role: {user_in.role}")
-    
     # Check if username exists
     db_user_by_username = crud.user.get_by_username(db, username=user_in.username)
     if db_user_by_username:
@@ -101,7 +95,7 @@ async def create_user_admin(
     
     # Create user
     created_user = crud.user.create(db=db, obj_in=user_in)
-    logger.info(f"[API] User created with ID: {created_user.id}")
+    logger.info("[API] User %s created by admin %s", created_user.id, current_admin.id, extra={"user_id": created_user.id, "role": created_user.role})
     return created_user
 
 @users_router.get("/{user_id}", response_model=schemas.User)
@@ -151,90 +145,45 @@ async def get_students_for_specific_user_admin_context(
     students = crud.parent_student_relation.get_students_of_parent(db, parent_user_id=user_id)
     return students if students else []
 
-BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
-STATIC_DIR = BASE_DIR / "static"
-UPLOAD_PROFILE_PICS_DIR = STATIC_DIR / "profile_pics"
+async def _replace_profile_picture(db: Session, user: models.User, file: UploadFile) -> models.User:
+    try:
+        stored = await store_profile_picture(file.file)
+    except ProfilePictureError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except OSError as e:
+        logger.error(f"Dosya kaydedilirken bir hata oluştu: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Dosya kaydedilemedi.")
+    finally:
+        await file.close()
 
-def ensure_upload_dirs_exist():
-    if not STATIC_DIR.exists(): STATIC_DIR.mkdir(parents=True, exist_ok=True)
-    if not UPLOAD_PROFILE_PICS_DIR.exists(): UPLOAD_PROFILE_PICS_DIR.mkdir(parents=True, exist_ok=True)
+    old_profile_image_url = user.profile_image_url
+    updated_user = crud.user.set_profile_picture(
+        db, db_obj=user, profile_image_url=stored.url, profile_thumbnail_url=stored.thumbnail_url
+    )
+    if old_profile_image_url and old_profile_image_url != stored.url and \
+            not crud.user.is_profile_image_in_use(db, url=old_profile_image_url, exclude_user_id=user.id):
+        remove_profile_picture_files(old_profile_image_url)
+    return updated_user
 
 @users_router.post("/me/profile-picture", response_model=schemas.User)
 async def upload_profile_picture_for_current_user_admin(
-    file: UploadFile = File(..., description="Yüklenecek profil resmi (JPEG, PNG)"),
+    file: UploadFile = File(..., description="Yüklenecek profil resmi (JPEG, PNG, WebP)"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    ensure_upload_dirs_exist()
-    file_extension = Path(file.filename).suffix.lower()
-    if file_extension not in [".jpg", ".jpeg", ".png"]:
-        raise HTTPException(status_code=400, detail="Desteklenmeyen dosya türü. Sadece JPG veya PNG.")
-    
-    if current_user.profile_image_url:
-        try:
-            old_file_path_relative = current_user.profile_image_url.replace("/static/", "", 1)
-            old_file_path_absolute = STATIC_DIR / old_file_path_relative
-            if old_file_path_absolute.exists() and old_file_path_absolute.is_file():
-                old_file_path_absolute.unlink()
-        except Exception as e:
-            logger.error(f"Eski profil resmi silinirken hata: {e}", exc_info=True)
-
-    new_filename = f"user_{current_user.id}_{Path(file.filename).stem}_{os.urandom(4).hex()}{file_extension}"
-    file_path = UPLOAD_PROFILE_PICS_DIR / new_filename
-    try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception as e:
-        logger.error(f"Dosya kaydedilirken bir hata oluştu: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail="Dosya kaydedilemedi.")
-    finally:
-        file.file.close()
-
-    profile_image_url_for_db = f"/static/profile_pics/{new_filename}"
-    user_update_schema = schemas.UserUpdate(profile_image_url=profile_image_url_for_db)
-    updated_user = crud.user.update(db, db_obj=current_user, obj_in=user_update_schema)
-    return updated_user
+    return await _replace_profile_picture(db, current_user, file)
 
 @users_router.post("/{user_id}/profile-picture", response_model=schemas.User)
 async def upload_profile_picture_for_user_admin(
     user_id: int,
-    file: UploadFile = File(..., description="Yüklenecek profil resmi (JPEG, PNG)"),
+    file: UploadFile = File(..., description="Yüklenecek profil resmi (JPEG, PNG, WebP)"),
     db: Session = Depends(get_db),
     current_admin: models.User = Depends(get_current_active_user)
 ):
     target_user = crud.user.get(db, id=user_id)
     if not target_user:
         raise HTTPException(status_code=404, detail="Hedef kullanıcı bulunamadı.")
-
-    ensure_upload_dirs_exist()
-    file_extension = Path(file.filename).suffix.lower()
-    if file_extension not in [".jpg", ".jpeg", ".png"]:
-        raise HTTPException(status_code=400, detail="Desteklenmeyen dosya türü. Sadece JPG veya PNG.")
-
-    if target_user.profile_image_url:
-        try:
-            old_file_path_relative = target_user.profile_image_url.replace("/static/", "", 1)
-            old_file_path_absolute = STATIC_DIR / old_file_path_relative
-            if old_file_path_absolute.exists() and old_file_path_absolute.is_file():
-                old_file_path_absolute.unlink()
-        except Exception as e:
-            logger.error(f"Eski profil resmi silinirken hata: {e}", exc_info=True)
-
-    new_filename = f"user_{target_user.id}_{Path(file.filename).stem}_{os.urandom(4).hex()}{file_extension}"
-    file_path = UPLOAD_PROFILE_PICS_DIR / new_filename
-    try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception as e:
-        logger.error(f"Dosya kaydedilirken bir hata oluştu: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail="Dosya kaydedilemedi.")
-    finally:
-        file.file.close()
-
-    profile_image_url_for_db = f"/static/profile_pics/{new_filename}"
-    user_update_schema = schemas.UserUpdate(profile_image_url=profile_image_url_for_db)
-    updated_user = crud.user.update(db, db_obj=target_user, obj_in=user_update_schema)
-    return updated_user
+    return await _replace_profile_picture(db, target_user, file)
 
 @users_router.delete("/{user_id}", response_model=schemas.User)
 async def delete_user_by_id_admin(
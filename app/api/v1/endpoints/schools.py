@@ -7,6 +7,7 @@ from app import schemas
 from app.crud import crud_school, crud_class, crud
 from app.db.database import get_db
 from app.api import deps
+from app.core.serialization import FastJSONResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -19,11 +20,11 @@ def get_school_by_unique_code(
     """
     Get school by unique code (public endpoint - no authentication required).
     """
-    logger.debug(f"Looking for school with unique_code: '{unique_code}'")
+    logger.debug("Looking for school with unique_code: '%s'", unique_code)
     school = crud_school.get_school_by_unique_code(db, unique_code=unique_code)
-    logger.debug(f"School found from crud: {school is not None}")
+    logger.debug("School found from crud: %s", school is not None)
     if school:
-        logger.debug(f"School details: id={school.id}, name='{school.name}', unique_code='{school.unique_code}'")
+        logger.debug("School details: id=%s, name='%s', unique_code='%s'", school.id, school.name, school.unique_code)
     if not school:
         logger.warning(f"School not found with unique_code '{unique_code}', raising 404")
         raise HTTPException(status_code=404, detail="School not found")
@@ -123,8 +124,8 @@ def read_school_students(
     if not (current_user.role == schemas.UserRole.SUPER_ADMIN) and current_user.school_id != school_id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    students = crud.student.get_multi_by_school(db, school_id=school_id, skip=skip, limit=limit)
-    return students
+    students = crud.student.get_rows_by_school(db, school_id=school_id, skip=skip, limit=limit)
+    return FastJSONResponse(students) # response_model doğrulaması atlanır, satırlar zaten şema şeklinde
 
 @router.get("/{school_id}/teachers/", response_model=List[schemas.Teacher])
 def read_school_teachers(
@@ -2,7 +2,18 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query, H
 from typing import List, Optional
 import logging # Loglama için eklendi
 
+from jose import JWTError, jwt
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app import crud, models, schemas
+from app.core import security
 from app.core.connection_manager import manager
+from app.core.location import get_school_geofence
+from app.core.pickup_tracker import pickup_tracker
+from app.db.database import SessionLocal
+from app.models.call import CallStatusEnum
+from app.models.student import Student
 # from app.schemas.schemas import Cagri # Kullanılmadığı için kaldırıldı
 import json
 from app.core.config import settings
@@ -28,16 +39,163 @@ async def websocket_endpoint(websocket: WebSocket, sinif_adi: str, token: str =
     try:
         while True:
             data = await websocket.receive_text()
-            logger.debug(f"Message received from {sinif_adi} - {websocket.client}: {data}") # print yerine logger.debug
+            logger.debug("Message received from %s - %s: %s", sinif_adi, websocket.client, data) # print yerine logger.debug
             # Gelen mesajı işle veya diğer istemcilere yayınla (örnek)
             # await manager.broadcast_to_class(sinif_adi, f"Mesaj ({sinif_adi}): {data}", exclude_self=websocket)
     except WebSocketDisconnect:
         manager.disconnect(sinif_adi, websocket)
-        logger.info(f"Client {websocket.client} disconnected from class {sinif_adi}") # print yerine logger.info
+        logger.info("Client %s disconnected from class %s", websocket.client, sinif_adi) # print yerine logger.info
     except Exception as e:
         logger.error(f"Error in WebSocket for class {sinif_adi}, client {websocket.client}: {e}", exc_info=True) # print yerine logger.error
         manager.disconnect(sinif_adi, websocket) # Hata durumunda da disconnect çağır
         try:
             await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
         except RuntimeError: # Already closed
-            pass # Girinti hatasını düzeltmek için pass eklendi 
\ No newline at end of file
+            pass # Girinti hatasını düzeltmek için pass eklendi 
+
+def get_user_from_ws_token(db, token: Optional[str]) -> Optional[models.User]:
+    """
+    WebSocket bağlantıları header gönderemediği için JWT query parametresi ile gelir.
+    deps.get_current_user ile aynı doğrulama; geçersizse None döner.
+    """
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+        token_data = schemas.TokenData(**payload)
+    except (JWTError, ValidationError):
+        return None
+    if token_data.user_id is None:
+        return None
+    user = crud.user.get(db, id=token_data.user_id)
+    if not user or not user.is_active:
+        return None
+    return user
+
+def _load_trackable_call(token: Optional[str], call_id: int) -> Optional[dict]:
+    # Bağlantı boyunca session açık tutulmaz; doğrulama için kısa ömürlü bir session kullanılır
+    db = SessionLocal()
+    try:
+        user = get_user_from_ws_token(db, token)
+        if not user or user.role != models.UserRoleEnum.PARENT:
+            return None
+        db_call = crud.call.get_call_with_details(db, call_id=call_id)
+        if not db_call or db_call.parent_user_id != user.id:
+            return None
+        if db_call.status not in (CallStatusEnum.PENDING, CallStatusEnum.ACKNOWLEDGED):
+            return None
+
+        geofence = get_school_geofence(db_call.school) if db_call.school else None
+        school_center = (geofence.center_latitude, geofence.center_longitude) if geofence \
+            else (settings.SCHOOL_LATITUDE, settings.SCHOOL_LONGITUDE)
+        return {
+            "call_id": db_call.id,
+            "school_id": db_call.school_id,
+            "class_id": db_call.class_id,
+            "student_id": db_call.student_id,
+            "parent_user_id": user.id,
+            "school_center": school_center,
+            "class_name": db_call.class_.class_name if db_call.class_ else f"class_id_{db_call.class_id}",
+        }
+    finally:
+        db.close()
+
+def pickup_queue_message(school_id: int, class_id: int) -> str:
+    queue = [
+        schemas.PickupQueueEntry.model_validate(tracked).model_dump(mode="json")
+        for tracked in pickup_tracker.get_class_queue(school_id, class_id)
+    ]
+    return json.dumps({"type": "pickup_queue", "class_id": class_id, "data": queue})
+
+@router.websocket("/calls/{call_id}/location")
+async def parent_location_stream(websocket: WebSocket, call_id: int, token: Optional[str] = Query(None)):
+    """
+    Velinin uygulaması, aktif çağrısı için konumunu bu bağlantı üzerinden akıtır:
+    {"latitude": .., "longitude": ..}. Her güncellemeye tahmini varış süresi ile yanıt verilir;
+    sınıf ekranına ETA sırasına göre kuyruk (hız sınırlı) gönderilir. Konumlar veritabanına yazılmaz.
+    """
+    call_info = await run_in_threadpool(_load_trackable_call, token, call_id)
+    if not call_info:
+        logger.warning(f"Location stream denied for call {call_id}, client {websocket.client}: invalid token or call not trackable")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    class_name = call_info.pop("class_name")
+    tracked = pickup_tracker.register(**call_info)
+    await websocket.accept()
+    try:
+        while True:
+            data = await websocket.receive_text()
+            try:
+                location = schemas.PickupLocationUpdate.model_validate_json(data)
+            except ValidationError:
+                logger.debug("Invalid location message for call %s: %s", call_id, data)
+                continue
+
+            if pickup_tracker.update_position(call_id, location.latitude, location.longitude) is None:
+                # Çağrı bu arada tamamlandı veya iptal edildi
+                await websocket.close(code=status.WS_1000_NORMAL_CLOSURE)
+                return
+            await websocket.send_text(json.dumps({
+                "type": "eta", "call_id": call_id,
+                "distance_meters": tracked.distance_meters, "eta_seconds": tracked.eta_seconds,
+            }))
+            if pickup_tracker.should_broadcast(tracked.school_id, tracked.class_id):
+                await manager.broadcast_to_class(class_name, pickup_queue_message(tracked.school_id, tracked.class_id))
+    except WebSocketDisconnect:
+        logger.info("Location stream for call %s disconnected", call_id)
+    except Exception as e:
+        logger.error(f"Error in location stream for call {call_id}: {e}", exc_info=True)
+        try:
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        except RuntimeError:
+            pass
+    finally:
+        if tracked.latitude is None:
+            # Hiç konum göndermeden ayrıldıysa kuyrukta tutmaya gerek yok
+            pickup_tracker.remove(call_id)
+
+def _load_user_channel(token: Optional[str]) -> Optional[tuple]:
+    db = SessionLocal()
+    try:
+        user = get_user_from_ws_token(db, token)
+        if not user:
+            return None
+        school_ids = {user.school_id} if user.school_id else set()
+        if user.role == models.UserRoleEnum.PARENT:
+            school_ids.update(
+                school_id for (school_id,) in
+                db.query(Student.school_id).join(Student.parents).filter(models.User.id == user.id).distinct()
+            )
+        return user.id, school_ids
+    finally:
+        db.close()
+
+@router.websocket("/users/me")
+async def user_notification_channel(websocket: WebSocket, token: Optional[str] = Query(None)):
+    """
+    Kullanıcıya özel kanal (veli ve personel): yeni bildirimler anında gönderilir
+    ({"type": "notification", "data": {...}}), /user/me'yi sürekli yoklamaya gerek kalmaz.
+    Kullanıcı, okulunun ve (veliyse) çocuklarının okullarının okul geneli bildirimlerini alır.
+    """
+    channel = await run_in_threadpool(_load_user_channel, token)
+    if not channel:
+        logger.warning(f"User channel denied for client {websocket.client}: invalid or missing token")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    user_id, school_ids = channel
+    await manager.connect_user(user_id, school_ids, websocket)
+    try:
+        while True:
+            await websocket.receive_text() # İstemci mesajları (ping vb.) yok sayılır
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Error in user channel for user {user_id}: {e}", exc_info=True)
+        try:
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        except RuntimeError:
+            pass
+    finally:
+        manager.disconnect_user(user_id, websocket)
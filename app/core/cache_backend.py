@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class NamespaceStats:
+    __slots__ = ("hits", "misses", "evictions", "expirations")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+class CacheBackend(ABC):
+    """
+    Uygulamadaki önbelleklerin (arama, okunmamış sayacı, public yanıtlar) ortak deposu.
+    Değerler ad alanı (namespace) + anahtar ile tutulur; delete/clear çağrıları diğer
+    worker'lara da yayınlanır ki her süreç kendi kopyasını düşürsün. Anahtarlar yayın için
+    JSON'a çevrilebilir olmalıdır (int, str veya bunlardan oluşan tuple).
+    """
+
+    @abstractmethod
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, namespace: str, key: Hashable, value: Any, ttl_seconds: float, max_entries: Optional[int] = None) -> None:
+        """max_entries verilirse ad alanı bu boyutu aşınca en az kullanılan kayıt atılır (LRU)."""
+
+    @abstractmethod
+    def delete(self, namespace: str, *keys: Hashable) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self, namespace: str) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self, namespace: str) -> Tuple[int, NamespaceStats]:
+        """Bu süreçteki kayıt sayısı ve sayaçlar."""
+
+    def start(self) -> None:
+        """Diğer süreçlerden gelen silme mesajlarını dinlemeye başlar (gerekiyorsa)."""
+
+    def close(self) -> None:
+        ...
+
+class InMemoryCacheBackend(CacheBackend):
+    """Tek süreçlik depo; silmeler sadece bu süreci etkiler. Tek worker ve script'ler için."""
+
+    def __init__(self):
+        self._namespaces: Dict[str, "OrderedDict[Hashable, Tuple[Any, float]]"] = {}
+        self._stats: Dict[str, NamespaceStats] = {}
+        self._lock = threading.Lock() # Senkron endpoint'ler ve arka plan işleri threadpool'da çalışır
+
+    def _namespace_stats(self, namespace: str) -> NamespaceStats:
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats[namespace] = NamespaceStats()
+        return stats
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            stats = self._namespace_stats(namespace)
+            entries = self._namespaces.get(namespace)
+            entry = entries.get(key) if entries else None
+            if entry is None:
+                stats.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del entries[key]
+                stats.expirations += 1
+                stats.misses += 1
+                return None
+            entries.move_to_end(key)
+            stats.hits += 1
+            return value
+
+    def set(self, namespace: str, key: Hashable, value: Any, ttl_seconds: float, max_entries: Optional[int] = None) -> None:
+        with self._lock:
+            entries = self._namespaces.setdefault(namespace, OrderedDict())
+            entries[key] = (value, time.monotonic() + ttl_seconds)
+            entries.move_to_end(key)
+            if max_entries is not None:
+                while len(entries) > max_entries:
+                    entries.popitem(last=False)
+                    self._namespace_stats(namespace).evictions += 1
+
+    def delete(self, namespace: str, *keys: Hashable) -> None:
+        self._delete_local(namespace, keys)
+
+    def clear(self, namespace: str) -> None:
+        self._clear_local(namespace)
+
+    def stats(self, namespace: str) -> Tuple[int, NamespaceStats]:
+        with self._lock:
+            return len(self._namespaces.get(namespace, ())), self._namespace_stats(namespace)
+
+    def _delete_local(self, namespace: str, keys) -> None:
+        with self._lock:
+            entries = self._namespaces.get(namespace)
+            if entries:
+                for key in keys:
+                    entries.pop(key, None)
+
+    def _clear_local(self, namespace: str) -> None:
+        with self._lock:
+            self._namespaces.pop(namespace, None)
+
+def _hashable_key(key):
+    # JSON'dan gelen listeler tuple anahtarlara geri çevrilir
+    return tuple(_hashable_key(part) for part in key) if isinstance(key, list) else key
+
+class UnixSocketCacheBackend(InMemoryCacheBackend):
+    """
+    Her worker değerleri kendi belleğinde tutar; delete/clear, aynı makinedeki diğer süreçlere
+    Unix datagram soketleriyle yayınlanır. Her süreç socket_dir altında <pid>.sock dosyasını
+    dinler, yayın dizindeki tüm soketlere gönderilir (ayrı bir sunucu süreci gerekmez).
+    Dinlemeyen süreçler (ör. CLI script'leri) de yayın yapabilir. Mesaj kaybolursa TTL sınırı geçerlidir.
+    """
+    MAX_MESSAGE_BYTES = 60000 # Daha büyük silme listeleri ad alanını tamamen temizleme mesajına dönüşür
+
+    def __init__(self, socket_dir: str):
+        super().__init__()
+        self.socket_dir = socket_dir
+        self._socket_path = os.path.join(socket_dir, f"{os.getpid()}.sock")
+        self._receiver: Optional[socket.socket] = None
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    def start(self) -> None:
+        if self._receiver is not None:
+            return
+        os.makedirs(self.socket_dir, mode=0o700, exist_ok=True)
+        if os.path.exists(self._socket_path):
+            os.unlink(self._socket_path) # Aynı pid ile kalmış eski soket dosyası
+        self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._receiver.bind(self._socket_path)
+        threading.Thread(target=self._receive_loop, name="cache-invalidation", daemon=True).start()
+        logger.info(f"Cache invalidation listener bound to {self._socket_path}")
+
+    def close(self) -> None:
+        receiver, self._receiver = self._receiver, None
+        if receiver is not None:
+            receiver.close()
+            try:
+                os.unlink(self._socket_path)
+            except FileNotFoundError:
+                pass
+
+    def delete(self, namespace: str, *keys: Hashable) -> None:
+        super().delete(namespace, *keys)
+        self._publish({"ns": namespace, "keys": list(keys)})
+
+    def clear(self, namespace: str) -> None:
+        super().clear(namespace)
+        self._publish({"ns": namespace, "keys": None})
+
+    def _publish(self, message: dict) -> None:
+        payload = json.dumps(message).encode()
+        if len(payload) > self.MAX_MESSAGE_BYTES:
+            payload = json.dumps({"ns": message["ns"], "keys": None}).encode()
+        try:
+            peers = [name for name in os.listdir(self.socket_dir) if name.endswith(".sock")]
+        except FileNotFoundError:
+            return # Henüz dinleyen worker yok
+        for name in peers:
+            path = os.path.join(self.socket_dir, name)
+            if path == self._socket_path:
+                continue
+            try:
+                self._sender.sendto(payload, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Dinleyeni kalmamış (kapanmış worker) soket dosyası
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError as e:
+                logger.warning(f"Cache invalidation could not be sent to {path}: {e}")
+
+    def _receive_loop(self) -> None:
+        receiver = self._receiver
+        while self._receiver is receiver:
+            try:
+                payload = receiver.recv(self.MAX_MESSAGE_BYTES + 1024)
+            except OSError:
+                return # close() soketi kapattı
+            try:
+                message = json.loads(payload)
+                if message["keys"] is None:
+                    self._clear_local(message["ns"])
+                else:
+                    self._delete_local(message["ns"], [_hashable_key(key) for key in message["keys"]])
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Ignoring malformed cache invalidation message: {e}")
+
+def _create_cache_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "unix_socket":
+        return UnixSocketCacheBackend(settings.CACHE_SOCKET_DIR)
+    if settings.CACHE_BACKEND != "memory":
+        logger.warning(f"Unknown CACHE_BACKEND '{settings.CACHE_BACKEND}', using in-memory cache")
+    return InMemoryCacheBackend()
+
+cache_backend = _create_cache_backend()
@@ -0,0 +1,44 @@
+import asyncio
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.job_lock import single_runner
+
+logger = logging.getLogger(__name__)
+
+def run_call_archival() -> int:
+    """
+    Bitmiş eski çağrıları tek seferde arşive taşır (senkron, kendi DB oturumunu açar).
+    Her worker bu işi başlatır ama aynı anda sadece kilidi alan çalıştırır; diğerleri turu atlar.
+    """
+    with single_runner("call_archiver") as acquired:
+        if not acquired:
+            logger.debug("Call archiver skipped, another worker holds the lock")
+            return 0
+        db = SessionLocal()
+        try:
+            return crud.call.archive_finished_calls(
+                db,
+                older_than_days=settings.CALL_ARCHIVE_AFTER_DAYS,
+                batch_size=settings.CALL_ARCHIVE_BATCH_SIZE,
+            )
+        finally:
+            db.close()
+
+async def call_archiver_loop():
+    """
+    Lifespan içinde başlatılan arka plan işi. Arşivlemeyi thread pool'da çalıştırır,
+    böylece event loop (ve WebSocket trafiği) bloklanmaz.
+    """
+    interval_seconds = settings.CALL_ARCHIVE_INTERVAL_MINUTES * 60
+    logger.info(f"Call archiver started (after {settings.CALL_ARCHIVE_AFTER_DAYS} days, every {settings.CALL_ARCHIVE_INTERVAL_MINUTES} minutes)")
+    while True:
+        try:
+            await run_in_threadpool(run_call_archival)
+        except Exception as e:
+            logger.error(f"Call archiver run failed: {e}", exc_info=False)
+        await asyncio.sleep(interval_seconds)
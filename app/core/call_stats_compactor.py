@@ -0,0 +1,46 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.job_lock import single_runner
+
+logger = logging.getLogger(__name__)
+
+def run_call_stats_compaction(stat_date: date) -> int:
+    """
+    Verilen günün çağrı istatistiklerini ham veriden yeniden hesaplar (senkron, kendi DB oturumunu açar).
+    Bütün worker'lar aynı saatte uyanır; günü sadece "call_stats_compactor" kilidini alan yeniden hesaplar.
+    """
+    with single_runner("call_stats_compactor") as acquired:
+        if not acquired:
+            logger.debug("Call stats compaction for %s skipped, another worker holds the lock", stat_date)
+            return 0
+        db = SessionLocal()
+        try:
+            return crud.call_stat.rebuild_day(db, stat_date=stat_date)
+        finally:
+            db.close()
+
+def _seconds_until_next_run(now: datetime) -> float:
+    next_run = now.replace(hour=settings.CALL_STATS_COMPACTION_HOUR, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+async def call_stats_compactor_loop():
+    """
+    Lifespan içinde başlatılan gece işi: her gün CALL_STATS_COMPACTION_HOUR saatinde
+    bir önceki günün rollup satırlarını thread pool'da yeniden hesaplar.
+    """
+    logger.info(f"Call stats compactor started (daily at {settings.CALL_STATS_COMPACTION_HOUR:02d}:00)")
+    while True:
+        await asyncio.sleep(_seconds_until_next_run(datetime.now()))
+        try:
+            await run_in_threadpool(run_call_stats_compaction, date.today() - timedelta(days=1))
+        except Exception as e:
+            logger.error(f"Call stats compaction failed: {e}", exc_info=False)
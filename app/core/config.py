@@ -1,14 +1,12 @@
 from pydantic_settings import BaseSettings
 import os
-from dotenv import load_dotenv
-from typing import Optional, List, Union
+from typing import Dict, Optional, List, Union
 from pydantic import AnyHttpUrl, validator
 
 # Proje kök dizinini bul
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-# .env dosyasını yükle
+# .env dosyası; sadece Settings okur (ayrıca load_dotenv ile os.environ'a yüklenmez, dosya bir kez ayrıştırılır)
 dotenv_path = os.path.join(BASE_DIR, ".env")
-load_dotenv(dotenv_path=dotenv_path, verbose=False)
 
 class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
@@ -73,10 +71,75 @@ class Settings(BaseSettings):
 
     # Loglama Ayarları
     LOG_LEVEL: str = "INFO" # Varsayılan, .env'den override edilebilir
+    LOG_FORMAT: str = "json" # "json" (satır başına bir JSON kaydı) veya "text" (geliştirme için okunaklı)
+    LOG_SAMPLING: Dict[str, float] = {} # Logger adı (önek) -> INFO ve altı kayıtların yazılma oranı, örn. {"app.core.connection_manager": 0.1}
+
+    # Çağrı Arşivleme (bitmiş eski çağrılar 'calls_archive' tablosuna taşınır)
+    CALL_ARCHIVE_ENABLED: bool = True
+    CALL_ARCHIVE_AFTER_DAYS: int = 30 # Bu günden eski bitmiş çağrılar arşivlenir
+    CALL_ARCHIVE_BATCH_SIZE: int = 1000 # Her transaction'da taşınacak çağrı sayısı
+    CALL_ARCHIVE_INTERVAL_MINUTES: int = 60 # Arşivleme işinin çalışma aralığı
+
+    # Çağrı Analitiği (rollup tablolarının gece sıkıştırması)
+    CALL_STATS_COMPACTION_ENABLED: bool = True
+    CALL_STATS_COMPACTION_HOUR: int = 3 # Her gece bu saatte bir önceki günün istatistikleri yeniden hesaplanır
+
+    # Çağrı Konum Kontrolü (okul bazlı geofence, School.geofence_* alanları)
+    CALL_LOCATION_REQUIRED: bool = False # True ise bölgesi tanımlı okullarda konumsuz çağrı reddedilir
+
+    # Teslim Kuyruğu (velilerin canlı konumu, sadece bellekte tutulur)
+    PICKUP_POSITION_TTL_SECONDS: int = 300 # Bu süre konum göndermeyen veli kuyruktan düşer
+    PICKUP_MIN_SPEED_MPS: float = 1.4 # ETA hesabında kullanılan en düşük yaklaşma hızı (yürüme)
+    PICKUP_QUEUE_BROADCAST_INTERVAL_SECONDS: float = 2.0 # Sınıf ekranına kuyruk güncellemesi en sık bu aralıkla gönderilir
+
+    # Bildirimler
+    NOTIFICATION_UNREAD_CACHE_TTL_SECONDS: int = 30 # Okunmamış sayacının bellekte tutulma süresi
+    NOTIFICATION_DELIVERY_WORKER_ENABLED: bool = True # Push'lar kuyruktan arka plan işiyle gönderilir
+    NOTIFICATION_DELIVERY_QUEUE_SIZE: int = 1000 # Kuyruk doluysa push atlanır, bildirim yine de gelen kutusundadır
+    NOTIFICATION_DELIVERY_BATCH_SIZE: int = 200 # Bir seferde push yapılan kullanıcı sayısı
+    NOTIFICATION_DELIVERY_BATCH_INTERVAL_SECONDS: float = 0.05 # Batch'ler arası bekleme; çağrı trafiğine yer bırakır
+    NOTIFICATION_SCHEDULE_POLL_SECONDS: int = 15 # Zamanı gelen planlı bildirimlerin kontrol aralığı
+
+    # Public okul/sınıf listeleri (ETag + Cache-Control)
+    PUBLIC_RESPONSE_CACHE_TTL_SECONDS: int = 300 # Hazır yanıtın sunucuda tutulma süresi (diğer worker'lardaki değişiklikler için üst sınır)
+    PUBLIC_RESPONSE_MAX_AGE_SECONDS: int = 60 # İstemcinin yeniden doğrulamadan kullanabileceği süre
+    PUBLIC_RESPONSE_CACHE_MAX_ENTRIES: int = 256 # Kapsam (okul listesi veya okul) başına saklanan en fazla yanıt
+
+    # Profil resimleri (static/profile_pics, içerik adresli; küçük resimler için Pillow gerekir)
+    PROFILE_PICTURE_MAX_BYTES: int = 5 * 1024 * 1024
+    PROFILE_PICTURE_MAX_PIXELS: int = 40_000_000 # Daha büyük çözünürlükteki resimler reddedilir (decompression bomb)
+    PROFILE_PICTURE_WORKERS: int = 2 # Küçük resim üreten işçi süreç sayısı
+
+    # Medya servisi (/static). İçerik hash'li dosyalar her zaman bir yıl "immutable" önbelleklenir
+    MEDIA_MAX_AGE_SECONDS: int = 300 # Hash'siz (eski) dosyaların istemci önbellek süresi
+    MEDIA_ACCEL_REDIRECT_PREFIX: Optional[str] = None # Örn. "/protected-static"; tanımlıysa dosyayı önündeki nginx gönderir (X-Accel-Redirect, internal location)
+
+    # Rate limiting (kullanıcı başına token bucket; login kullanıcı adı ve istemci IP'si başına). Bütçe biçimi: "<sayı>/<second|minute|hour>"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORAGE: str = "shared" # "shared" (aynı makinedeki worker'lar mmap dosyasını paylaşır) veya "memory" (worker başına)
+    RATE_LIMIT_SHARED_FILE: str = "/tmp/okul-ratelimit.bin"
+    RATE_LIMIT_SHARED_SLOTS: int = 65536 # Paylaşılan tablodaki kova sayısı (slot başına 24 bayt)
+    RATE_LIMIT_LOGIN: str = "300/minute" # IP başına; okulun NAT'ı arkasındaki tüm veliler paylaşır
+    RATE_LIMIT_LOGIN_USERNAME: str = "10/minute" # Kullanıcı adı başına şifre denemesi
+    RATE_LIMIT_CALL_CREATE: str = "20/minute"
+    RATE_LIMIT_WRITE: str = "120/minute"
+    RATE_LIMIT_READ: str = "600/minute"
+
+    # Önbellek deposu: "memory" (tek süreç) veya "unix_socket" (çok worker'lı kurulum; silmeler diğer worker'lara yayınlanır)
+    CACHE_BACKEND: str = "memory"
+    CACHE_SOCKET_DIR: str = "/tmp/okul-cache" # unix_socket için worker soketlerinin dizini; aynı uygulamanın worker'ları paylaşır
+
+    # Okul/sınıf arama önbelleği (crud.school.get, crud.class_.get_by_id_and_school_id vb.)
+    LOOKUP_CACHE_TTL_SECONDS: int = 60 # Diğer worker'lardaki değişikliklerin en geç görüleceği süre
+    LOOKUP_CACHE_MAX_ENTRIES: int = 2048 # Önbellek başına en fazla kayıt (LRU)
+
+    # Başlangıç süresi (bkz. scripts/profile_startup.py)
+    LAZY_LEGACY_ROUTERS: bool = False # True ise eski /veliler ve /ogrenciler router'ları ilk istekte yüklenir (OpenAPI'de görünmezler)
+    OPENAPI_OUTPUT_FILE: Optional[str] = None # Tanımlıysa açılışta üretilen OpenAPI JSON'u bu dosyaya da yazılır (çevrimdışı istemciler)
 
     class Config:
         case_sensitive = True
-        env_file = ".env" # Proje kök dizinindeki .env dosyasını kullanır
+        env_file = dotenv_path # Proje kök dizinindeki .env dosyası (çalışma dizininden bağımsız)
         env_file_encoding = 'utf-8'
 
 settings = Settings() 
\ No newline at end of file
@@ -1,5 +1,6 @@
+import asyncio
 import logging # Loglama için eklendi
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Set, Tuple
 from fastapi import WebSocket
 
 logger = logging.getLogger(__name__)
@@ -8,22 +9,26 @@ class ConnectionManager:
     def __init__(self):
         # Her sınıf adı için aktif bağlantıları (WebSocket objeleri) tutar
         self.active_connections: Dict[str, List[WebSocket]] = {}
+        # Kullanıcı bazlı bağlantılar (bildirim push'u): user_id -> soketler, school_id -> bağlı user_id'ler
+        self.user_connections: Dict[int, List[WebSocket]] = {}
+        self.school_user_ids: Dict[int, Set[int]] = {}
+        self._user_school_ids: Dict[int, Set[int]] = {}
 
     async def connect(self, sinif_adi: str, websocket: WebSocket):
         await websocket.accept()
         if sinif_adi not in self.active_connections:
             self.active_connections[sinif_adi] = []
         self.active_connections[sinif_adi].append(websocket)
-        logger.info(f"WebSocket connected for class: {sinif_adi}, client: {websocket.client}") # print yerine logger.info
+        logger.info("WebSocket connected for class: %s, client: %s", sinif_adi, websocket.client) # print yerine logger.info
 
     def disconnect(self, sinif_adi: str, websocket: WebSocket):
         if sinif_adi in self.active_connections:
             if websocket in self.active_connections[sinif_adi]:
                 self.active_connections[sinif_adi].remove(websocket)
-                logger.info(f"WebSocket disconnected for class: {sinif_adi}, client: {websocket.client}") # print yerine logger.info
+                logger.info("WebSocket disconnected for class: %s, client: %s", sinif_adi, websocket.client) # print yerine logger.info
                 if not self.active_connections[sinif_adi]: # Sınıfta başka bağlantı kalmadıysa
                     del self.active_connections[sinif_adi]
-                    logger.info(f"No active connections left for class: {sinif_adi}, removing from manager.") # print yerine logger.info
+                    logger.info("No active connections left for class: %s, removing from manager.", sinif_adi) # print yerine logger.info
             else:
                 logger.warning(f"WebSocket client {websocket.client} not found in class {sinif_adi} during disconnect.")
         else:
@@ -41,7 +46,7 @@ class ConnectionManager:
         if sinif_adi in self.active_connections:
             active_sockets_in_class = list(self.active_connections[sinif_adi]) # Kopya üzerinde iterasyon
             if not active_sockets_in_class:
-                logger.info(f"No active connections for class: {sinif_adi} to broadcast message.") # print yerine logger.info
+                logger.info("No active connections for class: %s to broadcast message.", sinif_adi) # print yerine logger.info
                 return
             for connection in active_sockets_in_class:
                 if connection != exclude_self:
@@ -56,5 +61,49 @@ class ConnectionManager:
         else:
             logger.warning(f"Class {sinif_adi} not found for broadcasting message.")
 
+    # --- Kullanıcı bazlı kanal --- #
+
+    async def connect_user(self, user_id: int, school_ids: Iterable[int], websocket: WebSocket):
+        await websocket.accept()
+        self.user_connections.setdefault(user_id, []).append(websocket)
+        school_ids = set(school_ids)
+        self._user_school_ids.setdefault(user_id, set()).update(school_ids)
+        for school_id in school_ids:
+            self.school_user_ids.setdefault(school_id, set()).add(user_id)
+        logger.info("User WebSocket connected for user: %s, schools: %s, client: %s", user_id, sorted(school_ids), websocket.client)
+
+    def disconnect_user(self, user_id: int, websocket: WebSocket):
+        sockets = self.user_connections.get(user_id)
+        if not sockets or websocket not in sockets:
+            logger.warning(f"User WebSocket client {websocket.client} not found for user {user_id} during disconnect.")
+            return
+        sockets.remove(websocket)
+        logger.info("User WebSocket disconnected for user: %s, client: %s", user_id, websocket.client)
+        if not sockets: # Kullanıcının başka bağlantısı kalmadıysa okul indekslerinden de çıkar
+            del self.user_connections[user_id]
+            for school_id in self._user_school_ids.pop(user_id, ()):
+                school_users = self.school_user_ids.get(school_id)
+                if school_users is not None:
+                    school_users.discard(user_id)
+                    if not school_users:
+                        del self.school_user_ids[school_id]
+
+    async def send_to_users(self, user_ids: Iterable[int], message: str) -> int:
+        """
+        Mesajı verilen kullanıcıların tüm açık soketlerine aynı anda gönderir.
+        Yavaş bir istemci diğerlerini bekletmez. Gönderilen soket sayısını döndürür.
+        """
+        sockets = [ws for user_id in set(user_ids) for ws in self.user_connections.get(user_id, ())]
+        if not sockets:
+            return 0
+        results = await asyncio.gather(*(ws.send_text(message) for ws in sockets), return_exceptions=True)
+        failures = [result for result in results if isinstance(result, Exception)]
+        if failures:
+            logger.error(f"Error sending user message to {len(failures)} of {len(sockets)} sockets: {failures[0]}", exc_info=False)
+        return len(sockets) - len(failures)
+
+    async def broadcast_to_school(self, school_id: int, message: str) -> int:
+        return await self.send_to_users(list(self.school_user_ids.get(school_id, ())), message)
+
 # Global bir manager instance oluşturuyoruz, bu tüm uygulama tarafından kullanılacak.
 manager = ConnectionManager() 
\ No newline at end of file
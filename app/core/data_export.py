@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Iterable, Iterator, Sequence
+
+from app.schemas.export import ExportFormat
+
+ROWS_PER_CHUNK = 500 # Yanıta bir seferde yazılan satır sayısı
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv", # Starlette charset=utf-8 ekler
+    ExportFormat.JSONL: "application/x-ndjson",
+}
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+# Excel/LibreOffice bu karakterlerle başlayan hücreyi formül olarak çalıştırır (CSV injection)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def _csv_cell(value):
+    """CSV hücresi; formül gibi başlayan metinlerin önüne ' eklenir ki tablo programı çalıştırmasın."""
+    value = _plain(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def stream_rows(columns: Sequence[str], rows: Iterable[Sequence], export_format: ExportFormat) -> Iterator[str]:
+    """
+    Satırları CSV veya JSON Lines metnine çevirip parça parça üretir (StreamingResponse için).
+    Satırlar ROWS_PER_CHUNK'lık gruplar halinde tek string olarak gönderilir.
+    """
+    buffer = io.StringIO()
+    if export_format == ExportFormat.CSV:
+        buffer.write("\ufeff") # Excel'in UTF-8'i tanıması için BOM
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        write = lambda row: writer.writerow([_csv_cell(value) for value in row])
+    else:
+        write = lambda row: buffer.write(json.dumps(dict(zip(columns, map(_plain, row))), ensure_ascii=False) + "\n")
+
+    pending = 0
+    for row in rows:
+        write(row)
+        pending += 1
+        if pending >= ROWS_PER_CHUNK:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -1,26 +1,141 @@
-from geopy.distance import geodesic
+import math
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+
 from app.core.config import settings
 
+EARTH_RADIUS_METERS = 6371008.8 # Ortalama dünya yarıçapı (IUGG)
+
 def calculate_distance_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
-    Calculates the distance in meters between two GPS coordinates.
+    Calculates the distance in meters between two GPS coordinates (haversine).
+    Okul ölçeğindeki mesafelerde geodesic çözümden farkı %0.5'in altındadır.
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
+
+def _point_in_polygon(lat: float, lon: float, polygon: Sequence[Tuple[float, float]]) -> bool:
+    # Ray casting; okul alanı boyutunda enlem/boylam düzlemsel kabul edilebilir
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        lat_i, lon_i = polygon[i]
+        lat_j, lon_j = polygon[j]
+        if (lat_i > lat) != (lat_j > lat):
+            crossing_lon = lon_i + (lat - lat_i) * (lon_j - lon_i) / (lat_j - lat_i)
+            if lon < crossing_lon:
+                inside = not inside
+        j = i
+    return inside
+
+class Geofence:
+    """
+    Okul bölgesi: merkez + yarıçap (metre) veya çokgen ([(lat, lon), ...]).
+    Kurulumda bir sınırlayıcı kutu (bounding box) hesaplanır; kutu dışındaki noktalar
+    trigonometri yapılmadan elenir. Yarıçap kontrolü equirectangular yaklaşımla yapılır.
+    """
+    __slots__ = (
+        "center_latitude", "center_longitude", "radius_meters", "polygon",
+        "min_lat", "max_lat", "min_lon", "max_lon", "_meters_per_deg_lat", "_meters_per_deg_lon",
+    )
+
+    def __init__(
+        self, *, center_latitude: Optional[float] = None, center_longitude: Optional[float] = None,
+        radius_meters: Optional[float] = None, polygon: Optional[Sequence[Tuple[float, float]]] = None
+    ):
+        self.polygon = tuple((float(lat), float(lon)) for lat, lon in polygon) if polygon else None
+        if self.polygon:
+            if len(self.polygon) < 3:
+                raise ValueError("Geofence polygon needs at least 3 points")
+            lats = [lat for lat, _ in self.polygon]
+            lons = [lon for _, lon in self.polygon]
+            self.min_lat, self.max_lat = min(lats), max(lats)
+            self.min_lon, self.max_lon = min(lons), max(lons)
+            center_latitude = (self.min_lat + self.max_lat) / 2
+            center_longitude = (self.min_lon + self.max_lon) / 2
+        elif center_latitude is None or center_longitude is None or not radius_meters:
+            raise ValueError("Geofence needs either a polygon or a center and radius")
+
+        self.center_latitude = float(center_latitude)
+        self.center_longitude = float(center_longitude)
+        self.radius_meters = float(radius_meters) if radius_meters else None
+        self._meters_per_deg_lat = math.radians(1) * EARTH_RADIUS_METERS
+        self._meters_per_deg_lon = self._meters_per_deg_lat * math.cos(math.radians(self.center_latitude))
+
+        if not self.polygon:
+            d_lat = self.radius_meters / self._meters_per_deg_lat
+            d_lon = self.radius_meters / max(self._meters_per_deg_lon, 1e-9)
+            self.min_lat, self.max_lat = self.center_latitude - d_lat, self.center_latitude + d_lat
+            self.min_lon, self.max_lon = self.center_longitude - d_lon, self.center_longitude + d_lon
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        if not (self.min_lat <= latitude <= self.max_lat and self.min_lon <= longitude <= self.max_lon):
+            return False
+        if self.polygon:
+            return _point_in_polygon(latitude, longitude, self.polygon)
+        dy = (latitude - self.center_latitude) * self._meters_per_deg_lat
+        dx = (longitude - self.center_longitude) * self._meters_per_deg_lon
+        return dx * dx + dy * dy <= self.radius_meters * self.radius_meters
+
+    def contains_many(self, latitudes: Sequence[float], longitudes: Sequence[float]):
+        """
+        Çok sayıda konumu tek seferde kontrol eder (NumPy). Boolean bir numpy dizisi döndürür.
+        """
+        import numpy as np # Sadece toplu kontrolde gerekli, uygulama açılışını yavaşlatmasın
+
+        lats = np.asarray(latitudes, dtype=np.float64)
+        lons = np.asarray(longitudes, dtype=np.float64)
+        inside = (lats >= self.min_lat) & (lats <= self.max_lat) & (lons >= self.min_lon) & (lons <= self.max_lon)
+        if not inside.any():
+            return inside
+
+        if self.polygon:
+            crossings = np.zeros(lats.shape, dtype=bool)
+            vertices = self.polygon
+            for (lat_i, lon_i), (lat_j, lon_j) in zip(vertices, vertices[-1:] + vertices[:-1]):
+                if lat_i == lat_j:
+                    continue
+                spans = (lat_i > lats) != (lat_j > lats)
+                crossing_lon = lon_i + (lats - lat_i) * (lon_j - lon_i) / (lat_j - lat_i)
+                crossings ^= spans & (lons < crossing_lon)
+            return inside & crossings
+
+        dy = (lats - self.center_latitude) * self._meters_per_deg_lat
+        dx = (lons - self.center_longitude) * self._meters_per_deg_lon
+        return inside & (dx * dx + dy * dy <= self.radius_meters * self.radius_meters)
+
+@lru_cache(maxsize=1024)
+def _build_geofence(
+    center_latitude: Optional[float], center_longitude: Optional[float],
+    radius_meters: Optional[int], polygon: Optional[Tuple[Tuple[float, float], ...]]
+) -> Geofence:
+    return Geofence(
+        center_latitude=center_latitude, center_longitude=center_longitude,
+        radius_meters=radius_meters, polygon=polygon
+    )
+
+def get_school_geofence(school) -> Optional[Geofence]:
+    """
+    Okulun (models.School) tanımlı bölgesini döndürür, tanımlı değilse None.
+    Aynı geometri için Geofence objesi önbellekten gelir; okul bölgesi güncellenince
+    anahtar değiştiği için eski kayıt kendiliğinden kullanılmaz olur.
     """
-    point1 = (lat1, lon1)
-    point2 = (lat2, lon2)
-    return geodesic(point1, point2).meters
+    polygon = tuple(tuple(point) for point in school.geofence_polygon) if school.geofence_polygon else None
+    if not polygon and (school.geofence_latitude is None or school.geofence_longitude is None or not school.geofence_radius_meters):
+        return None
+    return _build_geofence(school.geofence_latitude, school.geofence_longitude, school.geofence_radius_meters, polygon)
 
 def is_within_school_area(veli_latitude: float, veli_longitude: float) -> bool:
     """
     Checks if the parent's location is within the defined maximum distance from the school.
-    Uses school coordinates and max distance from settings.
+    Uses school coordinates and max distance from settings (tek okullu eski yapılandırma).
     """
     if not veli_latitude or not veli_longitude:
         return False # Konum bilgisi yoksa okul bölgesinde değil kabul edelim
-        
-    distance = calculate_distance_meters(
-        settings.SCHOOL_LATITUDE, 
-        settings.SCHOOL_LONGITUDE, 
-        veli_latitude, 
-        veli_longitude
-    )
-    return distance <= settings.MAX_DISTANCE_METERS 
\ No newline at end of file
+
+    geofence = _build_geofence(settings.SCHOOL_LATITUDE, settings.SCHOOL_LONGITUDE, settings.MAX_DISTANCE_METERS, None)
+    return geofence.contains(veli_latitude, veli_longitude)
@@ -0,0 +1,108 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# LogRecord'un kendi alanları; bunların dışındakiler (logger.info(..., extra={...})) JSON'a alan olarak eklenir
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+# Kendi handler'larını kuran sunucu logger'ları; kayıtları da aynı kuyruktan geçsin diye root'a yönlendirilir
+_SERVER_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access", "gunicorn.error", "gunicorn.access")
+
+class JsonFormatter(logging.Formatter):
+    """Her kaydı tek satırlık JSON olarak yazar: ts, level, logger, message ve extra alanları."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class SamplingFilter(logging.Filter):
+    """
+    Yüksek hacimli logger'ların INFO ve altı kayıtlarından sadece bir oranını geçirir (LOG_SAMPLING,
+    ör. {"app.core.connection_manager": 0.1}). Oran en uzun logger adı önekinden alınır;
+    WARNING ve üstü her zaman geçer.
+    """
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {} # logger adı -> oran; her adın öneki bir kez çözülür
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate, prefix = 1.0, name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1 or random.random() < rate
+
+class _InProcessQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Kuyruk aynı süreçte, pickle gerekmez: sadece mesaj birleştirilir (argümanlar sonradan değişmesin diye).
+        # JSON'a çevirme, traceback biçimlendirme ve yazma dinleyici thread'de yapılır.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+_listener: Optional[QueueListener] = None
+
+def setup_logging(level: str, log_format: str = "json", sampling: Optional[Dict[str, float]] = None) -> None:
+    """
+    Root logger'ı engellemeyen bir kuyruğa bağlar: istek thread'i kaydı sadece kuyruğa koyar, biçimlendirme
+    ve stdout'a yazma arka plandaki QueueListener thread'inde yapılır. Tekrar çağrılırsa sadece seviye değişir.
+    """
+    global _listener
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, level.upper(), logging.INFO))
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if log_format == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+        ))
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = _InProcessQueueHandler(log_queue)
+    if sampling:
+        queue_handler.addFilter(SamplingFilter(sampling))
+
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    for name in _SERVER_LOGGERS:
+        server_logger = logging.getLogger(name)
+        server_logger.handlers.clear()
+        server_logger.propagate = True
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop) # Kuyrukta kalan kayıtlar çıkışta yazılır
@@ -0,0 +1,53 @@
+from typing import Dict, Generic, Hashable, List, Optional, TypeVar
+
+from app.core.cache_backend import CacheBackend, cache_backend
+from app.core.config import settings
+from app.schemas.cache import CacheStats
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+class LRUTTLCache(Generic[K, V]):
+    """
+    Boyutu sınırlı (LRU) ve süreli (TTL) önbellek; değerler CacheBackend'de `name` ad alanında
+    tutulur. Okul/sınıf gibi nadiren değişen referans verilerin her istekte veritabanından
+    okunmasını önler; yazma yapan CRUD metotları ilgili anahtarları siler (unix_socket deposunda
+    silme diğer worker'lara da yayınlanır). Değer olarak None saklanmaz (kayıt yok bilgisi önbelleğe alınmaz).
+    """
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float, backend: CacheBackend = cache_backend):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+
+    def get(self, key: K) -> Optional[V]:
+        return self.backend.get(self.name, key)
+
+    def set(self, key: K, value: V) -> None:
+        self.backend.set(self.name, key, value, self.ttl_seconds, max_entries=self.max_entries)
+
+    def invalidate(self, *keys: K) -> None:
+        self.backend.delete(self.name, *keys)
+
+    def clear(self) -> None:
+        self.backend.clear(self.name)
+
+    def stats(self) -> CacheStats:
+        size, stats = self.backend.stats(self.name)
+        lookups = stats.hits + stats.misses
+        return CacheStats(
+            name=self.name, size=size, max_entries=self.max_entries, ttl_seconds=self.ttl_seconds,
+            hits=stats.hits, misses=stats.misses, evictions=stats.evictions, expirations=stats.expirations,
+            hit_ratio=round(stats.hits / lookups, 4) if lookups else 0.0,
+        )
+
+def _lookup_cache(name: str) -> LRUTTLCache:
+    return LRUTTLCache(name, max_entries=settings.LOOKUP_CACHE_MAX_ENTRIES, ttl_seconds=settings.LOOKUP_CACHE_TTL_SECONDS)
+
+# Değerler ORM objesi değil kolon sözlükleridir (crud.base.orm_snapshot); objeler oturuma bağlı olduğu için paylaşılamaz
+school_cache: LRUTTLCache[int, Dict] = _lookup_cache("school_by_id")
+school_code_cache: LRUTTLCache[str, Dict] = _lookup_cache("school_by_unique_code")
+class_cache: LRUTTLCache[int, Dict] = _lookup_cache("class_by_id")
+
+def lookup_cache_stats() -> List[CacheStats]:
+    return [cache.stats() for cache in (school_cache, school_code_cache, class_cache)]
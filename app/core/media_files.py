@@ -0,0 +1,175 @@
+import mimetypes
+import os
+import re
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# İçerik hash'i taşıyan dosya adları (profile_pictures: <32 hex>.ext veya <32 hex>_<varyant>.webp)
+CONTENT_HASHED_NAME = re.compile(r"^(?P<hash>[0-9a-f]{32})(?:_[a-z0-9]+)?\.[a-z0-9]+$")
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+mimetypes.add_type("image/webp", ".webp")
+
+class MediaFiles:
+    """
+    static/ altındaki medya dosyalarını servis eden ASGI uygulaması (app.mount("/static", ...)).
+    - İçerik hash'li adlar (profil resimleri) değişmez: güçlü ETag = hash, bir yıllık "immutable" önbellek.
+      Diğer dosyalar mtime/boyuttan ETag ve MEDIA_MAX_AGE_SECONDS ile servis edilir.
+    - If-None-Match / If-Modified-Since -> 304; tek aralıklı Range (ve If-Range) -> 206, karşılanamazsa 416.
+    - MEDIA_ACCEL_REDIRECT_PREFIX tanımlıysa gövde yerine X-Accel-Redirect döner, dosyayı önündeki
+      nginx sendfile ile gönderir. Sunucu "http.response.zerocopysend" eklentisini destekliyorsa
+      dosya tanımlayıcısı doğrudan verilir; aksi halde 64 KB'lık parçalar threadpool'da okunur.
+    """
+    def __init__(self, directory: Path):
+        self.directory = Path(directory).resolve()
+
+    def _resolve(self, path: str) -> Optional[Path]:
+        relative = path.lstrip("/")
+        if not relative or "\x00" in relative:
+            return None
+        full_path = (self.directory / relative).resolve()
+        if self.directory not in full_path.parents: # ../ ile dizin dışına çıkma
+            return None
+        return full_path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope["type"] == "http"
+        method = scope["method"]
+        if method not in ("GET", "HEAD"):
+            await self._send_empty(send, 405, [(b"allow", b"GET, HEAD")])
+            return
+        full_path = self._resolve(scope["path"]) # Mount sonrası path, /static'ten sonraki kısımdır
+        try:
+            file_stat = os.stat(full_path) if full_path else None
+        except OSError:
+            file_stat = None
+        if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
+            await self._send_empty(send, 404)
+            return
+
+        request_headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        size = file_stat.st_size
+        hashed = CONTENT_HASHED_NAME.match(full_path.name)
+        etag = f'"{hashed.group("hash")}"' if hashed else f'"{int(file_stat.st_mtime):x}-{size:x}"'
+        last_modified = formatdate(file_stat.st_mtime, usegmt=True)
+        content_type = mimetypes.guess_type(full_path.name)[0] or "application/octet-stream"
+        headers = [
+            (b"etag", etag.encode()),
+            (b"last-modified", last_modified.encode()),
+            (b"cache-control", (IMMUTABLE_CACHE_CONTROL if hashed else f"public, max-age={settings.MEDIA_MAX_AGE_SECONDS}").encode()),
+            (b"accept-ranges", b"bytes"),
+        ]
+
+        if self._not_modified(request_headers, etag, file_stat.st_mtime):
+            await self._send_empty(send, 304, headers)
+            return
+
+        if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+            # Koşullu istek ve Range'i de nginx karşılar
+            relative = full_path.relative_to(self.directory).as_posix()
+            headers += [
+                (b"content-type", content_type.encode()),
+                (b"x-accel-redirect", (settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + relative).encode()),
+            ]
+            await self._send_empty(send, 200, headers)
+            return
+
+        status, start, end = 200, 0, size - 1
+        byte_range = self._parse_range(request_headers, etag, last_modified, size)
+        if byte_range == "unsatisfiable":
+            await self._send_empty(send, 416, headers + [(b"content-range", f"bytes */{size}".encode())])
+            return
+        if byte_range is not None:
+            status, (start, end) = 206, byte_range
+            headers.append((b"content-range", f"bytes {start}-{end}/{size}".encode()))
+        length = end - start + 1 if size else 0
+        headers += [(b"content-type", content_type.encode()), (b"content-length", str(length).encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        if method == "HEAD" or length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await self._send_file(scope, send, full_path, start, length)
+
+    @staticmethod
+    def _not_modified(request_headers: dict, etag: str, mtime: float) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            # If-None-Match varsa If-Modified-Since yok sayılır (RFC 9110)
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def _parse_range(request_headers: dict, etag: str, last_modified: str, size: int):
+        """(başlangıç, bitiş) dahil aralık, tüm dosya için None, ya da "unsatisfiable"."""
+        range_header = request_headers.get("range")
+        if not range_header:
+            return None
+        if_range = request_headers.get("if-range")
+        if if_range is not None and if_range.strip() not in (etag, last_modified):
+            return None # Dosya değişmiş: tamamını gönder
+        match = RANGE_PATTERN.match(range_header.strip())
+        if not match or not (match.group(1) or match.group(2)):
+            return None # Çoklu veya bozuk aralık: tamamı gönderilir (izin verilen davranış)
+        first, last = match.group(1), match.group(2)
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            if start >= size or (last and int(last) < start):
+                return "unsatisfiable"
+        else:
+            suffix = int(last)
+            if suffix == 0:
+                return "unsatisfiable"
+            start, end = max(0, size - suffix), size - 1
+        return start, end
+
+    @staticmethod
+    async def _send_file(scope: Scope, send: Send, path: Path, start: int, length: int) -> None:
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            file = open(path, "rb")
+            try:
+                await send({
+                    "type": "http.response.zerocopysend", "file": file,
+                    "offset": start, "count": length, "more_body": False,
+                })
+            finally:
+                file.close()
+            return
+        file = await run_in_threadpool(open, path, "rb")
+        try:
+            await run_in_threadpool(file.seek, start)
+            remaining = length
+            while remaining > 0:
+                chunk = await run_in_threadpool(file.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break # Dosya bu arada kısalmış
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            await run_in_threadpool(file.close)
+
+    @staticmethod
+    async def _send_empty(send: Send, status: int, headers: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+        headers = list(headers or [])
+        if status != 304: # 304'te Content-Length, tam yanıtın uzunluğu anlamına gelir; hiç gönderilmez
+            headers.append((b"content-length", b"0"))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.core.config import settings
+from app.core.notification_push import deliver_message, serialize_notification
+from app.crud.crud_notification import NotificationRecipients
+from app.db.database import SessionLocal
+from app.db.job_lock import single_runner
+
+logger = logging.getLogger(__name__)
+
+SCHEDULED_BATCH_SIZE = 100 # Bir turda gönderilecek en fazla planlı bildirim
+
+DeliveryItem = Tuple[int, str, NotificationRecipients] # (notification_id, mesaj, alıcılar)
+
+class NotificationDeliveryQueue:
+    """
+    Bildirimin kaydı (istek içinde veya planlı iş tarafından, DB) ile WebSocket'e dağıtımı ayrı
+    aşamalardır. Kaydedilen bildirim serialize edilip bu kuyruğa konur; lifespan'de başlatılan
+    tek worker kuyruğu sırayla ve deliver_message'ın hız sınırıyla boşaltır. Böylece istek
+    push'u beklemez ve aynı anda gelen duyurular birbirinin üzerine fan-out yapmaz.
+    """
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    async def submit(self, notification, recipients: NotificationRecipients) -> None:
+        message = serialize_notification(notification)
+        if self._queue is None:
+            # Worker çalışmıyorsa (devre dışı veya lifespan'siz test istemcisi) hemen gönder
+            await deliver_message(message, recipients, notification_id=notification.id)
+            return
+        self.put(notification.id, message, recipients)
+
+    def put(self, notification_id: int, message: str, recipients: NotificationRecipients) -> None:
+        try:
+            self._queue.put_nowait((notification_id, message, recipients))
+        except asyncio.QueueFull:
+            # Bildirim kayıtlı; istemciler bir sonraki listelemede görür
+            logger.warning(f"Notification delivery queue full, skipping push for notification {notification_id}")
+
+    async def worker(self):
+        self._queue = asyncio.Queue(maxsize=settings.NOTIFICATION_DELIVERY_QUEUE_SIZE)
+        logger.info("Notification delivery worker started")
+        try:
+            while True:
+                notification_id, message, recipients = await self._queue.get()
+                try:
+                    await deliver_message(message, recipients, notification_id=notification_id)
+                except Exception as e:
+                    logger.error(f"Error pushing notification {notification_id} over WebSocket: {e}", exc_info=False)
+        finally:
+            self._queue = None
+
+# Global kuyruk, ConnectionManager gibi tüm uygulama tarafından paylaşılır
+notification_delivery_queue = NotificationDeliveryQueue()
+
+def run_due_scheduled_notifications() -> List[DeliveryItem]:
+    """
+    Zamanı gelen planlı bildirimleri kaydeder (senkron, kendi DB oturumunu açar). Çok worker'lı
+    kurulumda tur tek süreçte çalışır. Her kayıt kendi transaction'ında commit edildiğinden, biri
+    hata verirse geri alınır ve tur devam eder; o ana kadar kaydedilenler yine de döndürülür.
+    """
+    with single_runner("scheduled_notifications") as acquired:
+        if not acquired:
+            logger.debug("Scheduled notification sender skipped, another worker holds the lock")
+            return []
+        db = SessionLocal()
+        try:
+            items: List[DeliveryItem] = []
+            for scheduled in crud.notification.get_due_scheduled(db, now=datetime.now(timezone.utc), limit=SCHEDULED_BATCH_SIZE):
+                scheduled_id = scheduled.id # rollback sonrası nesne expire olur
+                try:
+                    delivered = crud.notification.deliver_scheduled(db, scheduled=scheduled)
+                    if delivered is None:
+                        continue # Başka bir worker gönderdi
+                    notification, recipients = delivered
+                    items.append((notification.id, serialize_notification(notification), recipients))
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Error sending scheduled notification {scheduled_id}: {e}", exc_info=False)
+            return items
+        finally:
+            db.close()
+
+async def scheduled_notification_loop():
+    """
+    Lifespan içinde başlatılan arka plan işi. Kayıt aşaması thread pool'da çalışır,
+    push'lar teslim kuyruğuna bırakılır.
+    """
+    logger.info(f"Scheduled notification sender started (every {settings.NOTIFICATION_SCHEDULE_POLL_SECONDS} seconds)")
+    while True:
+        try:
+            for notification_id, message, recipients in await run_in_threadpool(run_due_scheduled_notifications):
+                if notification_delivery_queue.running:
+                    notification_delivery_queue.put(notification_id, message, recipients)
+                else:
+                    await deliver_message(message, recipients, notification_id=notification_id)
+        except Exception as e:
+            logger.error(f"Scheduled notification run failed: {e}", exc_info=False)
+        await asyncio.sleep(settings.NOTIFICATION_SCHEDULE_POLL_SECONDS)
@@ -0,0 +1,46 @@
+import asyncio
+import json
+import logging
+
+from app import schemas
+from app.core.config import settings
+from app.core.connection_manager import manager
+
+logger = logging.getLogger(__name__)
+
+def serialize_notification(notification) -> str:
+    """
+    Push mesajı; bildirim başına bir kez serialize edilir. Aktif bir DB oturumu içinde çağrılmalı.
+    """
+    return json.dumps({
+        "type": "notification",
+        "data": schemas.NotificationInDBBase.model_validate(notification).model_dump(mode="json"),
+    })
+
+async def deliver_message(message: str, recipients, *, notification_id: int) -> int:
+    """
+    Hazır mesajı alıcılardan bağlı olanlara, NOTIFICATION_DELIVERY_BATCH_SIZE'lık gruplar halinde
+    ve gruplar arasında kısa bir bekleme ile gönderir; okul geneli büyük bir duyuru event loop'u
+    (çağrı ve konum WebSocket trafiğini) uzun süre meşgul etmez. Gönderilen soket sayısını döndürür.
+    """
+    if recipients.is_whole_school:
+        user_ids = list(manager.school_user_ids.get(recipients.school_id, ()))
+    else:
+        user_ids = [user_id for user_id in recipients.user_ids if user_id in manager.user_connections]
+
+    batch_size = max(settings.NOTIFICATION_DELIVERY_BATCH_SIZE, 1)
+    delivered = 0
+    for start in range(0, len(user_ids), batch_size):
+        if start:
+            await asyncio.sleep(settings.NOTIFICATION_DELIVERY_BATCH_INTERVAL_SECONDS)
+        delivered += await manager.send_to_users(user_ids[start:start + batch_size], message)
+    logger.info("Notification %s pushed to %s sockets (school %s)", notification_id, delivered, recipients.school_id)
+    return delivered
+
+async def push_notification(notification, recipients) -> int:
+    """
+    Yeni bildirimi kullanıcı kanalına (ws /users/me) bağlı alıcılara hemen gönderir.
+    `recipients` crud.notification.get_recipients ile bir kez hesaplanmış olmalı.
+    Normal akışta bunun yerine notification_delivery_queue.submit kullanılır.
+    """
+    return await deliver_message(serialize_notification(notification), recipients, notification_id=notification.id)
@@ -0,0 +1,78 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Callable, Optional
+
+from fastapi import Request, Response, status
+
+logger = logging.getLogger(__name__)
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+class OpenAPIDocument:
+    """
+    Uygulamanın OpenAPI dokümanı; açılışta (lifespan) bir kez üretilir, JSON olarak serileştirilir ve
+    gzip'lenir. /openapi.json her istekte dokümanı yeniden serileştirmek yerine bu hazır baytları,
+    içerik hash'inden güçlü bir ETag ile döner (If-None-Match -> 304). Baytları farklı olduğu için
+    gzip'li gövdenin ETag'i ayrıdır ("<hash>-gz"); iki etiketten biri eşleşirse 304 döner. Doküman sadece kod değişince
+    (yeni deploy) değişir. OPENAPI_OUTPUT_FILE tanımlıysa üretilen JSON dosyaya da yazılır
+    (çevrimdışı istemciler, kod üretimi); scripts/export_openapi.py aynısını build sırasında yapar.
+    """
+    CACHE_CONTROL = "public, no-cache" # İstemci saklar ama her kullanımda ETag ile doğrular
+
+    def __init__(self, generate: Callable[[], dict]):
+        self.generate = generate
+        self.body: Optional[bytes] = None
+        self.gzip_body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self.gzip_etag: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def build(self) -> None:
+        with self._lock:
+            if self.body is not None:
+                return
+            body = json.dumps(self.generate(), ensure_ascii=False, separators=(",", ":")).encode()
+            self.gzip_body = gzip.compress(body, compresslevel=9, mtime=0) # mtime=0: aynı doküman, aynı baytlar
+            content_hash = hashlib.sha256(body).hexdigest()[:32]
+            self.etag = f'"{content_hash}"'
+            self.gzip_etag = f'"{content_hash}-gz"'
+            self.body = body
+        logger.info(f"OpenAPI document built: {len(body)} bytes, {len(self.gzip_body)} bytes gzipped")
+
+    def write(self, path: str) -> None:
+        """JSON'u dosyaya yazar; yarım dosya okunmasın diye geçici adla yazılıp yerine taşınır."""
+        self.build()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}")
+        with open(temp_path, "wb") as target:
+            target.write(self.body)
+        os.replace(temp_path, path)
+
+    def respond(self, request: Request) -> Response:
+        self.build() # Lifespan çalışmadıysa (ör. testler) ilk istekte üretilir
+        use_gzip = _accepts_gzip(request.headers.get("accept-encoding"))
+        headers = {
+            "ETag": self.gzip_etag if use_gzip else self.etag,
+            "Cache-Control": self.CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            # Aynı doküman: istemcinin sakladığı gövde hangi kodlamada olursa olsun hâlâ geçerli
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            if "*" in tags or self.etag in tags or self.gzip_etag in tags:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzip_body, media_type="application/json", headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
@@ -0,0 +1,207 @@
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.location import EARTH_RADIUS_METERS, calculate_distance_meters
+
+logger = logging.getLogger(__name__)
+
+GRID_CELL_DEGREES = 0.005 # ~550 m enlem; hücre başına birkaç düzine veli beklenir
+SPEED_SMOOTHING = 0.3 # Yaklaşma hızı için üstel ortalama katsayısı
+MIN_SPEED_SAMPLE_SECONDS = 1.0 # Daha sık gelen konumlar hız tahminine katılmaz (GPS titremesi)
+MAX_APPROACH_SPEED_MPS = 25.0 # ~90 km/s; GPS sıçramalarının ETA'yı sıfırlamasını engeller
+
+GridCell = Tuple[int, int]
+
+def _grid_cell(latitude: float, longitude: float) -> GridCell:
+    return (math.floor(latitude / GRID_CELL_DEGREES), math.floor(longitude / GRID_CELL_DEGREES))
+
+class TrackedParent:
+    """
+    Çağrı yapmış ve konum paylaşan bir velinin son durumu (sadece bellekte tutulur).
+    """
+    __slots__ = (
+        "call_id", "school_id", "class_id", "student_id", "parent_user_id",
+        "latitude", "longitude", "cell", "distance_meters", "speed_mps", "eta_seconds",
+        "updated_at", "_updated_monotonic", "_speed_ref",
+    )
+
+    def __init__(self, *, call_id: int, school_id: int, class_id: int, student_id: int, parent_user_id: int):
+        self.call_id = call_id
+        self.school_id = school_id
+        self.class_id = class_id
+        self.student_id = student_id
+        self.parent_user_id = parent_user_id
+        self.latitude: Optional[float] = None
+        self.longitude: Optional[float] = None
+        self.cell: Optional[GridCell] = None
+        self.distance_meters: Optional[float] = None
+        self.speed_mps: Optional[float] = None
+        self.eta_seconds: Optional[float] = None
+        self.updated_at: Optional[datetime] = None
+        self._updated_monotonic: Optional[float] = None
+        self._speed_ref: Optional[Tuple[float, float]] = None # Hız tahmininde son örnek: (mesafe, monotonic zaman)
+
+class PickupTracker:
+    """
+    Okula yaklaşan velilerin bellek içi indeksi. Her okul için konumlar bir ızgaraya
+    (grid) yerleştirilir; konum güncellemesi O(1), çevre sorgusu sadece yarıçapı kapsayan
+    hücreleri dolaşır. Sınıf kuyrukları okuma anında tahmini varış süresine (ETA) göre sıralanır.
+    Konum verisi veritabanına yazılmaz; sunucu yeniden başlarsa veliler yeniden bağlanır.
+    Tüm metotlar event loop içinden çağrılır, bu yüzden kilit kullanılmaz.
+    """
+    def __init__(self):
+        self._parents: Dict[int, TrackedParent] = {} # call_id -> TrackedParent
+        self._grid: Dict[int, Dict[GridCell, Set[int]]] = {} # school_id -> hücre -> call_id'ler
+        self._class_members: Dict[Tuple[int, int], Set[int]] = {} # (school_id, class_id) -> call_id'ler
+        self._school_centers: Dict[int, Tuple[float, float]] = {}
+        self._last_broadcast: Dict[Tuple[int, int], float] = {}
+
+    def register(
+        self, *, call_id: int, school_id: int, class_id: int, student_id: int, parent_user_id: int,
+        school_center: Tuple[float, float]
+    ) -> TrackedParent:
+        self._school_centers[school_id] = school_center
+        tracked = self._parents.get(call_id)
+        if tracked is None:
+            tracked = TrackedParent(
+                call_id=call_id, school_id=school_id, class_id=class_id,
+                student_id=student_id, parent_user_id=parent_user_id
+            )
+            self._parents[call_id] = tracked
+            self._class_members.setdefault((school_id, class_id), set()).add(call_id)
+        return tracked
+
+    def update_position(self, call_id: int, latitude: float, longitude: float) -> Optional[TrackedParent]:
+        tracked = self._parents.get(call_id)
+        if tracked is None:
+            return None
+
+        now = time.monotonic()
+        center_lat, center_lon = self._school_centers[tracked.school_id]
+        distance = calculate_distance_meters(latitude, longitude, center_lat, center_lon)
+
+        if tracked._speed_ref is None:
+            tracked._speed_ref = (distance, now)
+        else:
+            ref_distance, ref_time = tracked._speed_ref
+            elapsed = now - ref_time
+            if elapsed >= MIN_SPEED_SAMPLE_SECONDS:
+                approach_speed = min((ref_distance - distance) / elapsed, MAX_APPROACH_SPEED_MPS)
+                tracked.speed_mps = approach_speed if tracked.speed_mps is None else \
+                    SPEED_SMOOTHING * approach_speed + (1 - SPEED_SMOOTHING) * tracked.speed_mps
+                tracked._speed_ref = (distance, now)
+
+        cell = _grid_cell(latitude, longitude)
+        if cell != tracked.cell:
+            school_grid = self._grid.setdefault(tracked.school_id, {})
+            if tracked.cell is not None:
+                self._discard_from_cell(school_grid, tracked.cell, call_id)
+            school_grid.setdefault(cell, set()).add(call_id)
+            tracked.cell = cell
+
+        tracked.latitude = latitude
+        tracked.longitude = longitude
+        tracked.distance_meters = distance
+        # Uzaklaşan veya duran veli için en düşük hız kabul edilir, ETA sonsuza gitmez
+        tracked.eta_seconds = distance / max(tracked.speed_mps or 0.0, settings.PICKUP_MIN_SPEED_MPS)
+        tracked.updated_at = datetime.now(timezone.utc)
+        tracked._updated_monotonic = now
+        return tracked
+
+    def remove(self, call_id: int) -> None:
+        tracked = self._parents.pop(call_id, None)
+        if tracked is None:
+            return
+        if tracked.cell is not None:
+            self._discard_from_cell(self._grid.get(tracked.school_id, {}), tracked.cell, call_id)
+        members = self._class_members.get((tracked.school_id, tracked.class_id))
+        if members is not None:
+            members.discard(call_id)
+            if not members:
+                del self._class_members[(tracked.school_id, tracked.class_id)]
+
+    def get_class_queue(self, school_id: int, class_id: int) -> List[TrackedParent]:
+        """
+        Sınıfın konum paylaşan velileri, en erken varacak olan önde.
+        """
+        call_ids = self._class_members.get((school_id, class_id), ())
+        queue = [tracked for tracked in self._live(call_ids) if tracked.eta_seconds is not None]
+        queue.sort(key=lambda tracked: tracked.eta_seconds)
+        return queue
+
+    def get_nearby(self, school_id: int, radius_meters: float, center: Optional[Tuple[float, float]] = None) -> List[TrackedParent]:
+        """
+        Okul merkezine (veya verilen noktaya) `radius_meters` içindeki veliler, en yakın önde.
+        """
+        school_grid = self._grid.get(school_id)
+        center = center or self._school_centers.get(school_id)
+        if not school_grid or center is None:
+            return []
+
+        center_lat, center_lon = center
+        d_lat = math.degrees(radius_meters / EARTH_RADIUS_METERS)
+        d_lon = d_lat / max(math.cos(math.radians(center_lat)), 1e-9)
+        min_cell = _grid_cell(center_lat - d_lat, center_lon - d_lon)
+        max_cell = _grid_cell(center_lat + d_lat, center_lon + d_lon)
+
+        candidates: List[int] = []
+        if (max_cell[0] - min_cell[0] + 1) * (max_cell[1] - min_cell[1] + 1) > len(school_grid):
+            # Yarıçap çok büyükse dolu hücreleri dolaşmak daha ucuz
+            for (row, col), call_ids in school_grid.items():
+                if min_cell[0] <= row <= max_cell[0] and min_cell[1] <= col <= max_cell[1]:
+                    candidates.extend(call_ids)
+        else:
+            for row in range(min_cell[0], max_cell[0] + 1):
+                for col in range(min_cell[1], max_cell[1] + 1):
+                    candidates.extend(school_grid.get((row, col), ()))
+
+        nearby = []
+        for tracked in self._live(candidates):
+            distance = calculate_distance_meters(tracked.latitude, tracked.longitude, center_lat, center_lon)
+            if distance <= radius_meters:
+                nearby.append((distance, tracked))
+        nearby.sort(key=lambda item: item[0])
+        return [tracked for _, tracked in nearby]
+
+    def should_broadcast(self, school_id: int, class_id: int) -> bool:
+        """
+        Sınıf ekranına kuyruk güncellemesi göndermek için sınıf başına hız sınırı.
+        """
+        now = time.monotonic()
+        key = (school_id, class_id)
+        if now - self._last_broadcast.get(key, 0.0) < settings.PICKUP_QUEUE_BROADCAST_INTERVAL_SECONDS:
+            return False
+        self._last_broadcast[key] = now
+        return True
+
+    def _live(self, call_ids) -> List[TrackedParent]:
+        # Konum göndermeyi bırakmış (bağlantısı kopmuş) velileri okuma sırasında temizle
+        cutoff = time.monotonic() - settings.PICKUP_POSITION_TTL_SECONDS
+        live, stale = [], []
+        for call_id in call_ids:
+            tracked = self._parents.get(call_id)
+            if tracked is None:
+                continue
+            if tracked._updated_monotonic is not None and tracked._updated_monotonic < cutoff:
+                stale.append(call_id)
+            else:
+                live.append(tracked)
+        for call_id in stale:
+            logger.info("Dropping stale pickup location for call %s", call_id)
+            self.remove(call_id)
+        return live
+
+    @staticmethod
+    def _discard_from_cell(school_grid: Dict[GridCell, Set[int]], cell: GridCell, call_id: int) -> None:
+        call_ids = school_grid.get(cell)
+        if call_ids is not None:
+            call_ids.discard(call_id)
+            if not call_ids:
+                del school_grid[cell]
+
+# Global tracker, ConnectionManager gibi tüm uygulama tarafından paylaşılır
+pickup_tracker = PickupTracker()
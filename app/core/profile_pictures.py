@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+STATIC_DIR = BASE_DIR / "static"
+PROFILE_PICTURES_DIR = STATIC_DIR / "profile_pics"
+PROFILE_PICTURES_URL_PREFIX = "/static/profile_pics/"
+
+CHUNK_SIZE = 64 * 1024
+# Varyant adı -> en uzun kenar (piksel); hepsi WebP olarak üretilir
+PROFILE_PICTURE_VARIANTS: Dict[str, int] = {"thumb": 128, "medium": 512}
+CONTENT_HASH_LENGTH = 32 # Dosya adında kullanılan SHA-256 ön eki (hex)
+
+class ProfilePictureError(ValueError):
+    """Yüklenen dosya kabul edilmediğinde (tür, boyut veya bozuk resim)."""
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Dosya uzantısına değil içeriğin ilk baytlarına göre tür; desteklenmiyorsa None."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+def _content_hash(url: Optional[str]) -> Optional[str]:
+    """İçerik adresli bir profil resmi URL'sinden hash'i çıkarır; eski (user_...) adlarda None."""
+    if not url or not url.startswith(PROFILE_PICTURES_URL_PREFIX):
+        return None
+    stem = Path(url[len(PROFILE_PICTURES_URL_PREFIX):]).stem
+    if len(stem) == CONTENT_HASH_LENGTH and all(char in "0123456789abcdef" for char in stem):
+        return stem
+    return None
+
+def _variant_filename(content_hash: str, variant: str) -> str:
+    return f"{content_hash}_{variant}.webp"
+
+def profile_picture_variant_url(url: Optional[str], variant: str) -> Optional[str]:
+    """Orijinal resmin küçültülmüş (WebP) varyantının URL'si, sadece addan türetilir; eski (user_...) adlarda None."""
+    content_hash = _content_hash(url)
+    if content_hash is None:
+        return None
+    return PROFILE_PICTURES_URL_PREFIX + _variant_filename(content_hash, variant)
+
+class StoredProfilePicture(NamedTuple):
+    url: str
+    thumbnail_url: Optional[str] # Küçük resim üretilemediyse (Pillow yok) None
+
+def _stream_to_disk(source: BinaryIO, max_bytes: int) -> Tuple[str, str, str]:
+    """
+    Yüklemeyi parça parça geçici dosyaya yazar, bu sırada SHA-256 hesaplar ve boyutu sınırlar.
+    (geçici dosya yolu, içerik hash'i, uzantı) döner.
+    """
+    digest = hashlib.sha256()
+    written = 0
+    extension = None
+    fd, temp_path = tempfile.mkstemp(dir=PROFILE_PICTURES_DIR, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as target:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if extension is None:
+                    extension = sniff_image_type(chunk[:16])
+                    if extension is None:
+                        raise ProfilePictureError("Desteklenmeyen dosya türü. Sadece JPG, PNG veya WebP.")
+                written += len(chunk)
+                if written > max_bytes:
+                    raise ProfilePictureError(
+                        f"Dosya çok büyük (en fazla {max_bytes // (1024 * 1024)} MB).", status_code=413
+                    )
+                digest.update(chunk)
+                target.write(chunk)
+        if extension is None:
+            raise ProfilePictureError("Dosya boş.")
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return temp_path, digest.hexdigest()[:CONTENT_HASH_LENGTH], extension
+
+def _build_variants(source_path: str, content_hash: str, max_pixels: int) -> List[str]:
+    """
+    İşçi süreçte çalışır: resmi açıp doğrular ve eksik WebP varyantlarını üretir.
+    Varyantlar geçici adla yazılıp yerine taşınır ki yarım dosya servis edilmesin.
+    """
+    from PIL import Image, ImageOps # Sadece işçi süreçlerde yüklenir
+
+    Image.MAX_IMAGE_PIXELS = max_pixels # Aşılırsa DecompressionBombError
+    created = []
+    with Image.open(source_path) as image:
+        largest = max(PROFILE_PICTURE_VARIANTS.values())
+        image.draft("RGB", (largest, largest)) # JPEG'de küçültülmüş çözme, büyük fotoğraflarda çok daha hızlı
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        for variant, size in sorted(PROFILE_PICTURE_VARIANTS.items(), key=lambda item: -item[1]):
+            target = PROFILE_PICTURES_DIR / _variant_filename(content_hash, variant)
+            if target.exists():
+                continue
+            image.thumbnail((size, size), Image.LANCZOS) # Büyükten küçüğe, her adım bir öncekinden küçültür
+            temp_path = target.with_name(f".{target.name}.{os.getpid()}")
+            image.save(temp_path, "WEBP", quality=80, method=4)
+            os.replace(temp_path, target)
+            created.append(target.name)
+    return created
+
+_variant_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_variant_pool() -> ProcessPoolExecutor:
+    global _variant_pool
+    if _variant_pool is None:
+        _variant_pool = ProcessPoolExecutor(max_workers=settings.PROFILE_PICTURE_WORKERS)
+    return _variant_pool
+
+def shutdown_variant_pool() -> None:
+    global _variant_pool
+    if _variant_pool is not None:
+        _variant_pool.shutdown(wait=False, cancel_futures=True)
+        _variant_pool = None
+
+@lru_cache(maxsize=None)
+def _pillow_available() -> bool:
+    try:
+        import PIL # noqa: F401
+    except ImportError:
+        logger.warning("Pillow is not installed; profile picture thumbnails will not be generated")
+        return False
+    return True
+
+def _link_into_place(temp_path: str, final_path: Path) -> bool:
+    """Geçici dosyayı son adına bağlar; dosya bu çağrıyla oluştuysa True, aynı içerik zaten varsa False."""
+    try:
+        os.link(temp_path, final_path) # Atomik: eşzamanlı aynı yüklemelerden sadece biri oluşturur
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.unlink(temp_path)
+
+async def store_profile_picture(file: BinaryIO) -> StoredProfilePicture:
+    """
+    Yüklenen profil resmini içerik adresli olarak kaydeder; orijinalin ve küçük resmin URL'sini döner.
+    Aynı içerik zaten varsa yeniden yazılmaz. Küçük resimler (PROFILE_PICTURE_VARIANTS) işçi
+    süreç havuzunda üretilir; Pillow kurulu değilse sadece orijinal saklanır.
+    """
+    PROFILE_PICTURES_DIR.mkdir(parents=True, exist_ok=True)
+    temp_path, content_hash, extension = await run_in_threadpool(
+        _stream_to_disk, file, settings.PROFILE_PICTURE_MAX_BYTES
+    )
+    final_path = PROFILE_PICTURES_DIR / f"{content_hash}.{extension}"
+    created_original = _link_into_place(temp_path, final_path)
+    url = PROFILE_PICTURES_URL_PREFIX + final_path.name
+
+    if not _pillow_available():
+        return StoredProfilePicture(url, None)
+    try:
+        created = await asyncio.get_running_loop().run_in_executor(
+            _get_variant_pool(), _build_variants, str(final_path), content_hash, settings.PROFILE_PICTURE_MAX_PIXELS
+        )
+        if created:
+            logger.debug("Profile picture variants created: %s", ', '.join(created))
+    except Exception as e:
+        # Türü tutan ama çözülemeyen (bozuk veya aşırı büyük) resim: varyantı olmayan bir dosya bırakma.
+        # Dosya bu yüklemeden önce de varsa (başka kullanıcının resmi) dokunulmaz.
+        logger.warning(f"Profile picture {final_path.name} rejected: {e}")
+        if created_original:
+            remove_profile_picture_files(url)
+        raise ProfilePictureError("Resim dosyası okunamadı.")
+    return StoredProfilePicture(url, profile_picture_variant_url(url, "thumb"))
+
+def remove_profile_picture_files(url: Optional[str]) -> None:
+    """Profil resmini (ve içerik adresliyse varyantlarını) diskten siler; çağıran başka kullanıcının aynı dosyayı kullanmadığını kontrol etmelidir."""
+    if not url or not url.startswith("/static/"):
+        return
+    paths = [STATIC_DIR / url[len("/static/"):]]
+    content_hash = _content_hash(url)
+    if content_hash:
+        paths += [PROFILE_PICTURES_DIR / _variant_filename(content_hash, variant) for variant in PROFILE_PICTURE_VARIANTS]
+    for path in paths:
+        try:
+            if path.resolve().parent == PROFILE_PICTURES_DIR.resolve() and path.is_file():
+                path.unlink()
+        except OSError as e:
+            logger.error(f"Eski profil resmi silinirken hata: {e}", exc_info=True)
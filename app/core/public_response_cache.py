@@ -0,0 +1,73 @@
+import hashlib
+from typing import Callable, Hashable, NamedTuple, Optional
+
+from fastapi import Request, Response, status
+
+from app.core.cache_backend import CacheBackend, cache_backend
+from app.core.config import settings
+
+SCHOOLS_SCOPE = "schools" # Okul listesi, ID ve kod ile okul yanıtları
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+class PublicResponseCache:
+    """
+    Kimlik doğrulamasız okul/sınıf listelerinin hazır JSON gövdeleri ve güçlü ETag'leri.
+    Uygulama her açılışta bu endpoint'leri çağırır; If-None-Match tutarsa 304 veritabanına
+    gitmeden döner. Yanıtlar kapsamlara ayrılır (okullar ve okul başına sınıflar), her kapsam
+    CacheBackend'de ayrı bir ad alanıdır; yönetim endpoint'leri bir yazma sonrası ilgili kapsamı
+    siler. TTL, bir silme yayını kaybolursa değişikliğin en geç ne kadar sürede görüleceğini belirler.
+    """
+    def __init__(self, ttl_seconds: float, max_age_seconds: int, max_entries_per_scope: int, backend: CacheBackend = cache_backend):
+        self.ttl_seconds = ttl_seconds
+        self.cache_control = f"public, max-age={max_age_seconds}"
+        self.max_entries_per_scope = max_entries_per_scope # skip/limit kombinasyonlarıyla şişmesin diye (LRU)
+        self.backend = backend
+
+    @staticmethod
+    def _namespace(scope: Hashable) -> str:
+        return f"public_response:{scope}"
+
+    def get(self, scope: Hashable, key: Hashable) -> Optional[CachedResponse]:
+        return self.backend.get(self._namespace(scope), key)
+
+    def set(self, scope: Hashable, key: Hashable, body: bytes) -> CachedResponse:
+        entry = CachedResponse(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        self.backend.set(self._namespace(scope), key, entry, self.ttl_seconds, max_entries=self.max_entries_per_scope)
+        return entry
+
+    def invalidate_school(self, school_id: int) -> None:
+        """Okul oluşturma/güncelleme/silme: okul yanıtları ve okulun sınıf listeleri (okulu gömer)."""
+        self.backend.clear(self._namespace(SCHOOLS_SCOPE))
+        self.backend.clear(self._namespace(school_id))
+
+    def invalidate_classes(self, school_id: int) -> None:
+        """Sınıf, öğrenci veya öğretmen değişikliği: sınıf listeleri öğretmeni ve öğrencileri gömer."""
+        self.backend.clear(self._namespace(school_id))
+
+    def _not_modified(self, request: Request, etag: str) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if not if_none_match:
+            return False
+        return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
+    def respond(self, request: Request, scope: Hashable, key: Hashable, render: Callable[[], bytes]) -> Response:
+        """
+        Önbellekte geçerli bir yanıt varsa onu (veya 304) döner; yoksa render() ile gövdeyi
+        üretip saklar. render() HTTPException fırlatırsa (ör. 404) hiçbir şey saklanmaz.
+        """
+        entry = self.get(scope, key)
+        if entry is None:
+            entry = self.set(scope, key, render())
+        headers = {"ETag": entry.etag, "Cache-Control": self.cache_control}
+        if self._not_modified(request, entry.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+public_response_cache = PublicResponseCache(
+    ttl_seconds=settings.PUBLIC_RESPONSE_CACHE_TTL_SECONDS,
+    max_age_seconds=settings.PUBLIC_RESPONSE_MAX_AGE_SECONDS,
+    max_entries_per_scope=settings.PUBLIC_RESPONSE_CACHE_MAX_ENTRIES,
+)
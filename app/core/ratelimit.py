@@ -1,20 +1,275 @@
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from starlette.requests import Request
-from starlette.responses import JSONResponse
-
-# Kural: Kullanıcı başına (IP adresi) dakikada 5 istek
-RATE_LIMIT_STRING = "5/minute"
-
-limiter = Limiter(key_func=get_remote_address, default_limits=[RATE_LIMIT_STRING])
-
-async def custom_rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
-    """Rate limit aşıldığında özel bir yanıt döndürür."""
-    return JSONResponse(
-        status_code=429,
-        content={
-            "detail": f"Rate limit exceeded: {exc.detail}",
-            "message": "Çok fazla istek gönderdiniz. Lütfen biraz bekleyip tekrar deneyin."
+import fcntl
+import hashlib
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, status
+from jose import JWTError, jwt
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Token bucket: her anahtarın `capacity` kadar jetonu vardır, saniyede `refill_per_second` jeton
+# geri dolar, her istek bir jeton harcar. Böylece kısa patlamalara izin verilir ama ortalama hız sınırlanır.
+
+PERIOD_SECONDS = {"second": 1, "minute": 60, "hour": 3600}
+
+class RateLimitBudget(NamedTuple):
+    name: str
+    capacity: int
+    refill_per_second: float
+
+def parse_budget(name: str, limit: str) -> RateLimitBudget:
+    """'10/minute' gibi bir tanımı bütçeye çevirir."""
+    count, _, period = limit.partition("/")
+    if period not in PERIOD_SECONDS or not count.strip().isdigit():
+        raise ValueError(f"Invalid rate limit '{limit}' for budget '{name}', expected e.g. '10/minute'")
+    capacity = int(count)
+    return RateLimitBudget(name, capacity, capacity / PERIOD_SECONDS[period])
+
+def _take_token(tokens: float, updated_at: float, budget: RateLimitBudget, now: float) -> Tuple[bool, float, float]:
+    """(izin verildi mi, kalan jeton, izin verilmediyse kaç saniye sonra tekrar denenebileceği)"""
+    tokens = min(budget.capacity, tokens + max(0.0, now - updated_at) * budget.refill_per_second)
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / budget.refill_per_second
+
+class MemoryRateLimitStorage:
+    """Tek süreçlik sayaçlar; her worker kendi bütçesini tutar."""
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, budget: RateLimitBudget) -> Tuple[bool, float]:
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (budget.capacity, now))
+            allowed, tokens, retry_after = _take_token(tokens, updated_at, budget, now)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False) # En uzun süredir istek gelmeyen (dolmuş olması muhtemel) kova
+        return allowed, retry_after
+
+class SharedMemoryRateLimitStorage:
+    """
+    Aynı makinedeki tüm worker'ların paylaştığı sayaçlar: mmap ile belleğe eşlenmiş sabit boyutlu bir
+    dosyada açık adresli hash tablosu. Her slot (anahtar hash'i, jeton, son güncelleme) tutar; bir kontrol
+    en fazla PROBE_LIMIT slota bakar ve dosya kilidi (flock) altında yapılır, yani O(1)'dir.
+    Uzun süredir kullanılmayan slotlar (STALE_SECONDS) yeni anahtarlara verilir; o sürede kova zaten dolmuştur.
+    """
+    SLOT = struct.Struct("<Qdd")
+    PROBE_LIMIT = 8
+    STALE_SECONDS = max(PERIOD_SECONDS.values())
+
+    def __init__(self, path: str, slots: int):
+        self.slots = slots
+        size = slots * self.SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size != size:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._fd).st_size != size: # Başka bir worker bu arada boyutlandırmış olabilir
+                    os.ftruncate(self._fd, size)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock() # flock süreç başınadır, aynı süreçteki thread'leri ayrıca kilitlemek gerekir
+
+    @staticmethod
+    def _key_hash(key: str) -> int:
+        # Python'un hash()'i süreç başına rastgeledir; worker'lar arasında aynı sonucu veren bir hash gerekir
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def acquire(self, key: str, budget: RateLimitBudget) -> Tuple[bool, float]:
+        key_hash = self._key_hash(key)
+        start = key_hash % self.slots
+        now = time.time()
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                target, tokens, updated_at = None, float(budget.capacity), now
+                oldest_offset, oldest_updated_at = None, math.inf
+                for probe in range(self.PROBE_LIMIT):
+                    offset = ((start + probe) % self.slots) * self.SLOT.size
+                    slot_hash, slot_tokens, slot_updated_at = self.SLOT.unpack_from(self._map, offset)
+                    if slot_hash == key_hash:
+                        target, tokens, updated_at = offset, slot_tokens, slot_updated_at
+                        break
+                    if target is None and (slot_hash == 0 or now - slot_updated_at > self.STALE_SECONDS):
+                        target = offset # Boş veya terk edilmiş slot; aynı anahtar daha ileride de olabilir, aramaya devam
+                    if slot_updated_at < oldest_updated_at:
+                        oldest_offset, oldest_updated_at = offset, slot_updated_at
+                if target is None:
+                    target = oldest_offset # Tablo bu bölgede dolu: en eski kovanın yerine geçilir
+                allowed, tokens, retry_after = _take_token(tokens, updated_at, budget, now)
+                self.SLOT.pack_into(self._map, target, key_hash, tokens, now)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return allowed, retry_after
+
+def _create_storage():
+    if settings.RATE_LIMIT_STORAGE == "shared":
+        return SharedMemoryRateLimitStorage(settings.RATE_LIMIT_SHARED_FILE, settings.RATE_LIMIT_SHARED_SLOTS)
+    if settings.RATE_LIMIT_STORAGE != "memory":
+        logger.warning(f"Unknown RATE_LIMIT_STORAGE '{settings.RATE_LIMIT_STORAGE}', using in-memory counters")
+    elif int(os.environ.get("WEB_CONCURRENCY", "1") or 1) > 1:
+        # uvicorn --workers / gunicorn WEB_CONCURRENCY: her worker ayrı sayar, bütçeler worker sayısıyla çarpılır
+        logger.warning("RATE_LIMIT_STORAGE is 'memory' with multiple workers; every budget is multiplied by the worker count")
+    return MemoryRateLimitStorage()
+
+_storage = None
+_storage_lock = threading.Lock()
+
+def get_rate_limit_storage():
+    """Middleware ve login endpoint'lerinin paylaştığı sayaç deposu (süreç başına bir tane)."""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = _create_storage()
+    return _storage
+
+def rate_limit_exceeded_body(budget: RateLimitBudget) -> dict:
+    return {
+        "detail": f"Rate limit exceeded: {budget.capacity} per {budget.capacity / budget.refill_per_second:g} seconds ({budget.name})",
+        "message": "Çok fazla istek gönderdiniz. Lütfen biraz bekleyip tekrar deneyin.",
+    }
+
+def enforce_login_username_limit(username: str) -> None:
+    """
+    Login endpoint'lerinde, form okunduktan sonra kullanıcı adı başına bütçe (RATE_LIMIT_LOGIN_USERNAME).
+    Şifre denemeleri hesap başına sınırlanır; aynı okul IP'sinin (NAT) arkasındaki veliler birbirinin
+    bütçesini tüketmez. IP başına login bütçesi (middleware) sadece geniş bir üst sınırdır.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    budget = parse_budget("login_username", settings.RATE_LIMIT_LOGIN_USERNAME)
+    allowed, retry_after = get_rate_limit_storage().acquire(f"login:username:{username.strip().lower()}", budget)
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=rate_limit_exceeded_body(budget)["detail"],
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+class RateLimitMiddleware:
+    """
+    İstekleri route'a göre bir bütçeye (login, çağrı oluşturma, yazma, okuma) ayırır ve kimliği doğrulanmış
+    kullanıcının ID'si (token'daki user_id), yoksa istemci IP'si başına token bucket uygular. Özel bütçeli
+    route'lar path yerine endpoint adıyla tanımlanır; path'leri ilk istekte uygulamanın route'larından çıkarılır. Token,
+    veritabanına gidilmeden sadece imzası doğrulanarak çözülür; çözülen token'lar bellekte tutulur.
+    Bütçe aşılınca 429 ve Retry-After döner.
+    """
+    TOKEN_CACHE_SIZE = 10_000
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.storage = get_rate_limit_storage()
+        self.budgets: Dict[str, RateLimitBudget] = {
+            name: parse_budget(name, limit) for name, limit in (
+                ("login", settings.RATE_LIMIT_LOGIN),
+                ("call_create", settings.RATE_LIMIT_CALL_CREATE),
+                ("write", settings.RATE_LIMIT_WRITE),
+                ("read", settings.RATE_LIMIT_READ),
+            )
         }
-    ) 
\ No newline at end of file
+        # (method, path) -> bütçe; burada olmayan istekler metoda göre write/read bütçesine düşer
+        self.route_budgets: Optional[Dict[Tuple[str, str], str]] = None
+        self._token_user_ids: "OrderedDict[str, Tuple[Optional[int], float]]" = OrderedDict()
+
+    # Endpoint fonksiyonunun adı -> bütçe. Router prefix'leri değişse de path'ler route'lardan doğru çıkarılır.
+    ENDPOINT_BUDGETS = {
+        "login_access_token": "login",
+        "login_for_access_token": "login",
+        "create_new_call": "call_create",
+    }
+
+    def _resolve_route_budgets(self, scope: Scope) -> Dict[Tuple[str, str], str]:
+        route_budgets = {}
+        found = set()
+        for route in getattr(scope.get("app"), "routes", ()):
+            name = self.ENDPOINT_BUDGETS.get(getattr(route, "name", None))
+            if name is not None:
+                found.add(route.name)
+                for method in getattr(route, "methods", None) or ():
+                    route_budgets[(method, route.path)] = name
+        missing = set(self.ENDPOINT_BUDGETS) - found
+        if missing:
+            logger.warning("Rate limit budgets refer to unknown endpoints: %s", ", ".join(sorted(missing)))
+        return route_budgets
+
+    def _budget_for(self, scope: Scope) -> Optional[RateLimitBudget]:
+        method, path = scope["method"], scope["path"]
+        if method == "OPTIONS" or path.startswith("/static/"): # CORS ön kontrolü; medya dosyaları ucuz ve önbelleklenir
+            return None
+        if self.route_budgets is None:
+            self.route_budgets = self._resolve_route_budgets(scope)
+        name = self.route_budgets.get((method, path))
+        if name is None:
+            name = "read" if method in ("GET", "HEAD") else "write"
+        return self.budgets[name]
+
+    def _user_id(self, scope: Scope) -> Optional[int]:
+        authorization = None
+        for header, value in scope.get("headers", ()):
+            if header == b"authorization":
+                authorization = value.decode("latin-1")
+                break
+        if not authorization or not authorization[:7].lower() == "bearer ":
+            return None
+        token = authorization[7:].strip()
+        now = time.time()
+        cached = self._token_user_ids.get(token)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            return None # Geçersiz token IP'ye göre sınırlanır; endpoint zaten reddedecek
+        user_id = payload.get("user_id")
+        self._token_user_ids[token] = (user_id, payload.get("exp", now + 60))
+        if len(self._token_user_ids) > self.TOKEN_CACHE_SIZE:
+            self._token_user_ids.popitem(last=False)
+        return user_id
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        budget = self._budget_for(scope)
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+        # Login'de henüz kullanıcı yok: IP başına geniş bir üst sınır, asıl sınır endpoint'te kullanıcı adı başına
+        user_id = self._user_id(scope) if budget.name != "login" else None
+        if user_id is not None:
+            key = f"{budget.name}:user:{user_id}"
+        else:
+            client = scope.get("client")
+            key = f"{budget.name}:ip:{client[0] if client else 'unknown'}"
+        allowed, retry_after = self.storage.acquire(key, budget)
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+        body = json.dumps(rate_limit_exceeded_body(budget), ensure_ascii=False).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(retry_after)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
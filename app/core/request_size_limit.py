@@ -0,0 +1,108 @@
+import json
+import logging
+from typing import List, Optional, Pattern, Tuple
+
+from fastapi import HTTPException, status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Multipart sınırları, part başlıkları ve form alanları için dosya sınırının üzerine tanınan pay
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+def _too_large_detail(max_bytes: int) -> str:
+    return f"Dosya çok büyük (en fazla {max_bytes // (1024 * 1024)} MB)."
+
+class RequestSizeLimitMiddleware:
+    """
+    Dosya yükleyen route'larda istek gövdesini, Starlette multipart'ı ayrıştırıp geçici dosyaya
+    almadan önce sınırlar. Content-Length sınırı aşıyorsa gövde hiç okunmadan 413 döner; başlık
+    yoksa (chunked) veya yanlışsa gelen baytlar sayılır ve sınır aşıldığı anda okuma 413 ile kesilir.
+    Route'lar RateLimitMiddleware'deki gibi endpoint adıyla tanımlanır, path'leri ilk istekte çıkarılır.
+    Dosyanın kendi boyutu ayrıca kaydedilirken de kontrol edilir (bkz. app.core.profile_pictures).
+    """
+    # Endpoint fonksiyonunun adı -> dosya boyutu sınırını veren ayar
+    ENDPOINT_LIMITS = {
+        "upload_profile_picture_for_current_user_admin": "PROFILE_PICTURE_MAX_BYTES",
+        "upload_profile_picture_for_user_admin": "PROFILE_PICTURE_MAX_BYTES",
+    }
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # (method, path regex, dosya sınırı); ilk istekte doldurulur
+        self.route_limits: Optional[List[Tuple[str, Pattern, int]]] = None
+
+    def _resolve_route_limits(self, scope: Scope) -> List[Tuple[str, Pattern, int]]:
+        route_limits = []
+        found = set()
+        for route in getattr(scope.get("app"), "routes", ()):
+            setting = self.ENDPOINT_LIMITS.get(getattr(route, "name", None))
+            if setting is not None:
+                found.add(route.name)
+                for method in getattr(route, "methods", None) or ():
+                    route_limits.append((method, route.path_regex, getattr(settings, setting)))
+        missing = set(self.ENDPOINT_LIMITS) - found
+        if missing:
+            logger.warning("Request size limits refer to unknown endpoints: %s", ", ".join(sorted(missing)))
+        return route_limits
+
+    def _limit_for(self, scope: Scope) -> Optional[int]:
+        if self.route_limits is None:
+            self.route_limits = self._resolve_route_limits(scope)
+        method, path = scope["method"], scope["path"]
+        for route_method, path_regex, max_bytes in self.route_limits:
+            if route_method == method and path_regex.match(path):
+                return max_bytes
+        return None
+
+    @staticmethod
+    def _content_length(scope: Scope) -> Optional[int]:
+        for header, value in scope.get("headers", ()):
+            if header == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        max_bytes = self._limit_for(scope)
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+        max_body_bytes = max_bytes + MULTIPART_OVERHEAD_BYTES
+        content_length = self._content_length(scope)
+        if content_length is not None and content_length > max_body_bytes:
+            body = json.dumps({"detail": _too_large_detail(max_bytes)}, ensure_ascii=False).encode()
+            await send({
+                "type": "http.response.start",
+                "status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"connection", b"close"), # Okunmayan gövde bağlantıda kalmasın
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_bytes:
+                    # FastAPI gövde ayrıştırırken HTTPException'ı olduğu gibi geçirir, 413 olarak döner
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=_too_large_detail(max_bytes)
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
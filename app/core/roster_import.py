@@ -0,0 +1,88 @@
+import csv
+import io
+from itertools import islice
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+ROSTER_COLUMNS = (
+    "student_number", "student_full_name", "class_name",
+    "parent_full_name", "parent_username", "parent_phone", "parent_email", "parent_password",
+)
+REQUIRED_COLUMNS = ("student_number", "student_full_name")
+
+RosterRow = Tuple[int, Dict[str, str]] # (dosyadaki satır numarası, kolon -> değer)
+
+class RosterFormatError(ValueError):
+    """Dosya okunamadığında veya zorunlu kolonlar eksik olduğunda."""
+
+def iter_roster_rows(file: BinaryIO, filename: Optional[str] = None) -> Iterator[RosterRow]:
+    """
+    Öğrenci listesi dosyasını (CSV veya .xlsx) satır satır okur; dosya belleğe alınmaz.
+    İlk satır başlıktır; bilinmeyen kolonlar yok sayılır, boş satırlar atlanır.
+    """
+    if filename and filename.lower().endswith((".xlsx", ".xlsm")):
+        return _iter_xlsx_rows(file)
+    return _iter_csv_rows(file)
+
+def chunked(rows: Iterable[RosterRow], size: int) -> Iterator[List[RosterRow]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _normalize_header(header: Optional[Sequence]) -> List[Optional[str]]:
+    if not header:
+        raise RosterFormatError("Roster file is empty")
+    columns = [str(name).strip().lower().replace(" ", "_") if name is not None else None for name in header]
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise RosterFormatError(f"Missing required columns: {', '.join(missing)}")
+    return [name if name in ROSTER_COLUMNS else None for name in columns]
+
+def _to_row(columns: List[Optional[str]], values: Sequence) -> Dict[str, str]:
+    row = {}
+    for name, value in zip(columns, values):
+        if name is None or value is None:
+            continue
+        text = str(value).strip()
+        if text:
+            row[name] = text
+    return row
+
+def _iter_csv_rows(file: BinaryIO) -> Iterator[RosterRow]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        try:
+            # Türkçe Excel CSV çıktısı ';' ile ayrılır
+            dialect = csv.Sniffer().sniff(text.readline(), delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        text.seek(0)
+        reader = csv.reader(text, dialect)
+        columns = _normalize_header(next(reader, None))
+        for line_no, values in enumerate(reader, start=2):
+            row = _to_row(columns, values)
+            if row:
+                yield line_no, row
+    except UnicodeDecodeError:
+        raise RosterFormatError("CSV file must be UTF-8 encoded")
+    finally:
+        text.detach() # Alttaki dosyayı (UploadFile) kapatma
+
+def _iter_xlsx_rows(file: BinaryIO) -> Iterator[RosterRow]:
+    try:
+        import openpyxl # Sadece Excel yüklemelerinde gerekli
+    except ImportError:
+        raise RosterFormatError("Excel import requires the openpyxl package; upload a CSV file instead")
+
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        columns = _normalize_header(next(rows, None))
+        for line_no, values in enumerate(rows, start=2):
+            row = _to_row(columns, values)
+            if row:
+                yield line_no, row
+    finally:
+        workbook.close()
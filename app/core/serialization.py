@@ -0,0 +1,67 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+from sqlalchemy import Column, Table
+
+try:
+    import orjson
+except ImportError: # orjson opsiyonel; yoksa standart json ile aynı çıktı (daha yavaş) üretilir
+    orjson = None
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Hazır dict/list yapısını JSON'a çevirir; datetime ve Enum'lar Pydantic'in JSON çıktısıyla aynı biçimde yazılır."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode()
+
+class FastJSONResponse(Response):
+    """
+    Önceden şekillendirilmiş (şema alanlarıyla aynı anahtarlara sahip) dict'leri doğrudan JSON'a çevirir.
+    Endpoint bir Response döndüğü için FastAPI response_model doğrulamasını ve jsonable_encoder'ı atlar;
+    response_model yine de OpenAPI dokümanı için yazılır. Doğrulama, verinin veritabanından geldiği
+    ve şekli RowShape ile şemadan türetildiği için gereksizdir.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+class RowShape:
+    """
+    Bir Pydantic şemasının düz alanlarını tablo kolonlarına eşler: `columns` select()'e verilir,
+    `from_row` dönen satırı şemanın dump'ı ile aynı anahtarlara sahip bir dict'e çevirir. Tabloda
+    karşılığı olmayan alanlar (ilişkiler, parent_user_ids gibi) şemadaki varsayılanla doldurulur;
+    ilişkileri çağıran kendisi yerleştirir.
+    """
+    def __init__(self, schema: Type[BaseModel], table: Table):
+        self.schema = schema
+        self.columns: List[Column] = []
+        self._fields: List[Tuple[str, Optional[int], FieldInfo]] = [] # (alan, satırdaki indeks veya None, alan bilgisi)
+        for name, field in schema.model_fields.items():
+            if name in table.c:
+                self._fields.append((name, len(self.columns), field))
+                self.columns.append(table.c[name])
+            else:
+                self._fields.append((name, None, field))
+
+    def from_row(self, row: Sequence[Any]) -> Dict[str, Any]:
+        """Alanlar şemadaki sırayla yazılır (Pydantic çıktısıyla aynı JSON)."""
+        return {
+            name: row[index] if index is not None else field.get_default(call_default_factory=True)
+            for name, index, field in self._fields
+        }
@@ -0,0 +1,37 @@
+from typing import Iterable, Optional
+
+from app.core.cache_backend import CacheBackend, cache_backend
+from app.core.config import settings
+
+class UnreadCounterCache:
+    """
+    Kullanıcı × okul başına okunmamış bildirim sayısının önbellekteki kopyası.
+    Asıl sayaç NotificationReadCursor.unread_count sütunudur; burası sık yoklanan
+    sayaç endpoint'inin her istekte veritabanına gitmesini önler. Bildirim oluşturma ve
+    okundu işaretleme ilgili kayıtları siler; unix_socket deposunda silmeler diğer worker'lara
+    da yayınlanır, TTL kaybolan bir yayında en geç ne kadar sürede düzeleceğini belirler.
+    """
+    def __init__(self, ttl_seconds: float, backend: CacheBackend = cache_backend):
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+
+    @staticmethod
+    def _namespace(school_id: int) -> str:
+        # Okul başına ayrı ad alanı: okul geneli bildirimlerde tüm okul tek adımda silinir
+        return f"unread_count:{school_id}"
+
+    def get(self, school_id: int, user_id: int) -> Optional[int]:
+        return self.backend.get(self._namespace(school_id), user_id)
+
+    def set(self, school_id: int, user_id: int, count: int) -> None:
+        self.backend.set(self._namespace(school_id), user_id, count, self.ttl_seconds)
+
+    def invalidate_users(self, school_id: int, user_ids: Iterable[int]) -> None:
+        user_ids = list(user_ids)
+        if user_ids:
+            self.backend.delete(self._namespace(school_id), *user_ids)
+
+    def invalidate_school(self, school_id: int) -> None:
+        self.backend.clear(self._namespace(school_id))
+
+unread_counter_cache = UnreadCounterCache(ttl_seconds=settings.NOTIFICATION_UNREAD_CACHE_TTL_SECONDS)
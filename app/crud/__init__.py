@@ -5,19 +5,27 @@ from app.crud.crud_class import CRUDClass
 from app.crud.crud_student import CRUDStudent
 from app.crud.crud_teacher import CRUDTeacher
 from app.crud.crud_parent_student_relation import CRUDParentStudentRelation
+from app.crud.crud_class_parent_index import CRUDClassParentIndex
 from app.crud.crud_notification import CRUDNotification
 from app.crud.crud_call import CRUDCall
+from app.crud.crud_call_stat import CRUDCallStat
+from app.crud.crud_roster import CRUDRoster
+from app.crud.crud_export import CRUDExport
 from app.crud.base import CRUDBase
 
 # CRUD sınıflarından örnekler oluşturuluyor
 user = CRUDUser(User)
 school = CRUDSchool(School)
 class_ = CRUDClass(ModelClass) # ModelClass aliasını kullandık çünkü class Python'da keyword
-student = CRUDStudent(Student)
+class_parent_index = CRUDClassParentIndex()
+notification = CRUDNotification(Notification, class_parents=class_parent_index)
+student = CRUDStudent(Student, class_parents=class_parent_index, notifications=notification)
 teacher = CRUDTeacher(Teacher)
-parent_student_relation = CRUDParentStudentRelation()
-notification = CRUDNotification(Notification)
-call = CRUDCall(Call)
+parent_student_relation = CRUDParentStudentRelation(class_parents=class_parent_index, notifications=notification)
+call_stat = CRUDCallStat()
+call = CRUDCall(Call, call_stats=call_stat)
+roster = CRUDRoster(class_parents=class_parent_index, notifications=notification)
+export = CRUDExport()
 
 # crud_school, crud_class vs. importları artık gerekli değil, örnekler yukarıda oluşturuldu.
 # from app.crud.crud_school import crud_school 
@@ -35,8 +43,12 @@ class CRUD:
         self.student = student
         self.teacher = teacher
         self.parent_student_relation = parent_student_relation
+        self.class_parent_index = class_parent_index
         self.notification = notification
         self.call = call
+        self.call_stat = call_stat
+        self.roster = roster
+        self.export = export
 
 crud = CRUD()
 
@@ -49,6 +61,10 @@ __all__ = [
     "student",
     "teacher",
     "parent_student_relation",
+    "class_parent_index",
     "notification",
     "call",
+    "call_stat",
+    "roster",
+    "export",
 ]
\ No newline at end of file
@@ -1,5 +1,6 @@
-from typing import Generic, TypeVar, Type, Any, Optional, List
-from sqlalchemy.orm import Session
+from typing import Generic, TypeVar, Type, Any, Optional, List, Dict
+from sqlalchemy import insert, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 from pydantic import BaseModel
 
 ModelType = TypeVar("ModelType")
@@ -39,4 +40,30 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj = db.query(self.model).get(id)
         db.delete(obj)
         db.commit()
-        return obj 
\ No newline at end of file
+        return obj 
+
+def insert_ignore(db: Session, table):
+    """
+    Çakışan (birincil/benzersiz anahtarı zaten var olan) satırları atlayan INSERT.
+    MySQL'de INSERT IGNORE, SQLite'ta INSERT OR IGNORE; diğer veritabanlarında düz INSERT.
+    """
+    statement = insert(table)
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name in ("mysql", "mariadb"):
+        statement = statement.prefix_with("IGNORE")
+    elif dialect_name == "sqlite":
+        statement = statement.prefix_with("OR IGNORE")
+    return statement
+
+def orm_snapshot(db_obj) -> Dict[str, Any]:
+    """Önbelleğe konabilecek, oturumdan bağımsız kolon değerleri."""
+    return {column.key: getattr(db_obj, column.key) for column in inspect(db_obj).mapper.column_attrs}
+
+def merge_snapshot(db: Session, model: Type[ModelType], values: Dict[str, Any]) -> ModelType:
+    """
+    orm_snapshot ile alınmış değerlerden, sorgu yapmadan bu oturuma bağlı bir obje üretir
+    (Session.merge(load=False)). Obje oturumda zaten varsa o döner; ilişkiler erişildiğinde yüklenir.
+    """
+    db_obj = model(**values)
+    make_transient_to_detached(db_obj)
+    return db.merge(db_obj, load=False)
@@ -1,29 +1,57 @@
 from typing import List, Optional
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session, selectinload, joinedload
-from sqlalchemy import and_
+from sqlalchemy import and_, select, insert, delete, literal, union_all
 
 from app.crud.base import CRUDBase
-from app.models.call import Call, CallStatusEnum
+from app.crud.crud_call_stat import CRUDCallStat
+from app.models.call import Call, CallArchive, CallStatusEnum
 from app.models.student import Student
 from app.models.user import User, UserRoleEnum
 from app.schemas.call import CallCreate, CallStatusUpdate # CallUpdate yerine CallStatusUpdate
 from app.core.config import settings # Okul bölgesi kontrolü için
+from app.core.location import get_school_geofence
 import logging # Loglama
 
 logger = logging.getLogger(__name__)
 
+class CallOutOfAreaError(Exception):
+    """create_call_for_parent: veli okul bölgesi dışında (veya zorunlu konumu göndermedi); API katmanı 403 döner."""
+
+# Okul personelinin (öğretmen / okul yöneticisi) yapabileceği durum geçişleri
+STAFF_ALLOWED_TRANSITIONS = {
+    CallStatusEnum.PENDING: [CallStatusEnum.ACKNOWLEDGED, CallStatusEnum.CANCELLED_BY_SCHOOL],
+    CallStatusEnum.ACKNOWLEDGED: [CallStatusEnum.COMPLETED, CallStatusEnum.CANCELLED_BY_SCHOOL],
+}
+
+# Arşive taşınabilecek (artık değişmeyecek) çağrı durumları
+FINISHED_CALL_STATUSES = [
+    CallStatusEnum.COMPLETED,
+    CallStatusEnum.CANCELLED_BY_PARENT,
+    CallStatusEnum.CANCELLED_BY_SCHOOL,
+    CallStatusEnum.EXPIRED,
+]
+
+_ARCHIVE_COLUMNS = ["id", "student_id", "parent_user_id", "school_id", "class_id", "status", "version", "created_at", "updated_at"]
+
 class CRUDCall(CRUDBase[Call, CallCreate, CallStatusUpdate]): # Model, CreateSchema, UpdateSchema (CallStatusUpdate kullandık)
-    
+    def __init__(self, model, *, call_stats: CRUDCallStat):
+        super().__init__(model)
+        self.call_stats = call_stats # Analitik rollup sayaçları (crud.call_stat), çağrı ile aynı transaction'da güncellenir
+
     def create_call_for_parent(self, db: Session, *, obj_in: CallCreate, parent_user: User) -> Optional[Call]:
         """
         Creates a call initiated by a parent for their student.
         Checks if the student belongs to the parent and is in a valid class.
+        Öğrencinin okulunda bölge (geofence) tanımlıysa velinin konumu kontrol edilir;
+        bölge dışındaysa CallOutOfAreaError fırlatılır.
         """
         if parent_user.role != UserRoleEnum.PARENT:
             logger.warning(f"User {parent_user.id} is not a parent, cannot create call.")
             return None # Veya HTTPException yükseltilebilir
 
-        student = db.query(Student).options(joinedload(Student.assigned_class)).filter(Student.id == obj_in.student_id).first()
+        student = db.query(Student).options(joinedload(Student.assigned_class), joinedload(Student.school))\
+            .filter(Student.id == obj_in.student_id).first()
         if not student:
             logger.warning(f"Student with id {obj_in.student_id} not found for call creation.")
             return None
@@ -43,9 +71,15 @@ class CRUDCall(CRUDBase[Call, CallCreate, CallStatusUpdate]): # Model, CreateSch
             logger.warning(f"Student {student.id} is not assigned to any class.")
             return None # Veya varsayılan bir durum/hata işleme
 
-        # TODO: Okul bölgesi kontrolü eklenebilir (settings.MAX_DISTANCE_METERS)
-        # Bu, velinin konumunu (latitude, longitude) obj_in içinde almayı gerektirir.
-        # Şimdilik bu kontrolü atlıyoruz, eski cagrilar.py'de vardı.
+        geofence = get_school_geofence(student.school) if student.school else None
+        if geofence:
+            if obj_in.latitude is None or obj_in.longitude is None:
+                if settings.CALL_LOCATION_REQUIRED:
+                    logger.warning(f"Call by parent {parent_user.id} rejected: location is required for school {student.school_id}.")
+                    raise CallOutOfAreaError(f"Location is required for school {student.school_id}")
+            elif not geofence.contains(obj_in.latitude, obj_in.longitude):
+                logger.warning(f"Call by parent {parent_user.id} rejected: ({obj_in.latitude}, {obj_in.longitude}) is outside school {student.school_id} area.")
+                raise CallOutOfAreaError(f"({obj_in.latitude}, {obj_in.longitude}) is outside school {student.school_id} area")
 
         db_call = self.model(
             student_id=student.id,
@@ -55,9 +89,11 @@ class CRUDCall(CRUDBase[Call, CallCreate, CallStatusUpdate]): # Model, CreateSch
             status=CallStatusEnum.PENDING # Varsayılan durum
         )
         db.add(db_call)
+        db.flush()
+        self.call_stats.record_transitions(db, call_ids=[db_call.id], new_status=CallStatusEnum.PENDING)
         db.commit()
         db.refresh(db_call)
-        logger.info(f"Call {db_call.id} created for student {student.id} by parent {parent_user.id}")
+        logger.info("Call %s created for student %s by parent %s", db_call.id, student.id, parent_user.id)
         return db_call
 
     def get_call_with_details(self, db: Session, call_id: int) -> Optional[Call]:
@@ -90,14 +126,60 @@ class CRUDCall(CRUDBase[Call, CallCreate, CallStatusUpdate]): # Model, CreateSch
             query = query.filter(Call.status.in_([CallStatusEnum.PENDING, CallStatusEnum.ACKNOWLEDGED]))
         return query.order_by(Call.created_at.desc()).offset(skip).limit(limit).all()
         
-    def update_call_status(self, db: Session, *, db_call: Call, new_status: CallStatusEnum) -> Call:
-        db_call.status = new_status
-        db.add(db_call)
+    def update_call_status(
+        self, db: Session, *, db_call: Call, new_status: CallStatusEnum, expected_version: Optional[int] = None
+    ) -> Optional[Call]:
+        """
+        Çağrı durumunu compare-and-swap ile günceller: UPDATE ... WHERE id = ? AND version = ?
+        Çağrı okunduktan sonra başka biri tarafından değiştirildiyse (sürüm tutmuyorsa) None döner.
+        """
+        if expected_version is None:
+            expected_version = db_call.version
+        updated_count = db.query(self.model).filter(
+            Call.id == db_call.id, Call.version == expected_version
+        ).update({Call.status: new_status, Call.version: Call.version + 1}, synchronize_session=False)
+        if not updated_count:
+            db.rollback()
+            logger.warning(f"Call {db_call.id} status update to {new_status} rejected: version {expected_version} is stale")
+            return None
+        self.call_stats.record_transitions(db, call_ids=[db_call.id], new_status=new_status)
         db.commit()
         db.refresh(db_call)
-        logger.info(f"Call {db_call.id} status updated to {new_status}")
+        logger.info("Call %s status updated to %s (version %s)", db_call.id, new_status, db_call.version)
         return db_call
 
+    def bulk_update_status(
+        self, db: Session, *, call_ids: List[int], new_status: CallStatusEnum, school_id: Optional[int] = None
+    ) -> List[Call]:
+        """
+        Birden çok çağrının durumunu tek transaction içinde günceller.
+        Sadece STAFF_ALLOWED_TRANSITIONS kuralına uyan (ve school_id verilmişse o okula ait) çağrılar güncellenir,
+        diğerleri atlanır. Güncellenen çağrılar WebSocket yayını için sınıf bilgisiyle birlikte döner.
+        """
+        source_statuses = [s for s, targets in STAFF_ALLOWED_TRANSITIONS.items() if new_status in targets]
+        if not call_ids or not source_statuses:
+            return []
+
+        guard = [Call.id.in_(call_ids), Call.status.in_(source_statuses)]
+        if school_id is not None:
+            guard.append(Call.school_id == school_id)
+
+        candidate_ids = [row.id for row in db.query(Call.id).filter(*guard).all()]
+        if not candidate_ids:
+            return []
+
+        # Tek UPDATE ... WHERE id IN (...) AND status IN (...); arada durumu değişen çağrılar guard sayesinde atlanır
+        updated_count = db.query(self.model).filter(
+            Call.id.in_(candidate_ids), Call.status.in_(source_statuses)
+        ).update({Call.status: new_status, Call.version: Call.version + 1}, synchronize_session=False)
+        if updated_count:
+            self.call_stats.record_transitions(db, call_ids=candidate_ids, new_status=new_status)
+        db.commit()
+        logger.info("Bulk status update to %s: %s of %s calls updated", new_status, updated_count, len(call_ids))
+
+        return db.query(self.model).options(selectinload(Call.class_))\
+            .filter(Call.id.in_(candidate_ids), Call.status == new_status).all()
+
     def get_multi_by_school(
         self, db: Session, *, school_id: int, active_only: bool = False, skip: int = 0, limit: int = 100
     ) -> List[Call]:
@@ -111,5 +193,65 @@ class CRUDCall(CRUDBase[Call, CallCreate, CallStatusUpdate]): # Model, CreateSch
         
         return query.order_by(Call.created_at.desc()).offset(skip).limit(limit).all()
 
+    def archive_finished_calls(self, db: Session, *, older_than_days: int, batch_size: int = 1000) -> int:
+        """
+        Bitmiş (FINISHED_CALL_STATUSES) ve `older_than_days` günden eski çağrıları
+        'calls_archive' tablosuna taşır. Her batch kendi transaction'ında
+        INSERT ... SELECT + DELETE ile işlenir; uzun süreli kilit tutulmaz.
+        Taşınan toplam çağrı sayısını döndürür.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        total_moved = 0
+        while True:
+            batch_ids = [row.id for row in db.query(Call.id).filter(
+                Call.status.in_(FINISHED_CALL_STATUSES), Call.created_at < cutoff
+            ).order_by(Call.id).limit(batch_size).all()]
+            if not batch_ids:
+                break
+            try:
+                db.execute(insert(CallArchive).from_select(
+                    _ARCHIVE_COLUMNS,
+                    select(*[getattr(Call, name) for name in _ARCHIVE_COLUMNS]).where(Call.id.in_(batch_ids))
+                ))
+                db.execute(delete(Call).where(Call.id.in_(batch_ids)))
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Call archival batch failed after {total_moved} moved calls: {e}", exc_info=True)
+                raise
+            total_moved += len(batch_ids)
+            if len(batch_ids) < batch_size:
+                break
+        if total_moved:
+            logger.info("Archived %s finished calls older than %s days", total_moved, older_than_days)
+        return total_moved
+
+    def get_history(
+        self, db: Session, *, school_id: Optional[int] = None, include_archived: bool = True,
+        created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+        skip: int = 0, limit: int = 100
+    ) -> list:
+        """
+        Sıcak tablo ('calls') ve arşiv ('calls_archive') üzerinde birleşik çağrı geçmişi.
+        Satırlar Call sütunlarına ek olarak `is_archived` alanını içerir, en yeni önce sıralanır.
+        """
+        def _history_select(model, is_archived: bool):
+            query = select(*[getattr(model, name) for name in _ARCHIVE_COLUMNS], literal(is_archived).label("is_archived"))
+            if school_id is not None:
+                query = query.where(model.school_id == school_id)
+            if created_from is not None:
+                query = query.where(model.created_at >= created_from)
+            if created_to is not None:
+                query = query.where(model.created_at < created_to)
+            return query
+
+        history_query = _history_select(Call, False)
+        if include_archived:
+            history_query = union_all(history_query, _history_select(CallArchive, True))
+        history = history_query.subquery()
+        return db.execute(
+            select(history).order_by(history.c.created_at.desc(), history.c.id.desc()).offset(skip).limit(limit)
+        ).all()
+
 # Örnek oluşturma (app/crud/__init__.py içinde yapılacak)
 # call = CRUDCall(Call) 
\ No newline at end of file
@@ -0,0 +1,164 @@
+from typing import List, Optional, Tuple, Dict
+from datetime import date, datetime, time, timedelta
+import logging
+
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.models.call import Call, CallArchive, CallStatusEnum
+from app.models.call_stat import CallDailyStat
+from app.models.class_ import Class
+
+logger = logging.getLogger(__name__)
+
+# Hangi duruma geçişin hangi sayacı artırdığı. PENDING, çağrının oluşturulması demektir.
+_STATUS_COUNTERS = {
+    CallStatusEnum.PENDING: "total_calls",
+    CallStatusEnum.COMPLETED: "completed_calls",
+    CallStatusEnum.CANCELLED_BY_PARENT: "cancelled_calls",
+    CallStatusEnum.CANCELLED_BY_SCHOOL: "cancelled_calls",
+    CallStatusEnum.EXPIRED: "expired_calls",
+}
+
+_COUNTER_COLUMNS = ["total_calls", "completed_calls", "cancelled_calls", "expired_calls", "total_wait_seconds"]
+
+BucketKey = Tuple[int, int, date, int] # (school_id, class_id, stat_date, hour)
+
+def _wait_seconds(created_at: Optional[datetime], completed_at: Optional[datetime]) -> int:
+    if not created_at or not completed_at:
+        return 0
+    return max(0, int((completed_at - created_at).total_seconds()))
+
+def _with_average(values: dict) -> dict:
+    completed = values.get("completed_calls") or 0
+    values["avg_wait_seconds"] = (values.get("total_wait_seconds") or 0) / completed if completed else None
+    return values
+
+class CRUDCallStat:
+    # --- Artımlı güncelleme (çağrı akışı içinde, aynı transaction'da) --- #
+
+    def record_transitions(self, db: Session, *, call_ids: List[int], new_status: CallStatusEnum) -> None:
+        """
+        `call_ids` içinden durumu şu an `new_status` olan çağrılar için rollup sayaçlarını artırır. Commit etmez;
+        çağıran CRUD metodu kendi commit'i ile birlikte kaydeder. Hata olursa sadece loglanır
+        (savepoint geri alınır), çağrı işlemi etkilenmez; gece sıkıştırması farkı düzeltir.
+        """
+        counter = _STATUS_COUNTERS.get(new_status)
+        if not counter or not call_ids:
+            return
+
+        try:
+            with db.begin_nested():
+                rows = db.query(Call.school_id, Call.class_id, Call.created_at, Call.updated_at)\
+                    .filter(Call.id.in_(call_ids), Call.status == new_status).all()
+                increments: Dict[BucketKey, List[int]] = {}
+                for row in rows:
+                    if row.created_at is None:
+                        continue
+                    key = (row.school_id, row.class_id, row.created_at.date(), row.created_at.hour)
+                    bucket = increments.setdefault(key, [0, 0])
+                    bucket[0] += 1
+                    if new_status == CallStatusEnum.COMPLETED:
+                        bucket[1] += _wait_seconds(row.created_at, row.updated_at)
+
+                for key, (count, wait_seconds) in increments.items():
+                    self._increment_bucket(db, key=key, counter=counter, count=count, wait_seconds=wait_seconds)
+        except SQLAlchemyError as e:
+            logger.error(f"Call stats could not be recorded for {len(call_ids)} calls ({new_status}): {e}", exc_info=False)
+
+    def _increment_bucket(self, db: Session, *, key: BucketKey, counter: str, count: int, wait_seconds: int) -> None:
+        school_id, class_id, stat_date, hour = key
+        counter_column = getattr(CallDailyStat, counter)
+        values = {counter_column: counter_column + count}
+        if wait_seconds:
+            values[CallDailyStat.total_wait_seconds] = CallDailyStat.total_wait_seconds + wait_seconds
+        bucket_filter = [
+            CallDailyStat.school_id == school_id,
+            CallDailyStat.class_id == class_id,
+            CallDailyStat.stat_date == stat_date,
+            CallDailyStat.hour == hour,
+        ]
+
+        if db.query(CallDailyStat).filter(*bucket_filter).update(values, synchronize_session=False):
+            return
+        try:
+            with db.begin_nested():
+                db.execute(insert(CallDailyStat).values(
+                    school_id=school_id, class_id=class_id, stat_date=stat_date, hour=hour,
+                    **{counter: count, "total_wait_seconds": wait_seconds}
+                ))
+        except IntegrityError:
+            # Başka bir istek kovayı aynı anda oluşturdu, artırmaya geri dön
+            db.query(CallDailyStat).filter(*bucket_filter).update(values, synchronize_session=False)
+
+    # --- Gece sıkıştırması --- #
+
+    def rebuild_day(self, db: Session, *, stat_date: date) -> int:
+        """
+        Verilen günün tüm rollup satırlarını ham çağrı verisinden ('calls' + 'calls_archive')
+        yeniden hesaplar ve değiştirir. Artımlı sayaçlardaki olası kaymaları düzeltir.
+        Yazılan kova sayısını döndürür.
+        """
+        day_start = datetime.combine(stat_date, time.min)
+        day_end = day_start + timedelta(days=1)
+
+        buckets: Dict[BucketKey, Dict[str, int]] = {}
+        for model in (Call, CallArchive):
+            rows = db.query(model.school_id, model.class_id, model.status, model.created_at, model.updated_at)\
+                .filter(model.created_at >= day_start, model.created_at < day_end)\
+                .yield_per(1000)
+            for row in rows:
+                key = (row.school_id, row.class_id, row.created_at.date(), row.created_at.hour)
+                bucket = buckets.setdefault(key, dict.fromkeys(_COUNTER_COLUMNS, 0))
+                bucket["total_calls"] += 1
+                counter = _STATUS_COUNTERS.get(row.status)
+                if counter and counter != "total_calls":
+                    bucket[counter] += 1
+                if row.status == CallStatusEnum.COMPLETED:
+                    bucket["total_wait_seconds"] += _wait_seconds(row.created_at, row.updated_at)
+
+        db.query(CallDailyStat).filter(CallDailyStat.stat_date == stat_date).delete(synchronize_session=False)
+        if buckets:
+            db.execute(insert(CallDailyStat), [
+                {"school_id": school_id, "class_id": class_id, "stat_date": bucket_date, "hour": hour, **counters}
+                for (school_id, class_id, bucket_date, hour), counters in buckets.items()
+            ])
+        db.commit()
+        logger.info(f"Call stats rebuilt for {stat_date}: {len(buckets)} buckets")
+        return len(buckets)
+
+    # --- Okuma (analitik endpoint'leri) --- #
+
+    def _aggregate_query(self, db: Session, *group_columns, school_id: int, date_from: date, date_to: date, class_id: Optional[int] = None):
+        query = db.query(
+            *group_columns,
+            *[func.coalesce(func.sum(getattr(CallDailyStat, name)), 0).label(name) for name in _COUNTER_COLUMNS]
+        ).filter(
+            CallDailyStat.school_id == school_id,
+            CallDailyStat.stat_date >= date_from,
+            CallDailyStat.stat_date <= date_to,
+        )
+        if class_id is not None:
+            query = query.filter(CallDailyStat.class_id == class_id)
+        return query
+
+    def get_summary(self, db: Session, *, school_id: int, date_from: date, date_to: date, class_id: Optional[int] = None) -> dict:
+        row = self._aggregate_query(db, school_id=school_id, date_from=date_from, date_to=date_to, class_id=class_id).one()
+        return _with_average({"date_from": date_from, "date_to": date_to, **row._asdict()})
+
+    def get_daily(self, db: Session, *, school_id: int, date_from: date, date_to: date, class_id: Optional[int] = None) -> List[dict]:
+        rows = self._aggregate_query(db, CallDailyStat.stat_date, school_id=school_id, date_from=date_from, date_to=date_to, class_id=class_id)\
+            .group_by(CallDailyStat.stat_date).order_by(CallDailyStat.stat_date).all()
+        return [_with_average(row._asdict()) for row in rows]
+
+    def get_hourly(self, db: Session, *, school_id: int, date_from: date, date_to: date, class_id: Optional[int] = None) -> List[dict]:
+        rows = self._aggregate_query(db, CallDailyStat.hour, school_id=school_id, date_from=date_from, date_to=date_to, class_id=class_id)\
+            .group_by(CallDailyStat.hour).order_by(CallDailyStat.hour).all()
+        return [_with_average(row._asdict()) for row in rows]
+
+    def get_by_class(self, db: Session, *, school_id: int, date_from: date, date_to: date) -> List[dict]:
+        rows = self._aggregate_query(db, CallDailyStat.class_id, school_id=school_id, date_from=date_from, date_to=date_to)\
+            .group_by(CallDailyStat.class_id).order_by(CallDailyStat.class_id).all()
+        class_names = dict(db.query(Class.id, Class.class_name).filter(Class.id.in_([row.class_id for row in rows])).all()) if rows else {}
+        return [_with_average({**row._asdict(), "class_name": class_names.get(row.class_id)}) for row in rows]
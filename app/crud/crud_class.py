@@ -1,7 +1,9 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session, selectinload
 
-from app.crud.base import CRUDBase
+from app.core.lookup_cache import class_cache
+from app.core.public_response_cache import public_response_cache
+from app.crud.base import CRUDBase, merge_snapshot, orm_snapshot
 from app.models.class_ import Class
 from app.models.teacher import Teacher # Öğretmen bilgisini yüklemek için
 from app.models.student import Student # Öğrenci listesini yüklemek için
@@ -9,12 +11,23 @@ from app.models.school import School # Okul bilgisini yüklemek için
 from app.schemas.class_ import ClassCreate, ClassUpdate
 
 class CRUDClass(CRUDBase[Class, ClassCreate, ClassUpdate]):
+    """
+    Yazan metotlar sınıfın arama önbelleğini (class_cache) ve okulun public sınıf listesi yanıtlarını
+    (public_response_cache) siler; böylece hangi endpoint yazarsa yazsın önbellekler eskimez.
+    """
     def get_by_id_and_school_id(self, db: Session, class_id: int, school_id: int) -> Optional[Class]:
-        return db.query(self.model).options(
+        # Önbellekten gelen objede ilişkiler (teacher, students_in_class, school) erişildiğinde yüklenir
+        values = class_cache.get(class_id)
+        if values is not None:
+            return merge_snapshot(db, self.model, values) if values["school_id"] == school_id else None
+        db_obj = db.query(self.model).options(
             selectinload(Class.teacher),
             selectinload(Class.students_in_class),
             selectinload(Class.school)
         ).filter(self.model.id == class_id, self.model.school_id == school_id).first()
+        if db_obj:
+            class_cache.set(class_id, orm_snapshot(db_obj))
+        return db_obj
 
     def get_by_name_and_school_id(self, db: Session, class_name: str, school_id: int) -> Optional[Class]:
         return db.query(self.model).options(
@@ -38,8 +51,11 @@ class CRUDClass(CRUDBase[Class, ClassCreate, ClassUpdate]):
             .all()
         )
     
-    # CRUDBase.create kullanılacak. ClassCreate şeması school_id içermeli.
-    # Eski create_school_class metodu kaldırıldı.
+    # ClassCreate şeması school_id içermeli. Eski create_school_class metodu kaldırıldı.
+    def create(self, db: Session, obj_in: ClassCreate) -> Class:
+        db_obj = super().create(db, obj_in=obj_in)
+        public_response_cache.invalidate_classes(db_obj.school_id)
+        return db_obj
 
     def update_in_school(
         self, db: Session, *, class_id: int, obj_in: ClassUpdate, school_id: int
@@ -54,6 +70,8 @@ class CRUDClass(CRUDBase[Class, ClassCreate, ClassUpdate]):
             db.add(db_obj)
             db.commit()
             db.refresh(db_obj)
+            class_cache.invalidate(class_id)
+            public_response_cache.invalidate_classes(school_id)
             return db_obj
         return None
 
@@ -63,7 +81,21 @@ class CRUDClass(CRUDBase[Class, ClassCreate, ClassUpdate]):
             # TODO: Sınıf silinmeden önce öğrencilerin ve öğretmenin bu sınıftan çıkarılması gerekir.
             db.delete(db_obj)
             db.commit()
+            class_cache.invalidate(class_id)
+            public_response_cache.invalidate_classes(school_id)
             return db_obj
         return None
 
+    def update(self, db: Session, db_obj: Class, obj_in: ClassUpdate) -> Class:
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        class_cache.invalidate(db_obj.id)
+        public_response_cache.invalidate_classes(db_obj.school_id)
+        return db_obj
+
+    def remove(self, db: Session, id: int) -> Class:
+        db_obj = super().remove(db, id=id)
+        class_cache.invalidate(id)
+        public_response_cache.invalidate_classes(db_obj.school_id)
+        return db_obj
+
 # crud_class = CRUDClass(Class) # __init__.py'de yönetilecek 
\ No newline at end of file
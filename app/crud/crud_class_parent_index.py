@@ -0,0 +1,103 @@
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+
+from app.crud.base import insert_ignore
+from app.models.parent_student_relation import ClassParentLink, parent_student_association_table
+from app.models.student import Student
+
+INSERT_BATCH_SIZE = 1000 # Çok satırlı INSERT başına satır (parametre sınırlarının altında kalır)
+
+class CRUDClassParentIndex:
+    """
+    class_parent_links indeksinin bakımı. Yazan metotlar commit etmez; veli-öğrenci bağlantısını
+    veya öğrencinin sınıfını değiştiren işlemle aynı transaction'da çağrılırlar. Etkilenen veli
+    id'lerini döndürürler ki çağıran okunmamış bildirim sayaçlarını sıfırlayabilsin.
+    """
+
+    # --- Okuma --- #
+
+    def get_parent_user_ids(self, db: Session, *, class_id: int) -> List[int]:
+        rows = db.query(ClassParentLink.parent_user_id).filter(ClassParentLink.class_id == class_id).distinct().all()
+        return [row[0] for row in rows]
+
+    def get_class_ids(self, db: Session, *, parent_user_id: int, school_id: int) -> List[int]:
+        rows = db.query(ClassParentLink.class_id).filter(
+            ClassParentLink.parent_user_id == parent_user_id,
+            ClassParentLink.school_id == school_id,
+            ClassParentLink.class_id.isnot(None)
+        ).distinct().all()
+        return [row[0] for row in rows]
+
+    # --- Bakım --- #
+
+    def add_link(self, db: Session, *, parent_user_id: int, student: Student) -> List[int]:
+        if db.get(ClassParentLink, (parent_user_id, student.id)) is None:
+            db.add(ClassParentLink(
+                parent_user_id=parent_user_id, student_id=student.id,
+                school_id=student.school_id, class_id=student.class_id
+            ))
+        return [parent_user_id]
+
+    def add_links(self, db: Session, *, links: List[dict]) -> None:
+        """
+        Toplu ekleme (çok satırlı INSERT IGNORE). Her eleman parent_user_id, student_id,
+        school_id ve class_id içerir; indekste zaten olan bağlantılar atlanır.
+        """
+        for start in range(0, len(links), INSERT_BATCH_SIZE):
+            db.execute(insert_ignore(db, ClassParentLink.__table__).values(links[start:start + INSERT_BATCH_SIZE]))
+
+    def remove_link(self, db: Session, *, parent_user_id: int, student_id: int) -> List[int]:
+        db.query(ClassParentLink).filter(
+            ClassParentLink.parent_user_id == parent_user_id,
+            ClassParentLink.student_id == student_id
+        ).delete(synchronize_session=False)
+        return [parent_user_id]
+
+    def move_student(self, db: Session, *, student_id: int, class_id: Optional[int]) -> List[int]:
+        """
+        Öğrenci sınıf değiştirdiğinde velilerinin indeks satırlarını tek UPDATE ile taşır.
+        """
+        parent_user_ids = self._parents_of_student(db, student_id=student_id)
+        if parent_user_ids:
+            db.query(ClassParentLink).filter(ClassParentLink.student_id == student_id)\
+                .update({ClassParentLink.class_id: class_id}, synchronize_session=False)
+        return parent_user_ids
+
+    def remove_student(self, db: Session, *, student_id: int) -> List[int]:
+        parent_user_ids = self._parents_of_student(db, student_id=student_id)
+        if parent_user_ids:
+            db.query(ClassParentLink).filter(ClassParentLink.student_id == student_id).delete(synchronize_session=False)
+        return parent_user_ids
+
+    def rebuild(self, db: Session, *, school_id: Optional[int] = None) -> int:
+        """
+        İndeksi parent_student_association ve students tablolarından yeniden oluşturur
+        (ilk kurulum veya indeks dışı yapılmış toplu değişikliklerden sonra). Commit eder.
+        """
+        stale = db.query(ClassParentLink)
+        if school_id is not None:
+            stale = stale.filter(ClassParentLink.school_id == school_id)
+        stale.delete(synchronize_session=False)
+
+        source = select(
+            parent_student_association_table.c.parent_user_id,
+            parent_student_association_table.c.student_id,
+            Student.school_id,
+            Student.class_id,
+        ).join(Student, Student.id == parent_student_association_table.c.student_id)
+        if school_id is not None:
+            source = source.where(Student.school_id == school_id)
+        db.execute(insert(ClassParentLink).from_select(
+            ["parent_user_id", "student_id", "school_id", "class_id"], source
+        ))
+        db.commit()
+
+        count = db.query(ClassParentLink)
+        if school_id is not None:
+            count = count.filter(ClassParentLink.school_id == school_id)
+        return count.count()
+
+    def _parents_of_student(self, db: Session, *, student_id: int) -> List[int]:
+        rows = db.query(ClassParentLink.parent_user_id).filter(ClassParentLink.student_id == student_id).all()
+        return [row[0] for row in rows]
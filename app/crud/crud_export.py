@@ -0,0 +1,114 @@
+from datetime import date, datetime, time, timedelta
+from itertools import chain
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import Select, and_, or_, select, func
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import ColumnElement
+
+from app.models.call import Call, CallArchive
+from app.models.class_ import Class
+from app.models.parent_student_relation import parent_student_association_table
+from app.models.student import Student
+from app.models.teacher import Teacher
+from app.models.user import User
+
+EXPORT_BATCH_SIZE = 1000 # Bir sorguda çekilen satır sayısı
+
+class ExportRows(NamedTuple):
+    columns: List[str]
+    rows: Iterator[Row]
+
+class CRUDExport:
+    """
+    Okul verisinin toplu dışa aktarımı. ORM objesi oluşturulmaz; sadece gereken kolonlar seçilir ve
+    satırlar keyset sayfalama ile (WHERE key > :son ORDER BY key LIMIT EXPORT_BATCH_SIZE) partiler
+    halinde okunur. Kullanılan mysqlconnector sürücüsü sunucu taraflı cursor desteklemez (sonuçları
+    istemcide tamponlar), bu yüzden bellekte en fazla bir parti bulunur. Dönen satırlar tüketilene kadar
+    oturum açık kalmalı.
+    """
+
+    def _batches(self, db: Session, statement: Select, keys: Sequence[Tuple[ColumnElement, str]]) -> Iterator[Row]:
+        """keys: sıralama anahtarı kolonları ve sonuç satırındaki adları; birlikte benzersiz olmalıdır."""
+        columns = [column for column, _ in keys]
+        last: Optional[list] = None
+        while True:
+            page = statement
+            if last is not None:
+                page = page.where(self._after(columns, last))
+            rows = db.execute(page.order_by(*columns).limit(EXPORT_BATCH_SIZE)).all()
+            yield from rows
+            if len(rows) < EXPORT_BATCH_SIZE:
+                return
+            last = [getattr(rows[-1], name) for _, name in keys]
+
+    @staticmethod
+    def _after(columns: Sequence[ColumnElement], values: Sequence) -> ColumnElement:
+        # (a, b) > (x, y) satır karşılaştırması, MySQL'in indeks kullanabildiği OR/AND biçiminde
+        conditions = []
+        for index, column in enumerate(columns):
+            equal_prefix = [columns[i] == values[i] for i in range(index)]
+            conditions.append(and_(*equal_prefix, column > values[index]))
+        return or_(*conditions)
+
+    def _export(self, db: Session, statement: Select, keys: Sequence[Tuple[ColumnElement, str]]) -> ExportRows:
+        return ExportRows(list(statement.selected_columns.keys()), self._batches(db, statement, keys))
+
+    def students(self, db: Session, *, school_id: int) -> ExportRows:
+        return self._export(db, select(
+            Student.id, Student.student_number, Student.full_name,
+            Student.class_id, Class.class_name, Student.created_at,
+        ).outerjoin(Class, Class.id == Student.class_id)
+         .where(Student.school_id == school_id), [(Student.id, "id")])
+
+    def parents(self, db: Session, *, school_id: int) -> ExportRows:
+        """Veli-öğrenci bağlantısı başına bir satır (birden çok çocuğu olan veli birden çok satırda)."""
+        return self._export(db, select(
+            User.id.label("parent_user_id"), User.username, User.full_name, User.phone_number, User.email,
+            Student.id.label("student_id"), Student.student_number, Student.full_name.label("student_full_name"),
+        ).select_from(parent_student_association_table)
+         .join(Student, Student.id == parent_student_association_table.c.student_id)
+         .join(User, User.id == parent_student_association_table.c.parent_user_id)
+         .where(Student.school_id == school_id), [(User.id, "parent_user_id"), (Student.id, "student_id")])
+
+    def classes(self, db: Session, *, school_id: int) -> ExportRows:
+        student_counts = select(Student.class_id, func.count(Student.id).label("student_count"))\
+            .where(Student.school_id == school_id)\
+            .group_by(Student.class_id)\
+            .subquery()
+        return self._export(db, select(
+            Class.id, Class.class_name, Class.teacher_id, Teacher.full_name.label("teacher_full_name"),
+            func.coalesce(student_counts.c.student_count, 0).label("student_count"),
+        ).outerjoin(Teacher, Teacher.id == Class.teacher_id)
+         .outerjoin(student_counts, student_counts.c.class_id == Class.id)
+         .where(Class.school_id == school_id), [(Class.id, "id")])
+
+    def calls(
+        self, db: Session, *, school_id: int, date_from: Optional[date] = None, date_to: Optional[date] = None
+    ) -> ExportRows:
+        """
+        Arşivdeki ve güncel çağrılar birlikte, öğrenci/sınıf/veli adlarıyla. Önce arşiv, sonra güncel tablo
+        ayrı sorgularla ve her biri id sırasıyla okunur (arşivlenen çağrılar güncel olanlardan eskidir).
+        """
+        def history(table):
+            student, class_, parent = aliased(Student), aliased(Class), aliased(User)
+            statement = select(
+                table.id, table.status, table.created_at, table.updated_at,
+                table.student_id, student.student_number, student.full_name.label("student_full_name"),
+                table.class_id, class_.class_name,
+                table.parent_user_id, parent.full_name.label("parent_full_name"),
+            ).outerjoin(student, student.id == table.student_id)\
+             .outerjoin(class_, class_.id == table.class_id)\
+             .outerjoin(parent, parent.id == table.parent_user_id)\
+             .where(table.school_id == school_id)
+            if date_from:
+                statement = statement.where(table.created_at >= datetime.combine(date_from, time.min))
+            if date_to:
+                statement = statement.where(table.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+            return statement
+
+        archived, current = history(CallArchive), history(Call)
+        return ExportRows(list(current.selected_columns.keys()), chain(
+            self._batches(db, archived, [(CallArchive.id, "id")]),
+            self._batches(db, current, [(Call.id, "id")]),
+        ))
@@ -1,25 +1,142 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session, selectinload, joinedload
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, or_
+from sqlalchemy.exc import IntegrityError
 
 from app.crud.base import CRUDBase
-from app.models.notification import Notification, NotificationReadStatus
+from app.crud.crud_class_parent_index import CRUDClassParentIndex
+from app.models.notification import Notification, NotificationReadStatus, NotificationReadCursor, ScheduledNotification
 from app.models.user import User
 from app.models.class_ import Class
 from app.models.school import School
-from app.schemas.notification import NotificationCreate, NotificationReadStatusCreate # NotificationUpdate gerekirse eklenebilir
+from app.models.teacher import Teacher
+from app.schemas.notification import NotificationCreate, NotificationScheduleCreate, NotificationReadStatusCreate # NotificationUpdate gerekirse eklenebilir
+from app.core.unread_counter_cache import unread_counter_cache
+
+class NotificationRecipients:
+    """
+    Bir bildirimin alıcıları; bildirim başına bir kez hesaplanır ve hem sayaç artırımında
+    hem de WebSocket push'unda kullanılır. user_ids None ise okulun tamamı demektir.
+    """
+    __slots__ = ("school_id", "user_ids")
+
+    def __init__(self, school_id: int, user_ids: Optional[List[int]]):
+        self.school_id = school_id
+        self.user_ids = user_ids
+
+    @property
+    def is_whole_school(self) -> bool:
+        return self.user_ids is None
 
 class CRUDNotification(CRUDBase[Notification, NotificationCreate, None]): # NotificationUpdate şimdilik None
-    def create_with_creator(self, db: Session, obj_in: NotificationCreate, created_by_user_id: int) -> Notification:
+    def __init__(self, model, *, class_parents: CRUDClassParentIndex):
+        super().__init__(model)
+        self.class_parents = class_parents # Sınıf -> veli indeksi (crud.class_parent_index)
+
+    def create_with_creator(
+        self, db: Session, *, obj_in: NotificationCreate, creator_id: int, recipients: Optional[NotificationRecipients] = None
+    ) -> Notification:
+        """
+        Bildirimi oluşturur ve hedef kullanıcıların okunmamış sayaçlarını aynı transaction'da artırır.
+        `recipients` verilmezse burada hesaplanır (bkz. get_recipients).
+        """
+        if recipients is None:
+            recipients = self.get_recipients(db, notification=obj_in)
+        db_obj = self._insert_for_recipients(db, obj_in=obj_in, creator_id=creator_id, recipients=recipients)
+        db.commit()
+        db.refresh(db_obj)
+        self._invalidate_cached_counts(recipients)
+        return db_obj
+
+    def _insert_for_recipients(
+        self, db: Session, *, obj_in: NotificationCreate, creator_id: Optional[int], recipients: NotificationRecipients
+    ) -> Notification:
         db_obj = self.model(
-            **obj_in.dict(), 
-            created_by_user_id=created_by_user_id
+            **obj_in.dict(),
+            creator_user_id=creator_id
+        )
+        db.add(db_obj)
+        db.flush()
+        self._increment_unread_counts(db, school_id=db_obj.school_id, user_ids=recipients.user_ids)
+        return db_obj
+
+    @staticmethod
+    def _invalidate_cached_counts(recipients: NotificationRecipients) -> None:
+        if recipients.is_whole_school:
+            unread_counter_cache.invalidate_school(recipients.school_id)
+        else:
+            unread_counter_cache.invalidate_users(recipients.school_id, recipients.user_ids)
+
+    # --- Planlı bildirimler --- #
+
+    def create_scheduled(
+        self, db: Session, *, obj_in: NotificationScheduleCreate, creator_id: int
+    ) -> ScheduledNotification:
+        send_at = obj_in.send_at
+        send_at = send_at.astimezone(timezone.utc) if send_at.tzinfo else send_at.replace(tzinfo=timezone.utc)
+        db_obj = ScheduledNotification(
+            **obj_in.dict(exclude={"send_at"}),
+            send_at=send_at,
+            creator_user_id=creator_id
         )
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def get_scheduled_for_school(
+        self, db: Session, *, school_id: int, pending_only: bool = True, skip: int = 0, limit: int = 100
+    ) -> List[ScheduledNotification]:
+        query = db.query(ScheduledNotification).filter(ScheduledNotification.school_id == school_id)
+        if pending_only:
+            query = query.filter(ScheduledNotification.notification_id.is_(None))
+        return query.order_by(ScheduledNotification.send_at).offset(skip).limit(limit).all()
+
+    def cancel_scheduled(self, db: Session, *, scheduled_id: int, school_id: int) -> bool:
+        """
+        Henüz gönderilmemiş planlı bildirimi siler. Gönderilmişse veya bulunamazsa False.
+        """
+        deleted = db.query(ScheduledNotification).filter(
+            ScheduledNotification.id == scheduled_id,
+            ScheduledNotification.school_id == school_id,
+            ScheduledNotification.notification_id.is_(None)
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted > 0
+
+    def get_due_scheduled(self, db: Session, *, now: datetime, limit: int = 100) -> List[ScheduledNotification]:
+        return db.query(ScheduledNotification).filter(
+            ScheduledNotification.notification_id.is_(None),
+            ScheduledNotification.send_at <= now
+        ).order_by(ScheduledNotification.send_at).limit(limit).all()
+
+    def deliver_scheduled(
+        self, db: Session, *, scheduled: ScheduledNotification
+    ) -> Optional[Tuple[Notification, NotificationRecipients]]:
+        """
+        Planlı bildirimi gerçek bildirime dönüştürür (kayıt + sayaç artırımı + planlı kaydın işaretlenmesi
+        tek transaction). Aynı kaydı başka bir worker önce gönderdiyse None döner.
+        """
+        obj_in = NotificationCreate(
+            school_id=scheduled.school_id, title=scheduled.title, message=scheduled.message,
+            recipient_user_id=scheduled.recipient_user_id, recipient_class_id=scheduled.recipient_class_id,
+            is_general=scheduled.is_general
+        )
+        recipients = self.get_recipients(db, notification=obj_in)
+        db_obj = self._insert_for_recipients(db, obj_in=obj_in, creator_id=scheduled.creator_user_id, recipients=recipients)
+        claimed = db.query(ScheduledNotification).filter(
+            ScheduledNotification.id == scheduled.id,
+            ScheduledNotification.notification_id.is_(None)
+        ).update({ScheduledNotification.notification_id: db_obj.id}, synchronize_session=False)
+        if not claimed:
+            db.rollback()
+            return None
+        db.commit()
+        db.refresh(db_obj)
+        self._invalidate_cached_counts(recipients)
+        return db_obj, recipients
+
     def get_notification_by_id_and_school(self, db: Session, notification_id: int, school_id: int) -> Optional[Notification]:
         return db.query(self.model).options(
             selectinload(Notification.school),
@@ -27,109 +144,278 @@ class CRUDNotification(CRUDBase[Notification, NotificationCreate, None]): # Noti
             selectinload(Notification.recipient_class),
             selectinload(Notification.creator_user)
         ).filter(self.model.id == notification_id, self.model.school_id == school_id).first()
-    
+
+    # --- Hedef kitle --- #
+
+    def get_user_class_ids(self, db: Session, *, user_id: int, school_id: int) -> List[int]:
+        """
+        Kullanıcının okulda sınıfa özel bildirimlerini alacağı sınıflar:
+        veli ise çocuklarının sınıfları, öğretmen ise sorumlu olduğu sınıflar.
+        """
+        child_class_ids = self.class_parents.get_class_ids(db, parent_user_id=user_id, school_id=school_id)
+        taught_class_ids = db.query(Class.id)\
+            .join(Teacher, Class.teacher_id == Teacher.id)\
+            .filter(Teacher.user_id == user_id, Class.school_id == school_id)
+        return sorted(set(child_class_ids).union(row[0] for row in taught_class_ids.all()))
+
+    def get_recipients(self, db: Session, *, notification) -> NotificationRecipients:
+        """
+        Bildirimi görecek kullanıcılar (_visible_to_user ile aynı kural). `notification` bir Notification
+        veya henüz kaydedilmemiş bir NotificationCreate olabilir.
+        """
+        if notification.is_general:
+            return NotificationRecipients(notification.school_id, None)
+        user_ids = set()
+        if notification.recipient_user_id:
+            user_ids.add(notification.recipient_user_id)
+        if notification.recipient_class_id:
+            user_ids.update(self.class_parents.get_parent_user_ids(db, class_id=notification.recipient_class_id))
+            class_teacher_ids = db.query(Teacher.user_id)\
+                .join(Class, Class.teacher_id == Teacher.id)\
+                .filter(Class.id == notification.recipient_class_id, Teacher.user_id.isnot(None))
+            user_ids.update(row[0] for row in class_teacher_ids.all())
+        return NotificationRecipients(notification.school_id, sorted(user_ids))
+
+    def _visible_to_user(self, *, user_id: int, school_id: int, class_ids: List[int]):
+        conditions = [Notification.is_general == True, Notification.recipient_user_id == user_id]
+        if class_ids:
+            conditions.append(Notification.recipient_class_id.in_(class_ids))
+        return and_(Notification.school_id == school_id, or_(*conditions))
+
+    def get_for_user(
+        self, db: Session, *, user_id: int, school_id: int, user_class_ids: Optional[List[int]] = None,
+        skip: int = 0, limit: int = 100, unread_only: bool = False, user_role=None
+    ) -> List[Notification]:
+        """ Kullanıcının okuldaki genel ve kendisine/sınıfına özel bildirimleri (en yeni önce). """
+        if user_class_ids is None:
+            user_class_ids = self.get_user_class_ids(db, user_id=user_id, school_id=school_id)
+        query = db.query(Notification).filter(self._visible_to_user(user_id=user_id, school_id=school_id, class_ids=user_class_ids))
+        if unread_only:
+            cursor = self.get_read_cursor(db, user_id=user_id, school_id=school_id)
+            query = query.filter(*self._unread_filter(cursor))
+        return query.order_by(Notification.sent_at.desc(), Notification.id.desc()).offset(skip).limit(limit).all()
+
     def get_user_notifications_with_read_status(
         self, db: Session, user_id: int, school_id: int, skip: int = 0, limit: int = 100
     ) -> List[dict]: # NotificationWithReadInfo gibi bir şema kullanılabilir
         """ Kullanıcının okuldaki genel ve kendisine/sınıfına özel bildirimleri okundu bilgisiyle getirir."""
-        
-        # Kullanıcının sınıfını bul (eğer varsa)
-        user_class_id = db.query(User.class_id).filter(User.id == user_id).scalar_one_or_none()
-
-        # Bildirimleri ve okundu durumlarını join ile çek
-        # SQLAlchemy Core kullanarak daha optimize bir sorgu yazılabilir.
-        # Şimdilik ORM ile devam edelim.
-        
-        # Sol join NotificationReadStatus (bu kullanıcı için)
-        # Genel bildirimler (is_general=True, school_id=school_id)
-        # Kullanıcıya özel bildirimler (recipient_user_id=user_id, school_id=school_id)
-        # Sınıfa özel bildirimler (recipient_class_id=user_class_id, school_id=school_id)
-
-        query = db.query(
-            Notification,
-            NotificationReadStatus.read_at
-        ).outerjoin(
-            NotificationReadStatus, 
-            and_(
-                NotificationReadStatus.notification_id == Notification.id,
-                NotificationReadStatus.user_id == user_id
-            )
-        ).filter(Notification.school_id == school_id)
-        
-        conditions = []
-        conditions.append(Notification.is_general == True)
-        conditions.append(Notification.recipient_user_id == user_id)
-        if user_class_id:
-            conditions.append(Notification.recipient_class_id == user_class_id)
-        
-        from sqlalchemy import or_
-        query = query.filter(or_(*conditions))
-        
-        query = query.order_by(Notification.sent_at.desc()).offset(skip).limit(limit)
-        
-        results = query.all()
-        
+        notifications = self.get_for_user(db, user_id=user_id, school_id=school_id, skip=skip, limit=limit)
+        cursor = self.get_read_cursor(db, user_id=user_id, school_id=school_id)
+
         notifications_with_read_info = []
-        for notif, read_at in results:
+        for notif in notifications:
             notif_dict = notif.__dict__ # Veya şema kullanarak serialize et
-            notif_dict['is_read'] = read_at is not None
-            # İlişkili objeleri de şemaya uygun hale getirmek gerekebilir
-            # notif_dict['school'] = schemas.School.from_orm(notif.school).dict() if notif.school else None 
+            notif_dict['is_read'] = self._is_read(cursor, notif.id)
             notifications_with_read_info.append(notif_dict)
-            
+
         return notifications_with_read_info
 
-    def mark_notification_as_read(self, db: Session, notification_id: int, user_id: int, school_id: int) -> Optional[NotificationReadStatus]:
+    # --- Okundu takibi (kullanıcı × okul başına tek NotificationReadCursor satırı) --- #
+
+    def get_read_cursor(self, db: Session, *, user_id: int, school_id: int, create: bool = False) -> NotificationReadCursor:
+        """
+        Kullanıcının okuldaki cursor'ı. Henüz yoksa eski satır bazlı okundu kayıtlarından bir cursor
+        hazırlanır; `create` True ise kaydedilir (commit çağırana bırakılır), değilse kaydedilmeden döner.
+        """
+        cursor = db.query(NotificationReadCursor).filter(
+            NotificationReadCursor.user_id == user_id,
+            NotificationReadCursor.school_id == school_id
+        ).first()
+        if cursor:
+            return cursor
+
+        legacy_read_ids = db.query(NotificationReadStatus.notification_id)\
+            .join(Notification, Notification.id == NotificationReadStatus.notification_id)\
+            .filter(NotificationReadStatus.user_id == user_id, Notification.school_id == school_id)\
+            .all()
+        cursor = NotificationReadCursor(
+            user_id=user_id, school_id=school_id, last_read_notification_id=0,
+            read_notification_ids=sorted({row[0] for row in legacy_read_ids}) or None
+        )
+        if not create:
+            return cursor
+        try:
+            with db.begin_nested():
+                db.add(cursor)
+        except IntegrityError:
+            # Aynı kullanıcı için eşzamanlı bir istek cursor'ı oluşturdu
+            cursor = db.query(NotificationReadCursor).filter(
+                NotificationReadCursor.user_id == user_id,
+                NotificationReadCursor.school_id == school_id
+            ).one()
+        return cursor
+
+    def _lock_read_cursor(self, db: Session, *, user_id: int, school_id: int) -> NotificationReadCursor:
+        """
+        Cursor'ı (yoksa oluşturup) yeni bir transaction'da SELECT ... FOR UPDATE ile kilitler; bekleyen
+        değişiklikler commit edilir. Kilit transaction'ın ilk sorgusu olduğundan sonraki sayımlar kilitten önce
+        commit edilmiş bütün bildirimleri görür, bu sırada bildirim ekleyen transaction'ların
+        _increment_unread_counts'u kilit bırakılana kadar bekler. Böylece hesaplanıp yazılan mutlak sayaç
+        eşzamanlı bir artırımı ezmez ya da kaçırmaz. Kilit çağıranın commit'ine kadar tutulur.
+        """
+        self.get_read_cursor(db, user_id=user_id, school_id=school_id, create=True)
+        db.commit()
+        return db.query(NotificationReadCursor).filter(
+            NotificationReadCursor.user_id == user_id,
+            NotificationReadCursor.school_id == school_id
+        ).populate_existing().with_for_update().one()
+
+    @staticmethod
+    def _is_read(cursor: NotificationReadCursor, notification_id: int) -> bool:
+        return notification_id <= cursor.last_read_notification_id or notification_id in (cursor.read_notification_ids or ())
+
+    @staticmethod
+    def _unread_filter(cursor: NotificationReadCursor) -> list:
+        conditions = [Notification.id > cursor.last_read_notification_id]
+        if cursor.read_notification_ids:
+            conditions.append(Notification.id.notin_(cursor.read_notification_ids))
+        return conditions
+
+    def _advance_cursor(self, db: Session, cursor: NotificationReadCursor, *, class_ids: List[int]) -> None:
+        """
+        Sınırın hemen üstündeki bildirimler okunmuşsa sınırı ileri kaydırır ve istisna kümesini küçültür.
+        İlk okunmamış bildirim (varsa) tek bir indeksli MIN sorgusu ile bulunur.
+        """
+        read_ids = set(cursor.read_notification_ids or ())
+        if not read_ids:
+            return
+        first_unread_id = db.query(func.min(Notification.id)).filter(
+            self._visible_to_user(user_id=cursor.user_id, school_id=cursor.school_id, class_ids=class_ids),
+            *self._unread_filter(cursor)
+        ).scalar()
+        new_mark = max(read_ids) if first_unread_id is None else first_unread_id - 1
+        if new_mark > cursor.last_read_notification_id:
+            cursor.last_read_notification_id = new_mark
+        # JSON sütunun değiştiği anlaşılsın diye yerinde değiştirmek yerine yeni liste atanır
+        cursor.read_notification_ids = sorted(i for i in read_ids if i > cursor.last_read_notification_id) or None
+
+    def _increment_unread_counts(self, db: Session, *, school_id: int, user_ids: Optional[List[int]]) -> None:
+        # Sadece sayacı hesaplanmış cursor'lar artırılır; NULL olanlar ilk okumada zaten doğru hesaplanır
+        query = db.query(NotificationReadCursor).filter(
+            NotificationReadCursor.school_id == school_id,
+            NotificationReadCursor.unread_count.isnot(None)
+        )
+        if user_ids is not None:
+            if not user_ids:
+                return
+            query = query.filter(NotificationReadCursor.user_id.in_(user_ids))
+        query.update({NotificationReadCursor.unread_count: NotificationReadCursor.unread_count + 1}, synchronize_session=False)
+
+    def reset_unread_counts(self, db: Session, *, user_ids: List[int], school_id: Optional[int] = None) -> None:
+        """
+        Kullanıcıların gördüğü bildirim kümesi değiştiğinde (ör. çocuğu sınıf değiştirdiğinde) sayaçları
+        sıfırlar; bir sonraki okumada yeniden hesaplanırlar. Commit etmez.
+        """
+        if not user_ids:
+            return
+        query = db.query(NotificationReadCursor).filter(NotificationReadCursor.user_id.in_(user_ids))
+        if school_id is not None:
+            query = query.filter(NotificationReadCursor.school_id == school_id)
+        query.update({NotificationReadCursor.unread_count: None}, synchronize_session=False)
+        if school_id is not None:
+            unread_counter_cache.invalidate_users(school_id, user_ids)
+        else:
+            for (cursor_school_id,) in db.query(NotificationReadCursor.school_id).filter(NotificationReadCursor.user_id.in_(user_ids)).distinct():
+                unread_counter_cache.invalidate_users(cursor_school_id, user_ids)
+
+    def mark_notification_as_read(
+        self, db: Session, notification_id: int, user_id: int, school_id: int, class_ids: Optional[List[int]] = None
+    ) -> Optional[NotificationReadCursor]:
+        """
+        Tek bildirimi okundu işaretler. Cursor kilitliyken (_lock_read_cursor) güncellenir ve sayaç yeniden
+        hesaplanır; eşzamanlı işaretlemeler birbirinin okundu id'lerini ezmez.
+        """
         # Bildirimin varlığını ve okula ait olduğunu kontrol et
-        notification = self.get_notification_by_id_and_school(db, notification_id, school_id)
-        if not notification:
+        notification_exists = db.query(Notification.id).filter(
+            Notification.id == notification_id, Notification.school_id == school_id
+        ).first()
+        if not notification_exists:
             return None # Veya hata fırlat
 
-        existing_read_status = db.query(NotificationReadStatus).filter(
-            NotificationReadStatus.notification_id == notification_id,
-            NotificationReadStatus.user_id == user_id
-        ).first()
+        cursor = self._lock_read_cursor(db, user_id=user_id, school_id=school_id)
+        if self._is_read(cursor, notification_id):
+            db.commit() # Kilidi bırak
+            return cursor
 
-        if existing_read_status:
-            return existing_read_status
-        
-        db_read_status = NotificationReadStatus(notification_id=notification_id, user_id=user_id)
-        db.add(db_read_status)
+        if class_ids is None:
+            class_ids = self.get_user_class_ids(db, user_id=user_id, school_id=school_id)
+        cursor.read_notification_ids = sorted(set(cursor.read_notification_ids or ()) | {notification_id})
+        self._advance_cursor(db, cursor, class_ids=class_ids)
+        cursor.unread_count = self.get_unread_notification_count(db, user_id=user_id, school_id=school_id, class_ids=class_ids)
         db.commit()
-        db.refresh(db_read_status)
-        return db_read_status
-
-    def get_unread_notification_count(self, db: Session, user_id: int, school_id: int) -> int:
-        user_class_id = db.query(User.class_id).filter(User.id == user_id).scalar_one_or_none()
-
-        # Okunmamış bildirimleri say
-        # Notification tablosundan başlayıp, NotificationReadStatus'ta karşılığı olmayanları say.
-        query = db.query(func.count(Notification.id)).outerjoin(
-            NotificationReadStatus,
-            and_(
-                NotificationReadStatus.notification_id == Notification.id,
-                NotificationReadStatus.user_id == user_id
-            )
-        ).filter(Notification.school_id == school_id, NotificationReadStatus.id == None) # Okunmamış olanlar
-
-        conditions = []
-        conditions.append(Notification.is_general == True)
-        conditions.append(Notification.recipient_user_id == user_id)
-        if user_class_id:
-            conditions.append(Notification.recipient_class_id == user_class_id)
-        
-        from sqlalchemy import or_
-        query = query.filter(or_(*conditions))
-        
-        count = query.scalar_one_or_none() or 0
-        return count
-
-    def get_notification_read_status(self, db: Session, notification_id: int, user_id: int, school_id: int) -> Optional[NotificationReadStatus]:
-        # Önce notification'ın o school'a ait olduğunu doğrula (opsiyonel ama iyi bir pratik)
-        notification = db.query(Notification.id).filter(Notification.id == notification_id, Notification.school_id == school_id).first()
-        if not notification:
-            return None
-        return db.query(NotificationReadStatus).filter(
-            NotificationReadStatus.notification_id == notification_id,
-            NotificationReadStatus.user_id == user_id
-        ).first() 
\ No newline at end of file
+        unread_counter_cache.set(school_id, user_id, cursor.unread_count)
+        return cursor
+
+    def mark_notifications_as_read(
+        self, db: Session, *, user_id: int, school_id: int, notification_ids: Optional[List[int]] = None,
+        before: Optional[datetime] = None, class_ids: Optional[List[int]] = None
+    ) -> NotificationReadCursor:
+        """
+        Toplu okundu işaretleme. `before` verilirse o zamana kadar gönderilmiş bildirimler cursor sınırının
+        altına alınır (id'ler sent_at ile aynı sırada artar), `notification_ids` verilirse istisna kümesine
+        eklenir. Bildirim sayısından bağımsız olarak tek cursor güncellemesi yapılır; sayaç cursor
+        kilitliyken yeniden hesaplanır.
+        """
+        cursor = self._lock_read_cursor(db, user_id=user_id, school_id=school_id)
+        if class_ids is None:
+            class_ids = self.get_user_class_ids(db, user_id=user_id, school_id=school_id)
+
+        if before is not None:
+            last_id_before = db.query(func.max(Notification.id)).filter(
+                self._visible_to_user(user_id=user_id, school_id=school_id, class_ids=class_ids),
+                Notification.sent_at <= before
+            ).scalar()
+            if last_id_before and last_id_before > cursor.last_read_notification_id:
+                cursor.last_read_notification_id = last_id_before
+
+        read_ids = set(cursor.read_notification_ids or ())
+        if notification_ids:
+            # Başka okulun veya var olmayan bildirimin id'si cursor'a yazılmaz
+            school_notification_ids = db.query(Notification.id).filter(
+                Notification.id.in_(set(notification_ids)),
+                Notification.school_id == school_id
+            ).all()
+            read_ids.update(row[0] for row in school_notification_ids)
+        cursor.read_notification_ids = sorted(i for i in read_ids if i > cursor.last_read_notification_id) or None
+        self._advance_cursor(db, cursor, class_ids=class_ids)
+
+        cursor.unread_count = self.get_unread_notification_count(db, user_id=user_id, school_id=school_id, class_ids=class_ids)
+        db.commit()
+        unread_counter_cache.set(school_id, user_id, cursor.unread_count)
+        return cursor
+
+    def get_unread_notification_count(self, db: Session, user_id: int, school_id: int, class_ids: Optional[List[int]] = None) -> int:
+        """
+        Okunmamış bildirim sayısı: sadece cursor sınırının üstündeki (genelde birkaç) bildirim sayılır,
+        okundu tablosu ile join yapılmaz.
+        """
+        if class_ids is None:
+            class_ids = self.get_user_class_ids(db, user_id=user_id, school_id=school_id)
+        cursor = self.get_read_cursor(db, user_id=user_id, school_id=school_id)
+        return db.query(func.count(Notification.id)).filter(
+            self._visible_to_user(user_id=user_id, school_id=school_id, class_ids=class_ids),
+            *self._unread_filter(cursor)
+        ).scalar() or 0
+
+    def get_unread_count_cached(self, db: Session, *, user_id: int, school_id: int) -> int:
+        """
+        Sık yoklanan sayaç için: önce bellek, sonra cursor'daki artımlı sayaç; ikisi de yoksa
+        get_unread_notification_count ile hesaplanıp cursor'a yazılır.
+        """
+        cached = unread_counter_cache.get(school_id, user_id)
+        if cached is not None:
+            return cached
+
+        cursor = self.get_read_cursor(db, user_id=user_id, school_id=school_id)
+        if cursor.unread_count is None:
+            # Hesaplama ile yazma arasında gelen bildirim kaybolmasın diye cursor kilitlenip tekrar bakılır
+            cursor = self._lock_read_cursor(db, user_id=user_id, school_id=school_id)
+            if cursor.unread_count is None:
+                cursor.unread_count = self.get_unread_notification_count(db, user_id=user_id, school_id=school_id)
+            db.commit()
+        unread_counter_cache.set(school_id, user_id, cursor.unread_count)
+        return cursor.unread_count
+
+    def is_notification_read(self, db: Session, notification_id: int, user_id: int, school_id: int) -> bool:
+        cursor = self.get_read_cursor(db, user_id=user_id, school_id=school_id)
+        return self._is_read(cursor, notification_id)
@@ -1,61 +1,141 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import or_
 
-from app.crud.base import CRUDBase # CRUDBase'den direkt miras almayabilir, daha spesifik fonksiyonlar.
-from app.models.parent_student_relation import ParentStudentRelation
-from app.models.user import User
+from app.crud.base import insert_ignore
+from app.crud.crud_class_parent_index import CRUDClassParentIndex, INSERT_BATCH_SIZE
+from app.crud.crud_notification import CRUDNotification
+from app.models.parent_student_relation import parent_student_association_table
+from app.models.user import User, UserRoleEnum
 from app.models.student import Student
+from app.schemas.parent_student_relation import ParentStudentLinkItem, ParentStudentLinkConflict, ParentStudentBulkLinkResult
 # Şema olarak ParentStudentRelation için özel bir Create/Update şemasına ihtiyaç olmayabilir,
 # genelde sadece parent_user_id ve student_id üzerinden işlem yapılır.
+# İlişkiler User.students / Student.parents ile aynı tabloda (parent_student_association) tutulur;
+# ParentStudentRelation modeli (parent_student_relations) kullanılmıyor.
 
 class CRUDParentStudentRelation:
+    def __init__(self, *, class_parents: CRUDClassParentIndex, notifications: CRUDNotification):
+        self.class_parents = class_parents
+        self.notifications = notifications
+
     def add_parent_to_student(self, db: Session, student_id: int, parent_user_id: int, school_id: int) -> Optional[Student]:
         # Öğrencinin ve velinin varlığını ve öğrencinin doğru okulda olduğunu kontrol et
-        student = db.query(Student).filter(Student.id == student_id, Student.school_id == school_id).first()
+        student = db.query(Student).options(selectinload(Student.parents)).filter(Student.id == student_id, Student.school_id == school_id).first()
         parent = db.query(User).filter(User.id == parent_user_id, User.role == 'parent').first() # User.school_id kontrolü de eklenebilir
 
         if not student or not parent:
             return None
 
         # Zaten var mı kontrolü
-        existing_relation = db.query(ParentStudentRelation).filter(
-            ParentStudentRelation.student_id == student_id,
-            ParentStudentRelation.parent_user_id == parent_user_id
-        ).first()
-
-        if existing_relation:
-            # Belki hata döndürmek veya öğrenciyi direkt döndürmek daha iyi olabilir.
-            return student # Veya mevcut ilişkiyi döndür
+        if parent in student.parents:
+            return student
 
-        db_relation = ParentStudentRelation(student_id=student_id, parent_user_id=parent_user_id)
-        db.add(db_relation)
+        student.parents.append(parent)
+        self.class_parents.add_link(db, parent_user_id=parent_user_id, student=student)
+        # Velinin gördüğü sınıf bildirimleri değişti, okunmamış sayacı yeniden hesaplanmalı
+        self.notifications.reset_unread_counts(db, user_ids=[parent_user_id], school_id=school_id)
         db.commit()
-        # db.refresh(db_relation) # Gerekirse
         db.refresh(student) # Öğrencinin parents listesinin güncellenmesi için
         return student
 
     def remove_parent_from_student(self, db: Session, student_id: int, parent_user_id: int, school_id: int) -> Optional[Student]:
-        student = db.query(Student).filter(Student.id == student_id, Student.school_id == school_id).first()
+        student = db.query(Student).options(selectinload(Student.parents)).filter(Student.id == student_id, Student.school_id == school_id).first()
         if not student:
             return None
-            
-        relation = db.query(ParentStudentRelation).filter(
-            ParentStudentRelation.student_id == student_id,
-            ParentStudentRelation.parent_user_id == parent_user_id
-        ).first()
 
-        if relation:
-            db.delete(relation)
-            db.commit()
-            db.refresh(student) # Öğrencinin parents listesinin güncellenmesi için
-            return student
-        return None # İlişki bulunamadıysa
+        parent = next((user for user in student.parents if user.id == parent_user_id), None)
+        if parent is None:
+            return None # İlişki bulunamadıysa
 
-    def get_parents_of_student(self, db: Session, student_id: int, school_id: int) -> Optional[List[User]]:
-        student = db.query(Student).options(selectinload(Student.parents)).filter(
-            Student.id == student_id, 
-            Student.school_id == school_id
-        ).first()
+        student.parents.remove(parent)
+        self.class_parents.remove_link(db, parent_user_id=parent_user_id, student_id=student_id)
+        self.notifications.reset_unread_counts(db, user_ids=[parent_user_id], school_id=school_id)
+        db.commit()
+        db.refresh(student) # Öğrencinin parents listesinin güncellenmesi için
+        return student
+
+    def bulk_link(self, db: Session, *, school_id: int, items: Sequence[ParentStudentLinkItem]) -> ParentStudentBulkLinkResult:
+        """
+        Çok sayıda (öğrenci numarası, veli kullanıcı adı/telefonu) çiftini tek transaction'da bağlar.
+        Öğrenciler, veliler ve mevcut bağlantılar birer IN sorgusuyla sözlüklere alınır; yeni
+        bağlantılar çok satırlı INSERT IGNORE ile eklenir (eşzamanlı bir istek aynı çifti eklediyse
+        sessizce atlanır). Çözülemeyen çiftler sonuçta sıra numarasıyla raporlanır.
+        """
+        result = ParentStudentBulkLinkResult()
+        if not items:
+            return result
+
+        numbers = {item.student_number for item in items}
+        students_by_number: Dict[str, Tuple[int, Optional[int]]] = {
+            number: (student_id, class_id)
+            for student_id, number, class_id in db.query(Student.id, Student.student_number, Student.class_id)
+            .filter(Student.school_id == school_id, Student.student_number.in_(numbers))
+        }
+        parent_keys = {item.parent for item in items}
+        users_by_username: Dict[str, Tuple[int, UserRoleEnum]] = {}
+        users_by_phone: Dict[str, Tuple[int, UserRoleEnum]] = {}
+        for user_id, username, phone_number, role in db.query(User.id, User.username, User.phone_number, User.role)\
+                .filter(or_(User.username.in_(parent_keys), User.phone_number.in_(parent_keys))):
+            users_by_username[username] = (user_id, role)
+            if phone_number:
+                users_by_phone[phone_number] = (user_id, role)
+        student_ids = [student_id for student_id, _ in students_by_number.values()]
+        existing_links = set(
+            db.query(parent_student_association_table.c.parent_user_id, parent_student_association_table.c.student_id)
+            .filter(parent_student_association_table.c.student_id.in_(student_ids))
+            .all()
+        ) if student_ids else set()
+
+        new_links: Dict[Tuple[int, int], Optional[int]] = {} # (veli, öğrenci) -> öğrencinin sınıfı
+        for index, item in enumerate(items):
+            student = students_by_number.get(item.student_number)
+            parent = users_by_username.get(item.parent) or users_by_phone.get(item.parent) # Kullanıcı adı öncelikli
+            reason = None
+            if student is None:
+                reason = "student_not_found"
+            elif parent is None:
+                reason = "parent_not_found"
+            elif parent[1] != UserRoleEnum.PARENT:
+                reason = "not_a_parent"
+            if reason:
+                result.conflicts.append(ParentStudentLinkConflict(
+                    index=index, student_number=item.student_number, parent=item.parent, reason=reason
+                ))
+                continue
+            pair = (parent[0], student[0])
+            if pair in existing_links or pair in new_links:
+                result.already_linked += 1
+                continue
+            new_links[pair] = student[1]
+
+        if new_links:
+            rows = [{"parent_user_id": parent_user_id, "student_id": student_id} for parent_user_id, student_id in new_links]
+            for start in range(0, len(rows), INSERT_BATCH_SIZE):
+                # rowcount sadece gerçekten eklenen satırları sayar; eşzamanlı eklenmiş çiftler atlanır
+                result.linked += db.execute(
+                    insert_ignore(db, parent_student_association_table).values(rows[start:start + INSERT_BATCH_SIZE])
+                ).rowcount
+            result.already_linked += len(new_links) - result.linked
+            self.class_parents.add_links(db, links=[
+                {"parent_user_id": parent_user_id, "student_id": student_id, "school_id": school_id, "class_id": class_id}
+                for (parent_user_id, student_id), class_id in new_links.items()
+            ])
+            self.notifications.reset_unread_counts(db, user_ids=sorted({parent_user_id for parent_user_id, _ in new_links}), school_id=school_id)
+        db.commit()
+        return result
+
+    def is_parent_linked_to_student(self, db: Session, *, parent_user_id: int, student_id: int) -> bool:
+        return db.query(parent_student_association_table).filter(
+            parent_student_association_table.c.parent_user_id == parent_user_id,
+            parent_student_association_table.c.student_id == student_id
+        ).first() is not None
+
+    def get_parents_of_student(self, db: Session, student_id: int, school_id: Optional[int] = None) -> Optional[List[User]]:
+        query = db.query(Student).options(selectinload(Student.parents)).filter(Student.id == student_id)
+        if school_id is not None:
+            query = query.filter(Student.school_id == school_id)
+        student = query.first()
         return student.parents if student else None
 
     def get_students_of_parent(self, db: Session, parent_user_id: int) -> Optional[List[Student]]:
@@ -65,4 +145,4 @@ class CRUDParentStudentRelation:
             User.id == parent_user_id,
             User.role == 'parent'
         ).first()
-        return parent.students if parent else None 
\ No newline at end of file
+        return parent.students if parent else None
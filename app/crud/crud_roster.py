@@ -0,0 +1,233 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.public_response_cache import public_response_cache
+from app.core.roster_import import RosterRow, chunked
+from app.core.security import get_password_hash
+from app.crud.crud_class_parent_index import CRUDClassParentIndex
+from app.crud.crud_notification import CRUDNotification
+from app.models.class_ import Class
+from app.models.parent_student_relation import parent_student_association_table
+from app.models.student import Student
+from app.models.user import User, UserRoleEnum
+from app.schemas.roster import RosterImportResult, RosterRowError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+class _ChunkCounts:
+    __slots__ = ("classes", "students", "parents", "links")
+
+    def __init__(self):
+        self.classes = self.students = self.parents = self.links = 0
+
+class CRUDRoster:
+    """
+    Toplu öğrenci/veli/sınıf aktarımı. Her satır bir öğrenci ve (isteğe bağlı) bir velisidir;
+    aynı öğrenci numarası birden fazla satırda geçerse ek veliler bağlanır.
+
+    Satırlar parçalar (chunk) halinde işlenir. Her parça için mevcut öğrenci ve kullanıcılar tek
+    IN sorgusuyla bulunur, yeni kayıtlar çoklu INSERT (executemany) ile eklenir ve parça tek
+    transaction'da commit edilir. Mevcut kayıtlar değiştirilmez; aynı dosya tekrar aktarılırsa
+    sadece eksik bağlantılar eklenir. Hatalı satırlar atlanır ve sonuçta satır numarasıyla raporlanır.
+    """
+
+    def __init__(self, *, class_parents: CRUDClassParentIndex, notifications: CRUDNotification):
+        self.class_parents = class_parents
+        self.notifications = notifications
+
+    def import_rows(
+        self, db: Session, *, school_id: int, rows: Iterable[RosterRow],
+        default_parent_password: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> RosterImportResult:
+        result = RosterImportResult(school_id=school_id)
+        class_ids = self._load_class_ids(db, school_id=school_id)
+        password_hashes: Dict[str, str] = {} # Ortak ilk şifre tüm dosya için bir kez hash'lenir
+
+        for chunk in chunked(rows, chunk_size):
+            result.rows_processed += len(chunk)
+            counts = _ChunkCounts()
+            errors: List[RosterRowError] = []
+            try:
+                self._import_chunk(
+                    db, school_id=school_id, chunk=chunk, class_ids=class_ids, password_hashes=password_hashes,
+                    default_parent_password=default_parent_password, counts=counts, errors=errors
+                )
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                logger.error(f"Roster import chunk (rows {chunk[0][0]}-{chunk[-1][0]}) for school {school_id} failed: {e}", exc_info=False)
+                class_ids = self._load_class_ids(db, school_id=school_id) # Geri alınan sınıfları unut
+                detail = str(getattr(e, "orig", None) or e)
+                result.errors.extend(
+                    RosterRowError(row=line_no, student_number=row.get("student_number"), error=f"Batch rejected by database: {detail}")
+                    for line_no, row in chunk
+                )
+                continue
+            result.classes_created += counts.classes
+            result.students_created += counts.students
+            result.parents_created += counts.parents
+            result.links_created += counts.links
+            result.errors.extend(errors)
+
+        if result.classes_created or result.students_created:
+            public_response_cache.invalidate_classes(school_id) # Public sınıf listesi sınıfları ve öğrencileri gömer
+        logger.info(
+            f"Roster import for school {school_id}: {result.rows_processed} rows, {result.students_created} students, "
+            f"{result.parents_created} parents, {result.links_created} links, {len(result.errors)} errors"
+        )
+        return result
+
+    def _load_class_ids(self, db: Session, *, school_id: int) -> Dict[str, int]:
+        return {
+            class_name.casefold(): class_id
+            for class_id, class_name in db.query(Class.id, Class.class_name).filter(Class.school_id == school_id)
+        }
+
+    def _import_chunk(
+        self, db: Session, *, school_id: int, chunk: List[RosterRow], class_ids: Dict[str, int],
+        password_hashes: Dict[str, str], default_parent_password: Optional[str],
+        counts: _ChunkCounts, errors: List[RosterRowError]
+    ) -> None:
+        def reject(line_no: int, row: Dict[str, str], message: str) -> None:
+            errors.append(RosterRowError(row=line_no, student_number=row.get("student_number"), error=message))
+
+        # 1) Satır bazlı doğrulama
+        valid: List[RosterRow] = []
+        for line_no, row in chunk:
+            if not row.get("student_number") or not row.get("student_full_name"):
+                reject(line_no, row, "student_number and student_full_name are required")
+            elif any(row.get(key) for key in ("parent_full_name", "parent_username", "parent_phone", "parent_email")) \
+                    and not (row.get("parent_username") or row.get("parent_phone")):
+                reject(line_no, row, "parent_username or parent_phone is required to identify the parent")
+            else:
+                valid.append((line_no, row))
+        if not valid:
+            return
+
+        # 2) Parçadaki numaralar ve kullanıcılar için tek seferlik sorgular
+        numbers = {row["student_number"] for _, row in valid}
+        students_by_number: Dict[str, Tuple[int, int]] = {
+            number: (student_id, student_school_id)
+            for student_id, number, student_school_id in db.query(Student.id, Student.student_number, Student.school_id)
+            .filter(Student.student_number.in_(numbers))
+        }
+        usernames = {row.get("parent_username") or row["parent_phone"] for _, row in valid if row.get("parent_username") or row.get("parent_phone")}
+        phones = {row["parent_phone"] for _, row in valid if row.get("parent_phone")}
+        emails = {row["parent_email"] for _, row in valid if row.get("parent_email")}
+        users_by_key: Dict[str, Tuple[int, UserRoleEnum]] = {}
+        if usernames:
+            conditions = [User.username.in_(usernames)]
+            if phones:
+                conditions.append(User.phone_number.in_(phones))
+            if emails:
+                conditions.append(User.email.in_(emails))
+            existing_users = db.query(User.id, User.username, User.phone_number, User.email, User.role).filter(or_(*conditions))
+            for user_id, username, phone_number, email, role in existing_users:
+                for key in (username, phone_number, email):
+                    if key:
+                        users_by_key[key] = (user_id, role)
+
+        # 3) Yeni sınıflar, öğrenciler ve veliler
+        new_classes: Dict[str, str] = {} # casefold -> dosyadaki ilk yazım
+        new_students: Dict[str, dict] = {}
+        new_parents: Dict[str, dict] = {}
+        pending_links: List[Tuple[int, str, str]] = [] # (satır, öğrenci numarası, users_by_key'deki veli anahtarı)
+        for line_no, row in valid:
+            number = row["student_number"]
+            existing_student = students_by_number.get(number)
+            if existing_student and existing_student[1] != school_id:
+                reject(line_no, row, f"Student number {number} is already used in another school")
+                continue
+            class_name = row.get("class_name")
+            if existing_student is None and number not in new_students:
+                if class_name and class_name.casefold() not in class_ids:
+                    new_classes.setdefault(class_name.casefold(), class_name)
+                new_students[number] = {
+                    "school_id": school_id, "full_name": row["student_full_name"],
+                    "student_number": number, "class_key": class_name.casefold() if class_name else None,
+                }
+
+            username = row.get("parent_username") or row.get("parent_phone")
+            if not username:
+                continue
+            # Veli kullanıcı adı, telefonu veya e-postasıyla mevcut olabilir
+            parent_key = next((key for key in (username, row.get("parent_phone"), row.get("parent_email")) if key and key in users_by_key), None)
+            if parent_key:
+                if users_by_key[parent_key][1] != UserRoleEnum.PARENT:
+                    reject(line_no, row, f"User {username} exists and is not a parent")
+                    continue
+            elif username not in new_parents:
+                password = row.get("parent_password") or default_parent_password
+                if not row.get("parent_full_name") or not password:
+                    reject(line_no, row, "New parents need parent_full_name and a password (parent_password column or default password)")
+                    continue
+                if len(password) < 6:
+                    reject(line_no, row, "Parent password must be at least 6 characters")
+                    continue
+                if password not in password_hashes:
+                    password_hashes[password] = get_password_hash(password)
+                new_parents[username] = {
+                    "username": username, "password_hash": password_hashes[password],
+                    "full_name": row["parent_full_name"], "phone_number": row.get("parent_phone"),
+                    "email": row.get("parent_email"), "role": UserRoleEnum.PARENT,
+                    "is_active": True, "initial_password_changed": False,
+                }
+            pending_links.append((line_no, number, parent_key or username))
+
+        if new_classes:
+            db.execute(insert(Class), [{"school_id": school_id, "class_name": name} for name in new_classes.values()])
+            class_ids.update(self._load_class_ids(db, school_id=school_id))
+            counts.classes += len(new_classes)
+
+        if new_students:
+            db.execute(insert(Student), [
+                {"school_id": data["school_id"], "full_name": data["full_name"], "student_number": data["student_number"],
+                 "class_id": class_ids.get(data["class_key"]) if data["class_key"] else None}
+                for data in new_students.values()
+            ])
+            for student_id, number, student_school_id in db.query(Student.id, Student.student_number, Student.school_id)\
+                    .filter(Student.student_number.in_(new_students.keys())):
+                students_by_number[number] = (student_id, student_school_id)
+            counts.students += len(new_students)
+
+        if new_parents:
+            db.execute(insert(User), list(new_parents.values()))
+            for user_id, username in db.query(User.id, User.username).filter(User.username.in_(new_parents.keys())):
+                users_by_key[username] = (user_id, UserRoleEnum.PARENT)
+            counts.parents += len(new_parents)
+
+        # 4) Veli-öğrenci bağlantıları (ve sınıf -> veli indeksi)
+        if not pending_links:
+            return
+        student_ids = {students_by_number[number][0] for _, number, _ in pending_links if number in students_by_number}
+        existing_links = set(
+            db.query(parent_student_association_table.c.parent_user_id, parent_student_association_table.c.student_id)
+            .filter(parent_student_association_table.c.student_id.in_(student_ids))
+            .all()
+        )
+        student_classes = dict(db.query(Student.id, Student.class_id).filter(Student.id.in_(student_ids)).all())
+        new_links: Dict[Tuple[int, int], dict] = {}
+        for line_no, number, parent_key in pending_links:
+            if number not in students_by_number:
+                continue # Öğrenci satırı reddedildi
+            student_id = students_by_number[number][0]
+            parent_user_id = users_by_key[parent_key][0]
+            if (parent_user_id, student_id) in existing_links or (parent_user_id, student_id) in new_links:
+                continue
+            new_links[(parent_user_id, student_id)] = {
+                "parent_user_id": parent_user_id, "student_id": student_id,
+                "school_id": school_id, "class_id": student_classes.get(student_id),
+            }
+        if new_links:
+            db.execute(insert(parent_student_association_table), [
+                {"parent_user_id": link["parent_user_id"], "student_id": link["student_id"]} for link in new_links.values()
+            ])
+            self.class_parents.add_links(db, links=list(new_links.values()))
+            # Yeni velilerin cursor'ı yok; mevcut velilerin gördüğü sınıf bildirimleri değişti
+            self.notifications.reset_unread_counts(db, user_ids=sorted({link["parent_user_id"] for link in new_links.values()}), school_id=school_id)
+            counts.links += len(new_links)
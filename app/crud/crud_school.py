@@ -1,24 +1,74 @@
 from sqlalchemy.orm import Session
 import logging
-from typing import Optional
+from typing import Any, Optional
 
+from app.core.lookup_cache import class_cache, school_cache, school_code_cache
+from app.core.public_response_cache import public_response_cache
 from app.models.school import School
 from app.schemas.school import SchoolCreate, SchoolUpdate
-from app.crud.base import CRUDBase
+from app.crud.base import CRUDBase, merge_snapshot, orm_snapshot
 
 logger = logging.getLogger(__name__)
 
 class CRUDSchool(CRUDBase[School, SchoolCreate, SchoolUpdate]):
+    """
+    get ve get_school_by_unique_code önbellekten (app.core.lookup_cache) okur; create, update ve remove
+    ilgili kayıtları ve public okul/sınıf yanıtlarını siler. Önbellekte kolon değerleri tutulur, dönen obje
+    yine çağıranın oturumuna bağlıdır.
+    """
+
+    def create(self, db: Session, obj_in: SchoolCreate) -> School:
+        school = super().create(db, obj_in=obj_in)
+        public_response_cache.invalidate_school(school.id)
+        return school
+
+    def get(self, db: Session, id: Any) -> Optional[School]:
+        values = school_cache.get(id)
+        if values is not None:
+            return merge_snapshot(db, self.model, values)
+        school = super().get(db, id)
+        if school:
+            self._cache(school)
+        return school
+
+    def update(self, db: Session, db_obj: School, obj_in: SchoolUpdate) -> School:
+        old_unique_code = db_obj.unique_code
+        school = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        school_code_cache.invalidate(old_unique_code)
+        self._invalidate(school)
+        return school
+
+    def remove(self, db: Session, id: int) -> School:
+        school = super().remove(db, id=id)
+        if school:
+            self._invalidate(school)
+            class_cache.clear() # Silinen okulun sınıfları; okul silmek nadir bir işlem
+        return school
+
+    def _cache(self, school: School) -> None:
+        values = orm_snapshot(school)
+        school_cache.set(school.id, values)
+        school_code_cache.set(school.unique_code, values)
+
+    def _invalidate(self, school: School) -> None:
+        school_cache.invalidate(school.id)
+        school_code_cache.invalidate(school.unique_code)
+        public_response_cache.invalidate_school(school.id)
+
     def get_school_by_name(self, db: Session, name: str) -> Optional[School]:
         return db.query(self.model).filter(self.model.name == name).first()
 
     def get_school_by_unique_code(self, db: Session, unique_code: str) -> Optional[School]:
-        logger.debug(f"Searching for school with unique_code: {unique_code}")
+        values = school_code_cache.get(unique_code)
+        if values is not None:
+            return merge_snapshot(db, self.model, values)
+        logger.debug("Searching for school with unique_code: %s", unique_code)
         school = db.query(self.model).filter(self.model.unique_code == unique_code).first()
         if school:
-            logger.debug(f"Found school: {school.name}, ID: {school.id}, Code: {school.unique_code}")
+            logger.debug("Found school: %s, ID: %s, Code: %s", school.name, school.id, school.unique_code)
+            self._cache(school)
         else:
-            logger.debug(f"School with unique_code '{unique_code}' not found in database.")
+            logger.debug("School with unique_code '%s' not found in database.", unique_code)
         return school
 
 # crud_school objesi __init__.py içinde oluşturulacak veya direkt sınıf kullanılacak.
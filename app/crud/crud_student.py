@@ -1,13 +1,36 @@
-from typing import List, Optional
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
 
 from app.crud.base import CRUDBase
+from app.crud.crud_class_parent_index import CRUDClassParentIndex
+from app.crud.crud_notification import CRUDNotification
+from app.core.public_response_cache import public_response_cache
+from app.core.serialization import RowShape
+from app.models.parent_student_relation import parent_student_association_table
+from app.models.school import School
 from app.models.student import Student
 from app.models.class_ import Class # Teacher için Class importu
 from app.models.user import User # User modelini import et
-from app.schemas.student import StudentCreate, StudentUpdate
+from app.schemas.class_ import ClassBase
+from app.schemas.school import SchoolBase
+from app.schemas.student import Student as StudentSchema, StudentCreate, StudentUpdate
+from app.schemas.user import UserBase
+
+
+# Liste endpoint'lerinin hızlı yolu için schemas.Student ve iç içe şemalarının kolon eşlemeleri
+_STUDENT_SHAPE = RowShape(StudentSchema, Student.__table__)
+_SCHOOL_SHAPE = RowShape(SchoolBase, School.__table__)
+_CLASS_SHAPE = RowShape(ClassBase, Class.__table__)
+_PARENT_SHAPE = RowShape(UserBase, User.__table__)
 
 class CRUDStudent(CRUDBase[Student, StudentCreate, StudentUpdate]):
+    def __init__(self, model, *, class_parents: CRUDClassParentIndex, notifications: CRUDNotification):
+        super().__init__(model)
+        self.class_parents = class_parents # Veli bağlantısı / sınıf değişikliğinde indeks ve okunmamış sayaçları
+        self.notifications = notifications
+
     def get_by_id_and_school_id(self, db: Session, student_id: int, school_id: int) -> Optional[Student]:
         return db.query(self.model).options(
             selectinload(Student.parents),
@@ -37,9 +60,54 @@ class CRUDStudent(CRUDBase[Student, StudentCreate, StudentUpdate]):
             .all()
         )
 
-    # CRUDBase.create metodu kullanılacak. StudentCreate şemasının 
-    # okul_yonetim_api'deki gibi school_id içermesi beklenir.
-    # create_with_school metodu kaldırıldı, CRUDBase.create yeterli olmalı.
+    def get_rows_by_school(
+        self, db: Session, *, school_id: int, class_id: Optional[int] = None, skip: int = 0, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        get_multi_by_school'un liste endpoint'leri için hızlı yolu: ORM nesnesi kurulmaz, satırlar
+        schemas.Student ile aynı şekilde dict'lere çevrilir (FastJSONResponse ile doğrudan JSON'a yazılır).
+        Okul bir kez, sınıflar ve veliler sayfa başına birer sorguyla alınır. Sınıfa göre filtrelenebilir.
+        """
+        query = select(*_STUDENT_SHAPE.columns).where(Student.school_id == school_id)
+        if class_id is not None:
+            query = query.where(Student.class_id == class_id)
+        students = [_STUDENT_SHAPE.from_row(row) for row in db.execute(query.order_by(Student.id).offset(skip).limit(limit))]
+        if not students:
+            return []
+
+        school_row = db.execute(select(*_SCHOOL_SHAPE.columns).where(School.id == school_id)).first()
+        school = _SCHOOL_SHAPE.from_row(school_row) if school_row else None # Tüm öğrenciler aynı dict'i paylaşır
+
+        classes: Dict[int, Dict[str, Any]] = {}
+        class_ids = {student["class_id"] for student in students if student["class_id"] is not None}
+        if class_ids:
+            for row in db.execute(select(Class.id, *_CLASS_SHAPE.columns).where(Class.id.in_(class_ids))):
+                classes[row[0]] = _CLASS_SHAPE.from_row(row[1:])
+
+        parents: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        association = parent_student_association_table
+        parent_rows = db.execute(
+            select(association.c.student_id, *_PARENT_SHAPE.columns)
+            .select_from(association.join(User, User.id == association.c.parent_user_id))
+            .where(association.c.student_id.in_([student["id"] for student in students]))
+            .order_by(association.c.student_id, User.id)
+        )
+        for row in parent_rows:
+            parents[row[0]].append(_PARENT_SHAPE.from_row(row[1:]))
+
+        for student in students:
+            student["school"] = school
+            student["assigned_class"] = classes.get(student["class_id"])
+            student["parents"] = parents.get(student["id"], [])
+        return students
+
+    # StudentCreate şemasının okul_yonetim_api'deki gibi school_id içermesi beklenir.
+    # create_with_school metodu kaldırıldı. Yazan metotlar public sınıf listesi yanıtlarını
+    # (sınıfın öğrencilerini gömer) siler.
+    def create(self, db: Session, obj_in: StudentCreate) -> Student:
+        db_obj = super().create(db, obj_in=obj_in)
+        public_response_cache.invalidate_classes(db_obj.school_id)
+        return db_obj
 
     def create_with_parent(self, db: Session, *, obj_in: StudentCreate, parent_user: User) -> Student:
         """
@@ -53,9 +121,12 @@ class CRUDStudent(CRUDBase[Student, StudentCreate, StudentUpdate]):
         # Bu işlem parent_student_association tablosuna kayıt ekleyecektir.
         parent_user.students.append(db_obj)
         db.add(parent_user) # Veli objesini session'a ekleyerek değişikliği takip etmesini sağla
+        self.class_parents.add_link(db, parent_user_id=parent_user.id, student=db_obj)
+        self.notifications.reset_unread_counts(db, user_ids=[parent_user.id], school_id=db_obj.school_id)
         db.commit()
         db.refresh(db_obj) # Öğrenci objesini, ilişkilerle birlikte yenile
         db.refresh(parent_user) # Veli objesini de yenilemek iyi bir pratik olabilir
+        public_response_cache.invalidate_classes(db_obj.school_id)
         return db_obj
 
     def get_multi_by_parent(
@@ -103,20 +174,55 @@ class CRUDStudent(CRUDBase[Student, StudentCreate, StudentUpdate]):
             update_data = {k: v for k, v in obj_in.dict(exclude_unset=True).items() if hasattr(db_obj, k)}
             if 'school_id' in update_data: # school_id'nin bu yolla değiştirilmesini engelle
                 del update_data['school_id']
+            if 'class_id' in update_data:
+                self._sync_class_change(db, student=db_obj, class_id=update_data['class_id'])
             for field, value in update_data.items():
                 setattr(db_obj, field, value)
             db.add(db_obj)
             db.commit()
             db.refresh(db_obj)
+            public_response_cache.invalidate_classes(school_id)
             return db_obj
         return None
 
     def remove_in_school(self, db: Session, *, student_id: int, school_id: int) -> Optional[Student]:
         db_obj = self.get_by_id_and_school_id(db, student_id=student_id, school_id=school_id)
         if db_obj:
+            self._remove_from_class_parent_index(db, student=db_obj)
             db.delete(db_obj)
             db.commit()
+            public_response_cache.invalidate_classes(school_id)
             return db_obj
         return None
 
+    def update(self, db: Session, db_obj: Student, obj_in: StudentUpdate) -> Student:
+        update_data = obj_in.model_dump(exclude_unset=True)
+        if 'class_id' in update_data:
+            self._sync_class_change(db, student=db_obj, class_id=update_data['class_id'])
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        public_response_cache.invalidate_classes(db_obj.school_id)
+        return db_obj
+
+    def remove(self, db: Session, id: int) -> Student:
+        db_obj = db.query(self.model).get(id)
+        if db_obj:
+            self._remove_from_class_parent_index(db, student=db_obj)
+        db_obj = super().remove(db, id=id)
+        if db_obj:
+            public_response_cache.invalidate_classes(db_obj.school_id)
+        return db_obj
+
+    # --- Sınıf -> veli indeksi (bkz. CRUDClassParentIndex) --- #
+    # Aşağıdakiler commit etmez, öğrenci değişikliğiyle aynı transaction'da çalışır.
+
+    def _sync_class_change(self, db: Session, *, student: Student, class_id: Optional[int]) -> None:
+        if class_id == student.class_id:
+            return
+        parent_user_ids = self.class_parents.move_student(db, student_id=student.id, class_id=class_id)
+        self.notifications.reset_unread_counts(db, user_ids=parent_user_ids, school_id=student.school_id)
+
+    def _remove_from_class_parent_index(self, db: Session, *, student: Student) -> None:
+        parent_user_ids = self.class_parents.remove_student(db, student_id=student.id)
+        self.notifications.reset_unread_counts(db, user_ids=parent_user_ids, school_id=student.school_id)
+
 # student = CRUDStudent(Student) # __init__.py'de yönetilecek 
\ No newline at end of file
@@ -1,6 +1,7 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session, selectinload
 
+from app.core.public_response_cache import public_response_cache
 from app.crud.base import CRUDBase
 from app.models.teacher import Teacher
 from app.models.school import School # Okul bilgisini de yüklemek için
@@ -8,6 +9,7 @@ from app.models.class_ import Class # Sınıf bilgisini de yüklemek için
 from app.schemas.teacher import TeacherCreate, TeacherUpdate
 
 class CRUDTeacher(CRUDBase[Teacher, TeacherCreate, TeacherUpdate]):
+    # Public sınıf listesi öğretmeni gömer: yazan metotlar okulun sınıf yanıtlarını siler
     def get_by_id_and_school_id(self, db: Session, teacher_id: int, school_id: int) -> Optional[Teacher]:
         return db.query(self.model).options(
             selectinload(Teacher.assigned_classes),
@@ -40,10 +42,23 @@ class CRUDTeacher(CRUDBase[Teacher, TeacherCreate, TeacherUpdate]):
             .all()
         )
     
-    # CRUDBase.create kullanılacak. TeacherCreate şeması school_id içermeli.
-    # CRUDBase.update kullanılacak. school_id güncellemesi genelde yapılmaz.
-    # CRUDBase.remove kullanılacak. school_id ile filtreleme router seviyesinde yapılabilir veya 
+    # TeacherCreate şeması school_id içermeli. school_id güncellemesi genelde yapılmaz.
+    # school_id ile filtreleme router seviyesinde yapılabilir veya
     # remove_in_school gibi özel bir metod yazılabilir (aşağıdaki gibi).
+    def create(self, db: Session, obj_in: TeacherCreate) -> Teacher:
+        db_obj = super().create(db, obj_in=obj_in)
+        public_response_cache.invalidate_classes(db_obj.school_id)
+        return db_obj
+
+    def update(self, db: Session, db_obj: Teacher, obj_in: TeacherUpdate) -> Teacher:
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        public_response_cache.invalidate_classes(db_obj.school_id)
+        return db_obj
+
+    def remove(self, db: Session, id: int) -> Teacher:
+        db_obj = super().remove(db, id=id)
+        public_response_cache.invalidate_classes(db_obj.school_id)
+        return db_obj
 
     def update_in_school(
         self, db: Session, *, teacher_id: int, obj_in: TeacherUpdate, school_id: int
@@ -58,6 +73,7 @@ class CRUDTeacher(CRUDBase[Teacher, TeacherCreate, TeacherUpdate]):
             db.add(db_obj)
             db.commit()
             db.refresh(db_obj)
+            public_response_cache.invalidate_classes(school_id)
             return db_obj
         return None
 
@@ -67,5 +83,6 @@ class CRUDTeacher(CRUDBase[Teacher, TeacherCreate, TeacherUpdate]):
             # TODO: Öğretmen silinmeden önce atanmış olduğu sınıflardan çıkarılmalı mı?
             db.delete(db_obj)
             db.commit()
+            public_response_cache.invalidate_classes(school_id)
             return db_obj
         return None 
\ No newline at end of file
@@ -34,6 +34,19 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         db.refresh(db_user)
         return db_user
 
+    def update(self, db: Session, db_obj: User, obj_in: UserUpdate) -> User:
+        if "profile_image_url" in obj_in.model_fields_set and obj_in.profile_image_url != db_obj.profile_image_url:
+            db_obj.profile_thumbnail_url = None # Dışarıdan verilen URL'nin küçük resmi bilinmez
+        return super().update(db, db_obj, obj_in)
+
+    def set_profile_picture(self, db: Session, db_obj: User, *, profile_image_url: str, profile_thumbnail_url: Optional[str]) -> User:
+        db_obj.profile_image_url = profile_image_url
+        db_obj.profile_thumbnail_url = profile_thumbnail_url
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
     def update_password(self, db: Session, db_obj: User, new_password: str) -> User:
         hashed_password = get_password_hash(new_password)
         db_obj.password_hash = hashed_password
@@ -59,22 +72,24 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         self, db: Session, *, school_id: Optional[int] = None, role: Optional[str] = None, skip: int = 0, limit: int = 100
     ) -> List[User]:
         query = db.query(self.model).options(selectinload(User.students), selectinload(User.school))
-        logger.info(f"[CRUD] get_multi_filtered çağrıldı. school_id: {school_id}, role: {role}, skip: {skip}, limit: {limit}")
         if school_id is not None:
             query = query.filter(self.model.school_id == school_id)
-            logger.info(f"[CRUD] school_id ({school_id}) filtresi uygulandı.")
         if role is not None:
             query = query.filter(self.model.role == role)
-            logger.info(f"[CRUD] role ({role}) filtresi uygulandı.")
         
         try:
             result = query.offset(skip).limit(limit).all()
-            logger.info(f"[CRUD] Sorgu sonucu {len(result)} kullanıcı.")
         except Exception as e:
-            logger.error(f"[CRUD] Sorgu sırasında hata: {e}", exc_info=True)
+            logger.error("[CRUD] get_multi_filtered sorgusunda hata (school_id: %s, role: %s): %s", school_id, role, e, exc_info=True)
             raise
         return result
 
+    def is_profile_image_in_use(self, db: Session, *, url: str, exclude_user_id: int) -> bool:
+        """İçerik adresli resimler kullanıcılar arasında paylaşılabilir; silmeden önce kontrol edilir."""
+        return db.query(self.model.id).filter(
+            self.model.profile_image_url == url, self.model.id != exclude_user_id
+        ).first() is not None
+
     def authenticate(self, db: Session, username: str, password: str) -> Optional[User]:
         user = self.get_by_username(db, username=username)
         if not user:
@@ -6,5 +6,7 @@ from app.models.school import School
 from app.models.class_ import Class
 from app.models.student import Student
 from app.models.teacher import Teacher
-from app.models.notification import Notification, NotificationReadStatus
-from app.models.call import Call 
\ No newline at end of file
+from app.models.parent_student_relation import ClassParentLink
+from app.models.notification import Notification, NotificationReadStatus, NotificationReadCursor, ScheduledNotification
+from app.models.call import Call, CallArchive
+from app.models.call_stat import CallDailyStat 
\ No newline at end of file
@@ -5,6 +5,7 @@ from app import crud, schemas
 from app.core.config import settings
 from app.db import base  # Modellerin düzgün kaydedildiğinden emin olmak için gerekli
 from app.db.base_class import Base
+from app.db.schema_upgrades import apply_column_upgrades
 from app.models import User # User modelini import et
 # School modelini ve şemasını import et
 from app.models.school import School 
@@ -23,6 +24,7 @@ def init_initial_data(db: Session) -> None:
     logger.info("Ensuring all tables are created in the database...")
     try:
         Base.metadata.create_all(bind=db.get_bind())
+        apply_column_upgrades(db.get_bind()) # create_all mevcut tablolara yeni kolonları eklemez
         logger.info("Tables creation check/attempt complete.")
     except Exception as e:
         logger.error(f"Error during table creation: {e}", exc_info=True)
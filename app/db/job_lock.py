@@ -0,0 +1,26 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import text
+
+from app.db.database import engine
+
+@contextmanager
+def single_runner(name: str) -> Iterator[bool]:
+    """
+    Arka plan işlerinin çok worker'lı kurulumda tek bir süreçte çalışması için MySQL GET_LOCK kilidi.
+    Kilit bekleme yapılmadan denenir; alınamazsa (başka worker işi yürütüyor) False döner ve çağıran turu atlar.
+    GET_LOCK bağlantıya bağlı olduğundan kilit, iş boyunca havuzdan ayrı tutulan kendi bağlantısında
+    alınır; süreç ölürse bağlantıyla birlikte kendiliğinden bırakılır. MySQL dışındaki veritabanlarında
+    (tek süreçli geliştirme/test kurulumu) kilit yoktur, her zaman True döner.
+    """
+    if engine.dialect.name != "mysql":
+        yield True
+        return
+    with engine.connect() as connection:
+        acquired = connection.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": name}).scalar() == 1
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
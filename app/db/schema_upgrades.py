@@ -0,0 +1,39 @@
+import logging
+from typing import List, NamedTuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+class ColumnUpgrade(NamedTuple):
+    table: str
+    column: str
+    ddl: str # ALTER TABLE ... ADD COLUMN <column> <ddl>
+
+# create_all yeni tabloları oluşturur ama mevcut tablolara kolon eklemez. Var olan bir tabloya
+# modelde sonradan eklenen kolonlar buraya yazılır. Tabloyu create_all oluşturduysa kolon zaten vardır, atlanır.
+COLUMN_UPGRADES: List[ColumnUpgrade] = [
+    ColumnUpgrade("calls", "version", "INT NOT NULL DEFAULT 1"),
+    ColumnUpgrade("calls_archive", "version", "INT NOT NULL DEFAULT 1"),
+    ColumnUpgrade("schools", "geofence_latitude", "FLOAT NULL"),
+    ColumnUpgrade("schools", "geofence_longitude", "FLOAT NULL"),
+    ColumnUpgrade("schools", "geofence_radius_meters", "INT NULL"),
+    ColumnUpgrade("schools", "geofence_polygon", "JSON NULL"),
+    ColumnUpgrade("users", "profile_thumbnail_url", "VARCHAR(512) NULL"),
+]
+
+def apply_column_upgrades(engine: Engine) -> List[str]:
+    """Eksik kolonları ekler (tekrar çalıştırılabilir); eklenenleri "tablo.kolon" olarak döner."""
+    inspector = inspect(engine)
+    added = []
+    with engine.begin() as connection:
+        for upgrade in COLUMN_UPGRADES:
+            if not inspector.has_table(upgrade.table):
+                continue
+            if upgrade.column in {column["name"] for column in inspector.get_columns(upgrade.table)}:
+                continue
+            connection.execute(text(f"ALTER TABLE {upgrade.table} ADD COLUMN {upgrade.column} {upgrade.ddl}"))
+            added.append(f"{upgrade.table}.{upgrade.column}")
+            logger.info("Added column %s.%s", upgrade.table, upgrade.column)
+    return added
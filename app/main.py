@@ -1,37 +1,69 @@
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html, get_swagger_ui_oauth2_redirect_html
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
-from app.api.api_v1 import api_router
+from app.api.api_v1 import include_api_routers
 from app.core.config import settings
-from app.core.ratelimit import limiter, custom_rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
+from app.core.logging_setup import setup_logging
+from app.core.ratelimit import RateLimitMiddleware
+from app.core.request_size_limit import RequestSizeLimitMiddleware
 
 from contextlib import asynccontextmanager
+import asyncio
 
-# Loglama yapılandırması
-log_level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
-logging.basicConfig(
-    level=log_level,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
+from app.core.cache_backend import cache_backend
+from app.core.call_archiver import call_archiver_loop
+from app.core.call_stats_compactor import call_stats_compactor_loop
+from app.core.notification_delivery import notification_delivery_queue, scheduled_notification_loop
+from app.core.media_files import MediaFiles
+from app.core.openapi_document import OpenAPIDocument
+from app.core.profile_pictures import STATIC_DIR, shutdown_variant_pool
+
+# Loglama yapılandırması (JSON satırları, kuyruk üzerinden arka plan thread'inde yazılır)
+setup_logging(settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_SAMPLING)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("%s - Main API startup...", settings.PROJECT_NAME)
+    cache_backend.start() # Diğer worker'lardan gelen önbellek silme mesajları
+    try:
+        # Doküman istek gelmeden hazırlanır ki /docs açılışı bir worker'ı bekletmesin
+        openapi_document.build()
+        if settings.OPENAPI_OUTPUT_FILE:
+            openapi_document.write(settings.OPENAPI_OUTPUT_FILE)
+    except Exception as e:
+        logger.error(f"OpenAPI document could not be built at startup: {e}", exc_info=True)
+    background_tasks = []
+    if settings.CALL_ARCHIVE_ENABLED:
+        background_tasks.append(asyncio.create_task(call_archiver_loop()))
+    if settings.CALL_STATS_COMPACTION_ENABLED:
+        background_tasks.append(asyncio.create_task(call_stats_compactor_loop()))
+    if settings.NOTIFICATION_DELIVERY_WORKER_ENABLED:
+        background_tasks.append(asyncio.create_task(notification_delivery_queue.worker()))
+        background_tasks.append(asyncio.create_task(scheduled_notification_loop()))
+    yield
+    for task in background_tasks:
+        task.cancel()
+    cache_backend.close()
+    shutdown_variant_pool()
+    logger.info("%s - Main API shutdown...", settings.PROJECT_NAME)
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Veli-Öğrenci çağırma sistemi API'si",
     version="1.0.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json",
-    docs_url="/docs",
-    redoc_url="/redoc"
+    # /openapi.json, /docs ve /redoc aşağıda hazır OpenAPI dokümanından servis edilir
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
+    lifespan=lifespan
 )
-
-# Rate Limiting state ve handler ekleniyor
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, custom_rate_limit_exceeded_handler)
+OPENAPI_URL = f"{settings.API_V1_STR}/openapi.json"
+openapi_document = OpenAPIDocument(app.openapi)
 
 # RequestValidationError için özel exception handler
 @app.exception_handler(RequestValidationError)
@@ -44,6 +76,12 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"detail": error_details},
     )
 
+# Yükleme boyutu sınırı, multipart gövdesi ayrıştırılmadan önce (rate limit'in içinde çalışır)
+app.add_middleware(RequestSizeLimitMiddleware)
+
+# Rate limiting (CORS'tan önce eklenir ki 429 yanıtları da CORS başlıklarını alsın)
+app.add_middleware(RateLimitMiddleware)
+
 # CORS ayarları
 app.add_middleware(
     CORSMiddleware,
@@ -53,15 +91,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(api_router, prefix=settings.API_V1_STR)
+include_api_routers(app, settings.API_V1_STR)
+app.mount("/static", MediaFiles(STATIC_DIR), name="static") # Profil resimleri (bkz. app.core.profile_pictures)
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    logger.info(f"{settings.PROJECT_NAME} - Main API startup...")
-    yield
-    logger.info(f"{settings.PROJECT_NAME} - Main API shutdown...")
+@app.get(OPENAPI_URL, include_in_schema=False)
+async def openapi_json(request: Request):
+    return openapi_document.respond(request)
+
+@app.get("/docs", include_in_schema=False)
+async def swagger_ui_html():
+    return get_swagger_ui_html(
+        openapi_url=OPENAPI_URL, title=f"{app.title} - Swagger UI", oauth2_redirect_url="/docs/oauth2-redirect"
+    )
+
+@app.get("/docs/oauth2-redirect", include_in_schema=False)
+async def swagger_ui_redirect():
+    return get_swagger_ui_oauth2_redirect_html()
 
-app.router.lifespan_context_manager = lifespan
+@app.get("/redoc", include_in_schema=False)
+async def redoc_html():
+    return get_redoc_html(openapi_url=OPENAPI_URL, title=f"{app.title} - ReDoc")
 
 @app.get("/")
 async def root():
@@ -4,9 +4,10 @@ from .user import User, UserRoleEnum
 from .student import Student
 from .class_ import Class # class_.py'dan Class
 from .teacher import Teacher
-from .parent_student_relation import ParentStudentRelation, parent_student_association_table
-from .notification import Notification, NotificationReadStatus
-from .call import Call, CallStatusEnum
+from .parent_student_relation import ParentStudentRelation, ClassParentLink, parent_student_association_table
+from .notification import Notification, NotificationReadStatus, NotificationReadCursor, ScheduledNotification
+from .call import Call, CallArchive, CallStatusEnum
+from .call_stat import CallDailyStat
 
 # SQLAlchemy Base sınıfı (tüm modellerin miras aldığı)
 from ..db.base_class import Base
@@ -18,7 +19,8 @@ __all__ = [
     "Student",
     "Class",
     "Teacher",
-    "ParentStudentRelation", "parent_student_association_table",
-    "Notification", "NotificationReadStatus",
-    "Call", "CallStatusEnum",
+    "ParentStudentRelation", "ClassParentLink", "parent_student_association_table",
+    "Notification", "NotificationReadStatus", "NotificationReadCursor", "ScheduledNotification",
+    "Call", "CallArchive", "CallStatusEnum",
+    "CallDailyStat",
 ] 
\ No newline at end of file
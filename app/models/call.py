@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum as SQLAlchemyEnum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, Enum as SQLAlchemyEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -24,6 +24,9 @@ class Call(Base):
     class_id = Column(Integer, ForeignKey("classes.id"), nullable=False, index=True) # Öğrencinin çağrı anındaki sınıfı
 
     status = Column(SQLAlchemyEnum(CallStatusEnum), nullable=False, default=CallStatusEnum.PENDING, index=True)
+    # İyimser eşzamanlılık (optimistic concurrency) için sürüm numarası; her durum değişikliğinde artar.
+    # Durum güncellemeleri "WHERE id = ? AND version = ?" ile yapılır (compare-and-swap), satır kilidi gerekmez.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -31,4 +34,28 @@ class Call(Base):
     student = relationship("Student", back_populates="calls")
     parent = relationship("User", back_populates="sent_calls") # User modelinde 'sent_calls' tanımlanacak
     school = relationship("School", back_populates="calls")   # School modelinde 'calls' tanımlanacak
-    class_ = relationship("Class", back_populates="calls")    # Class modelinde 'calls' tanımlanacak 
\ No newline at end of file
+    class_ = relationship("Class", back_populates="calls")    # Class modelinde 'calls' tanımlanacak
+
+
+class CallArchive(Base):
+    """
+    Tamamlanmış / iptal edilmiş / süresi dolmuş eski çağrıların arşivi.
+    Arşivleme işi (crud.call.archive_finished_calls) satırları 'calls' tablosundan buraya taşır,
+    böylece sıcak tablo küçük kalır. Sütunlar Call ile aynıdır, id korunur.
+    """
+    __tablename__ = "calls_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False) # Orijinal Call.id
+    student_id = Column(Integer, nullable=False, index=True)
+    parent_user_id = Column(Integer, nullable=False, index=True)
+    school_id = Column(Integer, nullable=False)
+    class_id = Column(Integer, nullable=False, index=True)
+    status = Column(SQLAlchemyEnum(CallStatusEnum), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_calls_archive_school_id_created_at", "school_id", "created_at"),
+    ) 
\ No newline at end of file
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, BigInteger, Date, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+class CallDailyStat(Base):
+    """
+    Çağrı analitiği için önceden toplanmış (rollup) sayaçlar.
+    Her satır bir okul / sınıf / gün / saat kovasıdır; kova çağrının oluşturulma zamanına göre belirlenir.
+    Sayaçlar çağrı durum değiştirdikçe artırılır (crud.call_stat.record_transitions) ve
+    gece çalışan sıkıştırma işiyle (crud.call_stat.rebuild_day) ham verilerden yeniden hesaplanır.
+    """
+    __tablename__ = "call_daily_stats"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    school_id = Column(Integer, ForeignKey("schools.id"), nullable=False)
+    class_id = Column(Integer, nullable=False) # Sınıf silinse bile geçmiş istatistik kalsın diye FK yok
+    stat_date = Column(Date, nullable=False)
+    hour = Column(Integer, nullable=False) # 0-23
+
+    total_calls = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_calls = Column(Integer, nullable=False, default=0, server_default="0")
+    cancelled_calls = Column(Integer, nullable=False, default=0, server_default="0")
+    expired_calls = Column(Integer, nullable=False, default=0, server_default="0")
+    total_wait_seconds = Column(BigInteger, nullable=False, default=0, server_default="0") # PENDING -> COMPLETED süreleri toplamı
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("school_id", "class_id", "stat_date", "hour", name="uq_call_daily_stats_bucket"),
+        Index("ix_call_daily_stats_school_id_stat_date", "school_id", "stat_date"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..db.base_class import Base # Updated import
@@ -23,6 +23,8 @@ class Notification(Base):
     read_statuses = relationship("NotificationReadStatus", back_populates="notification_details")
 
 class NotificationReadStatus(Base):
+    # Eski okundu takibi (bildirim × kullanıcı başına bir satır). Artık yazılmıyor; NotificationReadCursor
+    # ilk oluşturulduğunda kullanıcının buradaki kayıtları cursor'a aktarılır.
     __tablename__ = "notification_read_statuses"  # Tablo adını açıkça belirtiyoruz
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -31,4 +33,46 @@ class NotificationReadStatus(Base):
     read_at = Column(DateTime(timezone=True), server_default=func.now())
 
     notification_details = relationship("Notification", back_populates="read_statuses")
-    reader_user = relationship("User", back_populates="notification_read_statuses") 
\ No newline at end of file
+    reader_user = relationship("User", back_populates="notification_read_statuses")
+
+class NotificationReadCursor(Base):
+    """
+    Kullanıcının bir okuldaki bildirim okuma durumu, tek satırda:
+    - last_read_notification_id: bu ID'ye kadar (dahil) kullanıcının gördüğü tüm bildirimler okunmuş.
+    - read_notification_ids: bu sınırın üstünde tek tek okunmuş bildirim ID'leri (seyrek, sıralı liste).
+    Okundu işaretleme bu satırı günceller; sınır, arada okunmamış bildirim kalmadıkça ileri kaydırılır.
+    - unread_count: artımlı tutulan okunmamış sayısı (yeni bildirimde +1, okundu işaretlemede -1).
+      NULL ise henüz hesaplanmamış veya sıfırlanmış demektir; ilk okumada yeniden hesaplanır.
+    """
+    __tablename__ = "notification_read_cursors"
+    __table_args__ = (
+        UniqueConstraint("user_id", "school_id", name="uq_notification_read_cursors_user_school"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    school_id = Column(Integer, ForeignKey("schools.id"), nullable=False)
+    last_read_notification_id = Column(Integer, nullable=False, default=0, server_default="0")
+    read_notification_ids = Column(JSON, nullable=True)
+    unread_count = Column(Integer, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class ScheduledNotification(Base):
+    """
+    İleri bir tarihte gönderilecek bildirim. Zamanı gelince arka plan işi bunu normal bir
+    Notification olarak kaydeder ve notification_id'yi doldurur; o ana kadar hiçbir kullanıcının
+    gelen kutusunda görünmez (okundu cursor'ı artan ID'lere dayandığı için önceden ID alınmaz).
+    """
+    __tablename__ = "scheduled_notifications"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    school_id = Column(Integer, ForeignKey("schools.id"), nullable=False)
+    title = Column(String(255), nullable=False)
+    message = Column(Text, nullable=False)
+    recipient_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    recipient_class_id = Column(Integer, ForeignKey("classes.id"), nullable=True)
+    is_general = Column(Boolean, default=False)
+    creator_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    send_at = Column(DateTime(timezone=True), nullable=False, index=True) # UTC
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    notification_id = Column(Integer, ForeignKey("notifications.id"), nullable=True) # Gönderildiyse oluşan bildirim
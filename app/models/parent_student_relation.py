@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Table
+from sqlalchemy import Column, Integer, ForeignKey, Table, Index
 from app.db.base_class import Base # ..db.base_class yerine app.db.base_class
 
 # Association Table for Parent-Student Many-to-Many relationship
@@ -22,4 +22,20 @@ class ParentStudentRelation(Base):
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
     
     # İlişkiye özel ek alanlar buraya eklenebilir, örneğin:
-    # relation_type = Column(String, nullable=True) # "mother", "father", "guardian" 
\ No newline at end of file
+    # relation_type = Column(String, nullable=True) # "mother", "father", "guardian" 
+class ClassParentLink(Base):
+    """
+    Sınıf -> veli indeksi: parent_student_association satırlarının öğrencinin okul ve sınıfıyla
+    birlikte tutulan kopyası. Sınıfa özel bildirimlerin alıcıları ve velinin sınıfları
+    join yapılmadan tek indeksli sorguyla bulunur. crud.class_parent_index ile güncel tutulur.
+    """
+    __tablename__ = "class_parent_links"
+
+    parent_user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    school_id = Column(Integer, ForeignKey("schools.id"), nullable=False)
+    class_id = Column(Integer, ForeignKey("classes.id"), nullable=True, index=True) # Sınıfı atanmamış öğrenciler için NULL
+
+    __table_args__ = (
+        Index("ix_class_parent_links_parent_school", "parent_user_id", "school_id", "class_id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..db.base_class import Base
@@ -10,6 +10,11 @@ class School(Base):
     name = Column(String(255), unique=True, index=True, nullable=False)
     unique_code = Column(String(100), unique=True, index=True, nullable=False, comment="Okulu benzersiz şekilde tanımlayan kod (setup için)")
     address = Column(Text, nullable=True)
+    # Çağrı konum kontrolü için okul bölgesi: merkez + yarıçap veya çokgen ([[lat, lon], ...]). Çokgen varsa o kullanılır.
+    geofence_latitude = Column(Float, nullable=True)
+    geofence_longitude = Column(Float, nullable=True)
+    geofence_radius_meters = Column(Integer, nullable=True)
+    geofence_polygon = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
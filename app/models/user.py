@@ -21,6 +21,7 @@ class User(Base):
     email = Column(String(255), unique=True, index=True, nullable=True)
     phone_number = Column(String(50), unique=True, index=True, nullable=True)
     profile_image_url = Column(String(512), nullable=True)
+    profile_thumbnail_url = Column(String(512), nullable=True) # Küçük WebP varyantı; profil resmi yüklenirken yazılır
     birth_date = Column(String(20), nullable=True) # YYYY-MM-DD veya YYYY olabilir
     
     role = Column(SQLAlchemyEnum(UserRoleEnum), nullable=False, default=UserRoleEnum.PARENT)
@@ -45,4 +46,4 @@ class User(Base):
 
     # For notification read statuses - Artık notification_read_statuses adıyla yukarıda tanımlandı
     # Bu satır tamamen kaldırılacak
-    # read_statuses = relationship("NotificationReadStatus", back_populates="reader_user")
\ No newline at end of file
+    # read_statuses = relationship("NotificationReadStatus", back_populates="reader_user")
@@ -5,16 +5,21 @@ from .student import StudentBase, StudentCreateNoSchoolId, StudentCreate, Studen
 from .teacher import TeacherBase, TeacherCreateNoSchoolId, TeacherCreate, TeacherUpdate, TeacherInDBBase, Teacher
 from .class_ import ClassBase, ClassCreateNoSchoolId, ClassCreate, ClassUpdate, ClassInDBBase, Class
 from .notification import (
-    NotificationBase, NotificationCreateNoSchoolId, NotificationCreate, 
+    NotificationBase, NotificationCreateNoSchoolId, NotificationCreate, NotificationScheduleCreate, ScheduledNotification,
     NotificationInDBBase, Notification, NotificationWithReadInfo,
     NotificationReadStatusBase, NotificationReadStatusCreate, 
-    NotificationReadStatusInDBBase, NotificationReadStatus
+    NotificationReadStatusInDBBase, NotificationReadStatus, NotificationMarkReadResult, NotificationBulkMarkRead, NotificationUnreadCount
 )
 from .app_settings import (
     SchoolAppSettingsBase, SchoolAppSettingsCreate, 
     SchoolAppSettingsInDBBase, SchoolAppSettings
 )
 from .location import LocationConfig
+from .call_stat import CallStatsBase, CallStatsSummary, CallStatsDaily, CallStatsHourly, CallStatsByClass
+from .roster import RosterRowError, RosterImportResult
+from .export import ExportFormat
+from .cache import CacheStats
+from .parent_student_relation import ParentStudentLinkItem, ParentStudentBulkLink, ParentStudentLinkConflict, ParentStudentBulkLinkResult
 
 from .legacy_schemas import (
     LegacyVeliBase, LegacyVeliCreate, LegacyVeliInDBBase, LegacyVeli, LegacyVeliUpdate, LegacyVeliWithOgrenciler,
@@ -22,7 +27,7 @@ from .legacy_schemas import (
     LegacyCagriBase, LegacyCagriCreate, LegacyCagri, LegacyCagriUpdate
 )
 
-from .call import CallStatusEnum, CallBase, CallCreate, CallStatusUpdate, CallInDBBase, Call
+from .call import CallStatusEnum, CallBase, CallCreate, CallStatusUpdate, CallBulkStatusUpdate, CallBulkStatusResult, PickupLocationUpdate, PickupQueueEntry, CallInDBBase, CallHistoryItem, Call
 
 __all__ = [
     "Token", "TokenData",
@@ -31,14 +36,19 @@ __all__ = [
     "StudentBase", "StudentCreateNoSchoolId", "StudentCreate", "StudentUpdate", "StudentInDBBase", "Student",
     "TeacherBase", "TeacherCreateNoSchoolId", "TeacherCreate", "TeacherUpdate", "TeacherInDBBase", "Teacher",
     "ClassBase", "ClassCreateNoSchoolId", "ClassCreate", "ClassUpdate", "ClassInDBBase", "Class",
-    "NotificationBase", "NotificationCreateNoSchoolId", "NotificationCreate",
+    "NotificationBase", "NotificationCreateNoSchoolId", "NotificationCreate", "NotificationScheduleCreate", "ScheduledNotification",
     "NotificationInDBBase", "Notification", "NotificationWithReadInfo",
     "NotificationReadStatusBase", "NotificationReadStatusCreate",
-    "NotificationReadStatusInDBBase", "NotificationReadStatus",
+    "NotificationReadStatusInDBBase", "NotificationReadStatus", "NotificationMarkReadResult", "NotificationBulkMarkRead", "NotificationUnreadCount",
     "SchoolAppSettingsBase", "SchoolAppSettingsCreate",
     "SchoolAppSettingsInDBBase", "SchoolAppSettings",
     "LocationConfig",
-    "CallStatusEnum", "CallBase", "CallCreate", "CallStatusUpdate", "CallInDBBase", "Call",
+    "CallStatsBase", "CallStatsSummary", "CallStatsDaily", "CallStatsHourly", "CallStatsByClass",
+    "RosterRowError", "RosterImportResult",
+    "ExportFormat",
+    "CacheStats",
+    "ParentStudentLinkItem", "ParentStudentBulkLink", "ParentStudentLinkConflict", "ParentStudentBulkLinkResult",
+    "CallStatusEnum", "CallBase", "CallCreate", "CallStatusUpdate", "CallBulkStatusUpdate", "CallBulkStatusResult", "PickupLocationUpdate", "PickupQueueEntry", "CallInDBBase", "CallHistoryItem", "Call",
     "LegacyVeliBase", "LegacyVeliCreate", "LegacyVeliInDBBase", "LegacyVeli", "LegacyVeliUpdate", "LegacyVeliWithOgrenciler",
     "LegacyOgrenciBase", "LegacyOgrenciCreate", "LegacyOgrenci", "LegacyOgrenciUpdate",
     "LegacyCagriBase", "LegacyCagriCreate", "LegacyCagri", "LegacyCagriUpdate",
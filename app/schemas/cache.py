@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+class CacheStats(BaseModel):
+    name: str
+    size: int
+    max_entries: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    evictions: int # LRU sınırı yüzünden atılanlar
+    expirations: int # TTL'i dolduğu için atılanlar
+    hit_ratio: float
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, ForwardRef, TYPE_CHECKING
+from typing import Optional, List, ForwardRef, TYPE_CHECKING
 from datetime import datetime
 
 from app.models.call import CallStatusEnum # Modeldeki Enum'ı import ediyoruz
@@ -17,11 +17,40 @@ class CallBase(BaseModel):
 
 class CallCreate(BaseModel):
     student_id: int = Field(..., description="Çağrının yapıldığı öğrencinin ID'si")
+    latitude: Optional[float] = Field(None, ge=-90, le=90, description="Velinin çağrı anındaki enlemi (okul bölgesi kontrolü için)")
+    longitude: Optional[float] = Field(None, ge=-180, le=180, description="Velinin çağrı anındaki boylamı")
     # Veli kendi ID'sini göndermeyecek, token'dan alınacak.
     # Okul ve sınıf ID'si öğrenci üzerinden belirlenecek.
 
 class CallStatusUpdate(BaseModel):
     status: CallStatusEnum = Field(..., description="Çağrının yeni durumu")
+    version: Optional[int] = Field(None, description="İstemcinin bildiği çağrı sürümü. Verilirse ve güncel değilse 409 döner.")
+
+class CallBulkStatusUpdate(BaseModel):
+    call_ids: List[int] = Field(..., min_length=1, max_length=500, description="Durumu güncellenecek çağrıların ID'leri")
+    status: CallStatusEnum = Field(..., description="Çağrıların yeni durumu")
+
+class CallBulkStatusResult(BaseModel):
+    status: CallStatusEnum
+    updated_call_ids: List[int] = []
+    skipped_call_ids: List[int] = [] # İzin verilmeyen geçiş, farklı okul veya bulunamayan çağrılar
+
+# Velinin canlı konum akışı (WebSocket mesajı) ve teslim kuyruğu
+class PickupLocationUpdate(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+
+class PickupQueueEntry(BaseModel):
+    call_id: int
+    student_id: int
+    parent_user_id: int
+    class_id: int
+    distance_meters: float = Field(..., description="Okul merkezine kuş uçuşu mesafe")
+    eta_seconds: float = Field(..., description="Tahmini varış süresi (saniye)")
+    updated_at: datetime = Field(..., description="Son konum güncellemesi")
+
+    class Config:
+        from_attributes = True
 
 # DB'den okunan temel şema (ID ve timestamp'ler dahil)
 class CallInDBBase(CallBase):
@@ -30,12 +59,17 @@ class CallInDBBase(CallBase):
     school_id: int
     class_id: int
     status: CallStatusEnum
+    version: int = 1
     created_at: datetime
     updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
+# Birleşik çağrı geçmişi (sıcak tablo + arşiv) satırı
+class CallHistoryItem(CallInDBBase):
+    is_archived: bool = False
+
 # API yanıtları için tam şema (ilişkilerle birlikte)
 class Call(CallInDBBase):
     student: Optional[ForwardRef("StudentSchema")] = None
@@ -44,10 +78,10 @@ class Call(CallInDBBase):
     class_: Optional[ForwardRef("ClassSchema")] = Field(None, alias="class_info") # 'class' Python keyword'ü olduğu için alias
 
 # ForwardRef'leri çözmek için
-# Bu importlar, update_forward_refs çalışmadan önce ilgili modüllerin yüklenmesini sağlar.
+# Bu importlar, model_rebuild çalışmadan önce ilgili modüllerin yüklenmesini sağlar.
 from .student import Student as StudentSchema
 from .user import User as UserSchema
 from .school import School as SchoolSchema
 from .class_ import Class as ClassSchema
 
-Call.update_forward_refs() 
\ No newline at end of file
+Call.model_rebuild() 
\ No newline at end of file
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+# Çağrı analitiği yanıt şemaları (rollup tablolarından okunur)
+
+class CallStatsBase(BaseModel):
+    total_calls: int = 0
+    completed_calls: int = 0
+    cancelled_calls: int = 0
+    expired_calls: int = 0
+    total_wait_seconds: int = 0
+    avg_wait_seconds: Optional[float] = None # PENDING -> COMPLETED ortalama bekleme süresi
+
+class CallStatsSummary(CallStatsBase):
+    date_from: date
+    date_to: date
+
+class CallStatsDaily(CallStatsBase):
+    stat_date: date
+
+class CallStatsHourly(CallStatsBase):
+    hour: int
+
+class CallStatsByClass(CallStatsBase):
+    class_id: int
+    class_name: Optional[str] = None
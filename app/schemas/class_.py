@@ -43,4 +43,4 @@ class Class(ClassInDBBase):
 from .school import SchoolBase
 from .teacher import TeacherBase
 from .student import StudentBase
-Class.update_forward_refs() 
\ No newline at end of file
+Class.model_rebuild() 
\ No newline at end of file
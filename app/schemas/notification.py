@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, AliasChoices
 from typing import Optional, List
 from datetime import datetime
 from .school import SchoolBase
@@ -23,10 +23,23 @@ class NotificationCreateNoSchoolId(BaseModel):
 class NotificationCreate(NotificationBase):
     pass
 
+class NotificationScheduleCreate(NotificationCreate):
+    send_at: datetime = Field(..., description="Gönderim zamanı; saat dilimi yoksa UTC kabul edilir")
+
+class ScheduledNotification(NotificationBase):
+    id: int
+    send_at: datetime
+    created_at: Optional[datetime] = None
+    notification_id: Optional[int] = None # Gönderildiyse oluşan bildirimin ID'si
+    created_by_user_id: Optional[int] = Field(None, validation_alias=AliasChoices("creator_user_id", "created_by_user_id"))
+
+    class Config:
+        from_attributes = True
+
 class NotificationInDBBase(NotificationBase):
     id: int
     sent_at: datetime
-    created_by_user_id: Optional[int] = None
+    created_by_user_id: Optional[int] = Field(None, validation_alias=AliasChoices("creator_user_id", "created_by_user_id")) # Modelde creator_user_id
 
     class Config:
         from_attributes = True
@@ -55,4 +68,17 @@ class NotificationReadStatus(NotificationReadStatusInDBBase):
     pass
 
 class NotificationWithReadInfo(Notification):
-    is_read: bool 
\ No newline at end of file
+    is_read: bool
+
+class NotificationMarkReadResult(BaseModel):
+    notification_id: int
+    is_read: bool = True
+    unread_count: int = Field(..., description="İşaretlemeden sonra kullanıcının bu okuldaki okunmamış bildirim sayısı")
+
+class NotificationBulkMarkRead(BaseModel):
+    notification_ids: Optional[List[int]] = Field(None, max_length=500, description="Okundu olarak işaretlenecek bildirimler")
+    before: Optional[datetime] = Field(None, description="Bu zamana kadar (dahil) gönderilmiş tüm bildirimler okundu sayılır")
+
+class NotificationUnreadCount(BaseModel):
+    school_id: int
+    unread_count: int
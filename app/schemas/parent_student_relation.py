@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class ParentStudentLinkItem(BaseModel):
+    student_number: str
+    parent: str = Field(..., description="Velinin kullanıcı adı veya telefon numarası")
+
+class ParentStudentBulkLink(BaseModel):
+    links: List[ParentStudentLinkItem] = Field(..., max_length=20000)
+
+class ParentStudentLinkConflict(BaseModel):
+    index: int # İstekteki links listesindeki sırası
+    student_number: str
+    parent: str
+    reason: str # student_not_found, parent_not_found, not_a_parent
+
+class ParentStudentBulkLinkResult(BaseModel):
+    linked: int = 0
+    already_linked: int = 0
+    conflicts: List[ParentStudentLinkConflict] = []
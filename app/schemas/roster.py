@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class RosterRowError(BaseModel):
+    row: int # Dosyadaki satır numarası (başlık 1. satır)
+    student_number: Optional[str] = None
+    error: str
+
+class RosterImportResult(BaseModel):
+    school_id: int
+    rows_processed: int = 0
+    classes_created: int = 0
+    students_created: int = 0
+    parents_created: int = 0
+    links_created: int = 0
+    errors: List[RosterRowError] = []
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, ForwardRef, TYPE_CHECKING
+from typing import Optional, List, Tuple, ForwardRef, TYPE_CHECKING
 from datetime import datetime
 # from .class_ import ClassBase # Bu satır kaldırıldı
 # Diğer şema importları (ClassBase gibi) forward reference veya tam import ile çözülecek
@@ -11,6 +11,10 @@ class SchoolBase(BaseModel):
     name: str = Field(..., description="Okulun adı")
     unique_code: str = Field(..., description="Okulu benzersiz şekilde tanımlayan kod")
     address: Optional[str] = None
+    geofence_latitude: Optional[float] = Field(None, ge=-90, le=90, description="Okul bölgesinin merkez enlemi")
+    geofence_longitude: Optional[float] = Field(None, ge=-180, le=180, description="Okul bölgesinin merkez boylamı")
+    geofence_radius_meters: Optional[int] = Field(None, gt=0, description="Merkezden izin verilen en fazla mesafe (metre)")
+    geofence_polygon: Optional[List[Tuple[float, float]]] = Field(None, min_length=3, description="Okul bölgesi çokgeni, [[enlem, boylam], ...]. Verilirse merkez/yarıçap yerine kullanılır.")
 
 class SchoolCreate(SchoolBase):
     pass
@@ -19,6 +23,10 @@ class SchoolUpdate(BaseModel):
     name: Optional[str] = None
     unique_code: Optional[str] = None
     address: Optional[str] = None
+    geofence_latitude: Optional[float] = Field(None, ge=-90, le=90)
+    geofence_longitude: Optional[float] = Field(None, ge=-180, le=180)
+    geofence_radius_meters: Optional[int] = Field(None, gt=0)
+    geofence_polygon: Optional[List[Tuple[float, float]]] = Field(None, min_length=3)
 
 class SchoolInDBBase(SchoolBase):
     id: int
@@ -44,7 +52,7 @@ class SchoolWithDetails(School):
 
 # SchoolWithDetails'in ForwardRef'lerini çözmek için GEREKLİ importlar ve çağrı
 from .class_ import ClassBase
-SchoolWithDetails.update_forward_refs()
+SchoolWithDetails.model_rebuild()
 
 # Döngüsel importu çözmek için ForwardRef'leri güncelle
 # Bu, tüm ilgili modeller import edildikten sonra yapılmalı.
@@ -45,8 +45,8 @@ class Student(StudentInDBBase):
     assigned_class: Optional[ForwardRef("ClassBase")] = None
 
 # Student'ın ForwardRef'lerini çözmek için GEREKLİ importlar ve çağrı
-# Bu importlar, update_forward_refs çalışmadan önce ilgili modüllerin yüklenmesini sağlar.
+# Bu importlar, model_rebuild çalışmadan önce ilgili modüllerin yüklenmesini sağlar.
 from .school import SchoolBase
 from .user import UserBase
 from .class_ import ClassBase
-Student.update_forward_refs() 
\ No newline at end of file
+Student.model_rebuild() 
\ No newline at end of file
@@ -47,4 +47,4 @@ class Teacher(TeacherInDBBase):
 from .school import SchoolBase
 from .user import UserBase
 from .class_ import ClassBase
-Teacher.update_forward_refs() 
\ No newline at end of file
+Teacher.model_rebuild() 
\ No newline at end of file
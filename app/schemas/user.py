@@ -43,6 +43,7 @@ class UserInDBBase(UserBase):
     initial_password_changed: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
+    profile_thumbnail_url: Optional[str] = Field(None, description="Profil resminin küçük (WebP) varyantının URL'si")
 
     class Config:
         from_attributes = True
@@ -56,5 +57,5 @@ class UserWithStudents(User):
 # UserWithStudents'ın ForwardRef'lerini çözmek için GEREKLİ importlar ve çağrı
 from .school import SchoolBase
 from .student import Student
-UserWithStudents.update_forward_refs()
-User.update_forward_refs() 
\ No newline at end of file
+UserWithStudents.model_rebuild()
+User.model_rebuild() 
\ No newline at end of file
@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable, List
+
+# Proje kök dizinini sys.path'e ekle ki app modüllerini import edebilelim
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import crud, models, schemas
+from app.core.serialization import FastJSONResponse
+from app.db.base_class import Base
+from app.models.parent_student_relation import parent_student_association_table
+
+# Öğrenci listesi endpoint'inin iki yolunu bellek içi SQLite üzerinde karşılaştırır:
+#  - orm: get_multi_by_school + FastAPI'nin response_model işlemi (List[schemas.Student] doğrulaması,
+#    JSON moduna çevirme) + JSONResponse; endpoint'in eski hali.
+#  - rows: get_rows_by_school + FastJSONResponse (doğrulama yok).
+# İki yolun ürettiği JSON'un aynı olduğu da kontrol edilir.
+# Kullanım: python scripts/benchmark_serialization.py [--rows 1000] [--repeat 20]
+
+def seed(session_factory, rows: int) -> int:
+    with session_factory() as db:
+        school = models.School(name="Benchmark Okulu", unique_code="BENCH")
+        db.add(school)
+        db.flush()
+        classes = [models.Class(school_id=school.id, class_name=f"{grade}-{branch}") for grade in range(1, 6) for branch in "ABCD"]
+        db.add_all(classes)
+        db.flush()
+        db.execute(insert(models.Student), [
+            {"school_id": school.id, "full_name": f"Öğrenci {i}", "student_number": f"{i:05d}", "class_id": classes[i % len(classes)].id}
+            for i in range(rows)
+        ])
+        db.execute(insert(models.User), [
+            {"username": f"veli{i}", "password_hash": "x", "full_name": f"Veli {i}", "phone_number": f"555{i:07d}",
+             "role": models.UserRoleEnum.PARENT, "school_id": school.id}
+            for i in range(rows * 2)
+        ])
+        student_ids = [student_id for (student_id,) in db.query(models.Student.id).order_by(models.Student.id)]
+        parent_ids = [user_id for (user_id,) in db.query(models.User.id).order_by(models.User.id)]
+        db.execute(insert(parent_student_association_table), [
+            {"student_id": student_id, "parent_user_id": parent_ids[index * 2 + offset]}
+            for index, student_id in enumerate(student_ids) for offset in (0, 1)
+        ])
+        db.commit()
+        return school.id
+
+def measure(label: str, run: Callable[[], bytes], repeat: int) -> float:
+    run() # Isınma (sorgu derleme önbelleği, şema önbellekleri)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    print(f"{label:<28} median {median * 1000:8.2f} ms   min {min(timings) * 1000:8.2f} ms")
+    return median
+
+def normalized(body: bytes) -> List[dict]:
+    students = json.loads(body)
+    for student in students:
+        student["parents"].sort(key=lambda parent: parent["username"]) # ORM yolunda veli sırası tanımsız
+    return sorted(students, key=lambda student: student["id"])
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Öğrenci listesi serileştirme yollarını karşılaştırır.")
+    parser.add_argument("--rows", type=int, default=1000, help="Listedeki öğrenci sayısı")
+    parser.add_argument("--repeat", type=int, default=20, help="Her ölçümün tekrar sayısı")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    school_id = seed(session_factory, args.rows)
+    response_field = create_response_field(name="Response", type_=List[schemas.Student])
+
+    def orm_serialize(students) -> bytes:
+        content = asyncio.run(serialize_response(field=response_field, response_content=students, is_coroutine=True))
+        return JSONResponse(content).body
+
+    def orm_path() -> bytes:
+        with session_factory() as db:
+            return orm_serialize(crud.student.get_multi_by_school(db, school_id=school_id, limit=args.rows))
+
+    def rows_path() -> bytes:
+        with session_factory() as db:
+            return FastJSONResponse(crud.student.get_rows_by_school(db, school_id=school_id, limit=args.rows)).body
+
+    orm_body, rows_body = orm_path(), rows_path()
+    if normalized(orm_body) != normalized(rows_body):
+        print("Outputs differ between the ORM and row paths", file=sys.stderr)
+        return 1
+    print(f"{args.rows} students, {len(rows_body)} bytes of JSON, identical output\n")
+
+    with session_factory() as db:
+        students = crud.student.get_multi_by_school(db, school_id=school_id, limit=args.rows)
+        rows = crud.student.get_rows_by_school(db, school_id=school_id, limit=args.rows)
+        orm_only = measure("serialize: response_model", lambda: orm_serialize(students), args.repeat)
+        rows_only = measure("serialize: FastJSONResponse", lambda: FastJSONResponse(rows).body, args.repeat)
+    orm_total = measure("query+serialize: orm", orm_path, args.repeat)
+    rows_total = measure("query+serialize: rows", rows_path, args.repeat)
+    print(f"\nserialization speedup: {orm_only / rows_only:.1f}x, end-to-end speedup: {orm_total / rows_total:.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+import argparse
+import os
+import sys
+
+# Proje kök dizinini sys.path'e ekle ki app modüllerini import edebilelim
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.main import openapi_document
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="OpenAPI dokümanını (build sırasında, çevrimdışı istemciler için) dosyaya yazar.")
+    parser.add_argument("path", help="Yazılacak JSON dosyası, örn. build/openapi.json")
+    parser.add_argument("--gzip", action="store_true", help="Yanına sıkıştırılmış <path>.gz kopyasını da yaz")
+    args = parser.parse_args()
+
+    openapi_document.write(args.path)
+    if args.gzip:
+        with open(f"{args.path}.gz", "wb") as target:
+            target.write(openapi_document.gzip_body)
+    print(f"{args.path}: {len(openapi_document.body)} bytes, ETag {openapi_document.etag}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
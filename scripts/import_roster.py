@@ -0,0 +1,60 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+# Proje kök dizinini sys.path'e ekle ki app modüllerini import edebilelim
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+
+from app import crud
+from app.core.config import dotenv_path, settings
+from app.core.roster_import import RosterFormatError, iter_roster_rows
+from app.crud.crud_roster import DEFAULT_CHUNK_SIZE
+from app.db.database import SessionLocal
+
+load_dotenv(dotenv_path) # ROSTER_DEFAULT_PARENT_PASSWORD .env'de tanımlı olabilir (Settings os.environ'a yazmaz)
+
+logging.basicConfig(
+    level=getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO),
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Öğrenci/veli/sınıf listesini (CSV veya .xlsx) bir okula toplu aktarır.")
+    parser.add_argument("school_id", type=int, help="Aktarılacak okulun ID'si")
+    parser.add_argument("path", help="CSV veya .xlsx dosyası")
+    parser.add_argument("--default-parent-password", default=os.getenv("ROSTER_DEFAULT_PARENT_PASSWORD"),
+                        help="Dosyada parent_password yoksa yeni velilerin ilk şifresi (veya ROSTER_DEFAULT_PARENT_PASSWORD)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Transaction başına satır sayısı")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    with SessionLocal() as db, open(args.path, "rb") as roster_file:
+        if crud.school.get(db, id=args.school_id) is None:
+            logger.error(f"School with ID {args.school_id} not found")
+            return 1
+        try:
+            result = crud.roster.import_rows(
+                db, school_id=args.school_id, rows=iter_roster_rows(roster_file, args.path),
+                default_parent_password=args.default_parent_password, chunk_size=args.chunk_size
+            )
+        except RosterFormatError as e:
+            logger.error(f"Roster file could not be read: {e}")
+            return 1
+
+    for error in result.errors:
+        logger.warning(f"Row {error.row} ({error.student_number or '-'}): {error.error}")
+    logger.info(
+        f"Imported {result.rows_processed} rows in {time.monotonic() - started:.1f}s: "
+        f"{result.classes_created} classes, {result.students_created} students, {result.parents_created} parents, "
+        f"{result.links_created} links, {len(result.errors)} errors"
+    )
+    return 0 if not result.errors else 2
+
+if __name__ == "__main__":
+    sys.exit(main())
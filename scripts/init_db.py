@@ -19,7 +19,7 @@ from app.models.school import School
 from app.models.student import Student
 from app.models.teacher import Teacher
 from app.models.class_ import Class
-from app.models.parent_student_relation import ParentStudentRelation
+from app.models.parent_student_relation import ParentStudentRelation, ClassParentLink
 from app.models.notification import Notification, NotificationReadStatus
 # Eğer legacy modeller de oluşturulacaksa:
 # from app.models.legacy_models import Veli, Ogrenci, Cagri
@@ -40,7 +40,7 @@ try:
     # from okul_yonetim_api.app.core.config import settings
     # from okul_yonetim_api.app.db.database import Base, engine (veya sadece database.py ise)
     # from okul_yonetim_api.app.models import models
-    log_level_str = os.getenv("LOG_LEVEL", "INFO").upper()
+    log_level_str = settings.LOG_LEVEL.upper()
 except ImportError:
     log_level_str = "INFO" # Settings yüklenemezse varsayılan
 
@@ -58,7 +58,17 @@ def init_db():
         # Base.metadata.drop_all(bind=engine) # DİKKAT: Üretimde bu satır yorumlanmalı veya kaldırılmalı!
         # logger.info("Mevcut tablolar (varsa) test amacıyla silindi.")
         Base.metadata.create_all(bind=engine)
+        # create_all mevcut tablolara yeni kolonları eklemez (bkz. app.db.schema_upgrades)
+        from app.db.schema_upgrades import apply_column_upgrades
+        added_columns = apply_column_upgrades(engine)
+        if added_columns:
+            logger.info(f"Eksik kolonlar eklendi: {', '.join(added_columns)}")
         logger.info("Veritabanı tabloları başarıyla oluşturuldu/güncellendi!")
+        # Sınıf -> veli indeksi mevcut veli-öğrenci bağlantılarından doldurulur (tekrar çalıştırılabilir)
+        from app import crud
+        with SessionLocal() as db:
+            link_count = crud.class_parent_index.rebuild(db)
+        logger.info(f"class_parent_links indeksi yeniden oluşturuldu ({link_count} kayıt).")
     except Exception as e:
         logger.error(f"Veritabanı tabloları oluşturulurken hata: {e}", exc_info=True)
         raise
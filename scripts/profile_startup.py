@@ -0,0 +1,74 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Proje kök dizinini sys.path'e ekle ki app modüllerini import edebilelim
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BASE_DIR)
+
+# Worker soğuk başlangıcının profili:
+#  1. Ayrı bir süreçte `python -X importtime -c "import app.main"` çalıştırılır (modül önbellekleri boş) ve
+#     en pahalı app modülleri ile üçüncü parti paketler listelenir.
+#  2. Aynı süreçte app.main import süresi ve ilk OpenAPI üretimi ölçülür.
+# Kullanım: python scripts/profile_startup.py [--top 20]
+
+def run_importtime() -> List[Tuple[str, int, int]]:
+    """(modül, self µs, kümülatif µs) listesi."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"import app.main failed with exit code {result.returncode}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def print_table(title: str, rows: List[Tuple[str, int, int]], top: int) -> None:
+    print(f"\n{title}")
+    print(f"{'self ms':>10} {'cumul. ms':>10}  module")
+    for module, self_us, cumulative_us in rows[:top]:
+        print(f"{self_us / 1000:>10.1f} {cumulative_us / 1000:>10.1f}  {module}")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Uygulama başlangıcının import süresi profilini çıkarır.")
+    parser.add_argument("--top", type=int, default=20, help="Her tabloda gösterilecek satır sayısı")
+    args = parser.parse_args()
+
+    rows = run_importtime()
+    app_rows = sorted((row for row in rows if row[0].startswith("app.")), key=lambda row: -row[1])
+    packages: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    for module, self_us, cumulative_us in rows:
+        if module.startswith("app.") or module == "app":
+            continue
+        totals = packages[module.split(".")[0]]
+        totals[0] += self_us
+        if "." not in module: # Paketin kendisinin kümülatif süresi alt modüllerini de kapsar
+            totals[1] = max(totals[1], cumulative_us)
+    print_table("App modules by self time (route and schema construction happens here)", app_rows, args.top)
+    print_table(
+        "Third-party packages by total self time",
+        sorted(((name, s, c) for name, (s, c) in packages.items()), key=lambda row: -row[1]), args.top,
+    )
+
+    started = time.perf_counter()
+    import app.main # noqa: E402 - süresi ölçülüyor
+    imported = time.perf_counter()
+    app.main.app.openapi()
+    finished = time.perf_counter()
+    print(f"\nimport app.main: {(imported - started) * 1000:.0f} ms")
+    print(f"first app.openapi(): {(finished - imported) * 1000:.0f} ms")
+    print(f"routes: {len(app.main.app.routes)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,7 +17,7 @@ from app.core.security import get_password_hash
 from app import crud
 
 # Loglama yapılandırması
-log_level_str = os.getenv("LOG_LEVEL", "INFO")
+log_level_str = settings.LOG_LEVEL
 log_level = getattr(logging, log_level_str.upper(), logging.INFO)
 logging.basicConfig(level=log_level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)